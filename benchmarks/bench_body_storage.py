@@ -0,0 +1,150 @@
+"""
+본문 분리/압축 전후의 DB 크기와 목록 조회 시간 비교
+
+주어진 DB 파일을 임시 디렉터리에 복사해 migrate_inline_content()로 본문을 article_bodies로 옮기고,
+옮기기 전과 후의 파일 크기(VACUUM 후), 목록 조회 시간, 글 하나 조회 시간을 잽니다.
+원본 파일은 바꾸지 않습니다. --synthetic을 주면 예전 구조의 합성 DB도 만들어 함께 잽니다.
+
+    python benchmarks/bench_body_storage.py newsletter.db brunch_articles.db --synthetic 20000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from database import migrate_inline_content
+import content_codec
+
+WORDS = [
+    '서비스', '사용자', '데이터', '디자인', '기획', '브런치', '글쓰기', '경험', '인공지능', '검색',
+    '개발자', '프로덕트', '회사', '팀', '문제', '해결', '고객', '시장', '전략', '성장'
+]
+
+def make_legacy_db(path, count):
+    """본문을 articles.content에 그대로 두던 예전 구조의 DB를 만듭니다."""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT UNIQUE,
+            title TEXT,
+            content TEXT,
+            author TEXT,
+            thumbnail TEXT,
+            crawled_at DATETIME
+        )
+    ''')
+    rows = []
+    for i in range(count):
+        content = ' '.join(
+            random.choice(WORDS) + random.choice(['은', '는', '이', '를', '.', '']) for _ in range(random.randint(300, 1500))
+        )
+        rows.append((
+            f'https://brunch.co.kr/@bench/{i}', f'벤치마크 글 {i}', content, f'작성자{i % 50}', None,
+            f'2026-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00'
+        ))
+    conn.executemany(
+        'INSERT INTO articles (url, title, content, author, thumbnail, crawled_at) VALUES (?, ?, ?, ?, ?, ?)',
+        rows
+    )
+    conn.commit()
+    conn.close()
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def measure(path, repeat):
+    conn = sqlite3.connect(path)
+    conn.create_function('decompress_body', 2, content_codec.decompress, deterministic=True)
+    conn.execute('VACUUM')
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(articles)')}
+    projection = 'id, url, title, crawled_at'
+    ids = [row[0] for row in conn.execute('SELECT id FROM articles')]
+
+    if 'content' in columns:
+        def view():
+            conn.execute('SELECT content FROM articles WHERE id = ?', (random.choice(ids),)).fetchone()
+    else:
+        def view():
+            row = conn.execute(
+                'SELECT codec, body FROM article_bodies WHERE article_id = ?', (random.choice(ids),)
+            ).fetchone()
+            content_codec.decompress(*row)
+
+    result = {
+        'articles': len(ids),
+        'size_kb': os.path.getsize(path) / 1024,
+        # 인덱스 없이 crawled_at으로 정렬하는 목록: 테이블 전체를 읽습니다
+        'list_page_ms': timed(lambda: conn.execute(
+            f'SELECT {projection} FROM articles ORDER BY crawled_at DESC LIMIT 20'
+        ).fetchall(), repeat),
+        'list_all_ms': timed(lambda: conn.execute(
+            f'SELECT {projection} FROM articles ORDER BY crawled_at DESC'
+        ).fetchall(), repeat),
+        'view_one_ms': timed(view, repeat * 10) if ids else 0.0
+    }
+    conn.close()
+    return result
+
+def compare(path, repeat):
+    before = measure(path, repeat)
+    conn = sqlite3.connect(path)
+    migrate_inline_content(conn)
+    conn.commit()
+    conn.close()
+    after = measure(path, repeat)
+    return {'before': before, 'after': after}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('db_files', nargs='*', help='비교할 DB 파일 (복사본으로 잽니다)')
+    parser.add_argument('--synthetic', type=int, default=0, help='이 수만큼 글이 있는 합성 DB도 잽니다')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    random.seed(0)
+    report = {'codec': content_codec.DEFAULT_CODEC}
+    with tempfile.TemporaryDirectory() as tmp:
+        targets = []
+        for path in args.db_files:
+            copy = os.path.join(tmp, os.path.basename(path))
+            shutil.copyfile(path, copy)
+            targets.append((path, copy))
+        if args.synthetic:
+            synthetic = os.path.join(tmp, f'synthetic_{args.synthetic}.db')
+            make_legacy_db(synthetic, args.synthetic)
+            targets.append((f'synthetic ({args.synthetic})', synthetic))
+
+        for name, path in targets:
+            report[name] = compare(path, args.repeat)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    keys = ['articles', 'size_kb', 'list_page_ms', 'list_all_ms', 'view_one_ms']
+    print(f"codec: {report['codec']}")
+    print(f"{'':36}" + ''.join(f'{key:>14}' for key in keys))
+    for name, result in report.items():
+        if name == 'codec':
+            continue
+        for phase in ('before', 'after'):
+            row = result[phase]
+            print(f'{name + " " + phase:36}' + ''.join(f'{row[key]:>14.2f}' for key in keys))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Database 읽기/쓰기 처리량 마이크로 벤치마크
+
+호출마다 연결을 여는 예전 방식(rollback journal)과 스레드별 연결 + WAL 방식을
+같은 작업량으로 비교합니다.
+
+    python benchmarks/bench_database.py --articles 500 --writers 4 --readers 8
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from database import Database
+import content_codec
+
+WORDS = [
+    '서비스', '사용자', '데이터', '디자인', '기획', '브런치', '글쓰기', '경험', '인공지능', '검색',
+    '개발자', '프로덕트', '회사', '팀', '문제', '해결', '고객', '시장', '전략', '성장'
+]
+
+class LegacyDatabase(Database):
+    """호출마다 새 연결을 여는 예전 방식. 반환된 연결은 참조가 사라질 때 닫힙니다."""
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.create_function('decompress_body', 2, content_codec.decompress, deterministic=True)
+        return conn
+
+def make_article(i):
+    words = random.choices(WORDS, k=300)
+    return {
+        'url': f'https://brunch.co.kr/@bench/{i}',
+        'title': f'벤치마크 글 {i}',
+        'content': ' '.join(w + random.choice(['은', '는', '이', '를', '.', '']) for w in words),
+        'author': f'작성자{i % 20}',
+        'thumbnail': None
+    }
+
+def run_threads(count, target):
+    errors = []
+
+    def wrapper(n):
+        try:
+            target(n)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=wrapper, args=(n,)) for n in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, errors
+
+def bench(db, articles, writers, readers, reads_per_reader):
+    db.setup()
+    result = {}
+
+    # 단건 저장을 여러 스레드가 동시에
+    failed = []
+    chunks = [articles[n::writers] for n in range(writers)]
+
+    def write(n):
+        for article in chunks[n]:
+            if not db.save_article(article):
+                failed.append(article['url'])
+
+    elapsed, errors = run_threads(writers, write)
+    result['write_ops_per_sec'] = len(articles) / elapsed
+    result['write_failures'] = len(failed) + len(errors)
+
+    # 쓰기와 읽기를 동시에
+    urls = [article['url'] for article in articles]
+    extra = [make_article(len(articles) + i) for i in range(len(articles) // 2)]
+    read_errors = []
+
+    def read(n):
+        for _ in range(reads_per_reader):
+            try:
+                db.get_article(random.choice(urls))
+                db.list_articles(limit=20)
+            except Exception as e:
+                read_errors.append(e)
+
+    def write_more(n):
+        for article in extra[n::writers]:
+            if not db.save_article(article):
+                failed.append(article['url'])
+
+    writer_threads = [threading.Thread(target=write_more, args=(n,)) for n in range(writers)]
+    for thread in writer_threads:
+        thread.start()
+    elapsed, errors = run_threads(readers, read)
+    for thread in writer_threads:
+        thread.join()
+    result['mixed_read_ops_per_sec'] = readers * reads_per_reader * 2 / elapsed
+    result['mixed_read_failures'] = len(read_errors) + len(errors)
+    result['mixed_write_failures'] = len(failed) - result['write_failures']
+
+    # 묶음 저장
+    batch = [make_article(10 ** 6 + i) for i in range(len(articles))]
+    started = time.perf_counter()
+    for n in range(0, len(batch), 100):
+        db.save_articles(batch[n:n + 100])
+    result['bulk_write_ops_per_sec'] = len(batch) / (time.perf_counter() - started)
+
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=300)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--reads', type=int, default=200, help='읽기 스레드당 반복 횟수')
+    args = parser.parse_args()
+
+    random.seed(0)
+    articles = [make_article(i) for i in range(args.articles)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            'before (connect-per-call)': bench(
+                LegacyDatabase(os.path.join(tmp, 'legacy.db')),
+                articles, args.writers, args.readers, args.reads
+            ),
+            'after (thread-local + WAL)': bench(
+                Database(os.path.join(tmp, 'pooled.db')),
+                articles, args.writers, args.readers, args.reads
+            )
+        }
+
+    keys = list(next(iter(results.values())).keys())
+    print(f"{'':28}" + ''.join(f'{key:>26}' for key in keys))
+    for name, result in results.items():
+        print(f'{name:28}' + ''.join(f'{result[key]:>26.1f}' for key in keys))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+검색 결과/글 페이지 파싱 벤치마크
+
+요소마다 find_element를 호출하는 예전 방식과 page_source를 한 번 받아 파싱하는 방식을
+저장해 둔 HTML(benchmarks/fixtures)로 비교합니다.
+
+기본값은 WebDriver 왕복 한 번에 --rtt 밀리초가 걸리는 가짜 드라이버를 씁니다.
+Chrome이 설치되어 있으면 --chrome으로 실제 브라우저에서 같은 파일을 열어 잴 수 있습니다.
+
+    python benchmarks/bench_parsing.py --rounds 20 --rtt 2
+    python benchmarks/bench_parsing.py --chrome
+"""
+import argparse
+import os
+import sys
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+import brunch_parser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SEARCH_FIXTURE = os.path.join(FIXTURES, 'brunch_search.html')
+ARTICLE_FIXTURE = os.path.join(FIXTURES, 'brunch_article.html')
+
+class FakeElement:
+    """BeautifulSoup 요소를 WebElement처럼 보이게 감쌉니다. 호출마다 왕복 비용을 냅니다."""
+
+    def __init__(self, driver, elem):
+        self._driver = driver
+        self._elem = elem
+
+    def find_element(self, by, selector):
+        return self._driver._find(self._elem, selector)
+
+    def find_elements(self, by, selector):
+        return self._driver._find_all(self._elem, selector)
+
+    @property
+    def text(self):
+        self._driver._round_trip()
+        return brunch_parser.clean_text(self._elem.get_text(' '))
+
+    def get_attribute(self, name):
+        self._driver._round_trip()
+        value = self._elem.get(name)
+        # 브라우저는 href/src를 절대 주소로 돌려줍니다
+        if value and name in ('href', 'src'):
+            value = brunch_parser.absolute_url(value)
+        return value
+
+class FixtureDriver:
+    """저장된 HTML을 여는 가짜 WebDriver. 모든 호출을 WebDriver 왕복 한 번으로 셉니다."""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.round_trips = 0
+        self._html = None
+        self._dom = None
+
+    def get(self, url):
+        path = urllib.parse.urlparse(url).path
+        with open(path, encoding='utf-8') as f:
+            self._html = f.read()
+        # 브라우저가 이미 만들어 둔 DOM에 해당하므로 측정에서 뺍니다
+        self._dom = BeautifulSoup(self._html, 'html.parser')
+
+    @property
+    def page_source(self):
+        self._round_trip()
+        return self._html
+
+    def find_element(self, by, selector):
+        return self._find(self._dom, selector)
+
+    def find_elements(self, by, selector):
+        return self._find_all(self._dom, selector)
+
+    def _find(self, root, selector):
+        self._round_trip()
+        elem = root.select_one(selector)
+        if elem is None:
+            raise NoSuchElementException(selector)
+        return FakeElement(self, elem)
+
+    def _find_all(self, root, selector):
+        self._round_trip()
+        return [FakeElement(self, elem) for elem in root.select(selector)]
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def quit(self):
+        pass
+
+def legacy_search_results(driver):
+    """예전 BrunchCrawler 방식: 카드마다 요소를 하나씩 WebDriver에 묻습니다."""
+    results = []
+    for article in driver.find_elements(By.CSS_SELECTOR, "li[data-articleuid]"):
+        try:
+            title = article.find_element(By.CSS_SELECTOR, ".tit_subject").text.strip()
+            url = article.find_element(By.CSS_SELECTOR, "a.link_post").get_attribute("href")
+            content = article.find_element(By.CSS_SELECTOR, ".article_content").text.strip()
+            try:
+                thumbnail = article.find_element(By.CSS_SELECTOR, "img.img_thumb").get_attribute("src")
+            except Exception:
+                thumbnail = None
+            try:
+                author = article.find_element(By.CSS_SELECTOR, ".post_append span:last-child").text.strip()
+                if author.startswith("By "):
+                    author = author[3:]
+            except Exception:
+                author = "Unknown"
+            try:
+                time_text = article.find_element(By.CSS_SELECTOR, ".publish_time").text.strip()
+            except Exception:
+                time_text = None
+            try:
+                comments = article.find_element(By.CSS_SELECTOR, ".num_txt").text.strip()
+            except Exception:
+                comments = "0"
+            results.append({
+                "title": title, "content": content, "url": url, "thumbnail": thumbnail,
+                "author": author, "time": time_text, "comments": comments
+            })
+        except Exception:
+            continue
+    return results
+
+def legacy_article(driver):
+    """예전 BrunchCrawler 방식의 글 추출"""
+    title = driver.find_element(By.CSS_SELECTOR, ".cover_title").text.strip()
+    content = "\n".join(e.text.strip() for e in driver.find_elements(By.CSS_SELECTOR, ".item_type_text"))
+    author = driver.find_element(By.CSS_SELECTOR, ".author_name").text.strip()
+    try:
+        thumbnail = driver.find_element(By.CSS_SELECTOR, ".cover_img").get_attribute("src")
+    except Exception:
+        thumbnail = None
+    return {"title": title, "content": content, "author": author, "thumbnail": thumbnail}
+
+def single_pass_search_results(driver):
+    return brunch_parser.parse_search_results(brunch_parser.make_soup(driver.page_source))
+
+def single_pass_article(driver, url):
+    return brunch_parser.parse_article(brunch_parser.make_soup(driver.page_source), url)
+
+def measure(driver, url, parse, rounds):
+    driver.get(url)
+    before = getattr(driver, 'round_trips', 0)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = parse(driver)
+    elapsed = time.perf_counter() - started
+    trips = (getattr(driver, 'round_trips', 0) - before) / rounds
+    return elapsed / rounds * 1000, trips, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--rtt', type=float, default=2.0, help='가짜 드라이버의 WebDriver 왕복 시간(ms)')
+    parser.add_argument('--chrome', action='store_true', help='실제 headless Chrome으로 측정')
+    args = parser.parse_args()
+
+    if args.chrome:
+        from driver_pool import create_chrome_driver
+        driver = create_chrome_driver()
+    else:
+        driver = FixtureDriver(args.rtt / 1000)
+
+    search_url = 'file://' + SEARCH_FIXTURE
+    article_url = 'file://' + ARTICLE_FIXTURE
+
+    try:
+        rows = [
+            ('search: find_element', measure(driver, search_url, legacy_search_results, args.rounds)),
+            ('search: page_source', measure(driver, search_url, single_pass_search_results, args.rounds)),
+            ('article: find_element', measure(driver, article_url, legacy_article, args.rounds)),
+            ('article: page_source', measure(
+                driver, article_url, lambda d: single_pass_article(d, article_url), args.rounds
+            )),
+        ]
+    finally:
+        driver.quit()
+
+    legacy, single = rows[0][1][2], rows[1][1][2]
+    print(f"parser: {brunch_parser.HTML_PARSER}, "
+          f"driver: {'chrome' if args.chrome else f'fixture (rtt {args.rtt}ms)'}")
+    print(f"{'':24}{'ms/page':>12}{'round trips':>14}")
+    for name, (ms, trips, _) in rows:
+        print(f"{name:24}{ms:>12.2f}{trips:>14.0f}")
+    print(f"search results identical: {legacy == single} ({len(single)} cards)")
+
+if __name__ == '__main__':
+    main()
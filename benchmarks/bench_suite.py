@@ -0,0 +1,392 @@
+"""
+오프라인 벤치마크 모음
+
+Chrome과 실제 브런치 사이트 없이, 녹화해 둔 검색/글 페이지(benchmarks/fixtures)를 돌려주는
+로컬 HTTP 서버를 띄워 다음을 잽니다. 결과는 JSON으로 저장해 이전 실행과 비교할 수 있습니다.
+
+- search: BrunchCrawler.search() 지연 시간 (로컬 서버의 검색 페이지를 열고 파싱)
+- parse: extract_brunch_content() 파싱 시간
+- corpora: 합성 글 1k/10k/100k개에 대한
+  Database.save_article() 처리량, 키워드 추출 처리량과 extract_keywords() 조회 시간, /view_database 렌더링 시간
+
+Chrome 없이 실행하면 로컬 서버에서 HTML을 받아 오는 재생용 드라이버를 씁니다.
+--chrome을 주면 실제 headless Chrome이 같은 로컬 서버를 엽니다.
+
+    python benchmarks/bench_suite.py --sizes 1000,10000 --output bench.json
+    python benchmarks/bench_suite.py --compare bench.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+import requests
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import WebDriverException
+
+import brunch_parser
+from database import Database
+from driver_pool import DriverPool
+from keyword_index import KeywordIndexer, NounExtractor
+from page_ready import PageReadiness
+from search_crawler import BrunchCrawler
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SEARCH_FIXTURE = os.path.join(FIXTURES, 'brunch_search.html')
+ARTICLE_FIXTURE = os.path.join(FIXTURES, 'brunch_article.html')
+
+WORDS = [
+    '서비스', '사용자', '데이터', '디자인', '기획', '브런치', '글쓰기', '경험', '인공지능', '검색',
+    '개발자', '프로덕트', '회사', '팀', '문제', '해결', '고객', '시장', '전략', '성장',
+    '리더십', '커리어', '마케팅', '브랜드', '콘텐츠', '플랫폼', '스타트업', '인터뷰', '조직', '문화'
+]
+PARTICLES = ['은', '는', '이', '가', '을', '를', '에', '의', '로', '.', '']
+
+class FixtureServer:
+    """녹화한 브런치 페이지를 돌려주는 로컬 HTTP 서버. /search는 검색 결과, 그 밖의 경로는 글 페이지입니다."""
+
+    def __init__(self, latency=0.0):
+        """
+        Args:
+            latency (float): 응답마다 더할 지연 시간(초). 네트워크 왕복을 흉내 냅니다.
+        """
+        with open(SEARCH_FIXTURE, 'rb') as f:
+            search_html = f.read()
+        with open(ARTICLE_FIXTURE, 'rb') as f:
+            article_html = f.read()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if latency:
+                    time.sleep(latency)
+                path = urllib.parse.urlparse(self.path).path
+                body = search_html if path.startswith('/search') else article_html
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}'
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+class ReplayDriver:
+    """
+    Chrome 대신 쓰는 재생용 드라이버. 페이지를 HTTP로 받아 두고 PageReadiness가 부르는 스크립트에
+    필요한 만큼만 답합니다. 스크립트 실행과 DOM 변경 대기는 즉시 끝난 것으로 봅니다.
+    """
+
+    def __init__(self):
+        self._session = requests.Session()
+        self._html = ''
+        self._dom = None
+
+    def get(self, url):
+        response = self._session.get(url, timeout=30)
+        response.raise_for_status()
+        self._html = response.text
+        self._dom = None
+
+    @property
+    def page_source(self):
+        return self._html
+
+    def execute_script(self, script, *args):
+        if args and isinstance(args[0], list):
+            # 선택자 대기: 모든 선택자가 문서에 있는지 확인합니다
+            if self._dom is None:
+                self._dom = BeautifulSoup(self._html, brunch_parser.HTML_PARSER)
+            return all(self._dom.select_one(selector) is not None for selector in args[0])
+        # 스크롤: 높이 대신 문서 길이를 돌려줍니다 (같은 값이면 더 늘지 않은 것으로 봅니다)
+        return len(self._html)
+
+    def execute_async_script(self, script, *args):
+        return True
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def get_log(self, log_type):
+        # 재생용 드라이버에는 성능 로그가 없으므로 빈 로그를 돌려줍니다
+        return []
+
+    def execute_cdp_cmd(self, cmd, params):
+        # CDP가 없는 실제 드라이버처럼 WebDriverException을 발생시킵니다
+        raise WebDriverException(f"재생용 드라이버는 CDP를 지원하지 않습니다: {cmd}")
+
+    def quit(self):
+        self._session.close()
+
+def timings(samples):
+    """밀리초 단위 측정값 목록의 요약"""
+    ordered = sorted(samples)
+    return {
+        'mean_ms': statistics.mean(ordered),
+        'p50_ms': ordered[len(ordered) // 2],
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    }
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return timings(samples), result
+
+def bench_search(server, rounds, chrome):
+    if chrome:
+        from driver_pool import create_chrome_driver
+        factory = create_chrome_driver
+    else:
+        factory = ReplayDriver
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'search.db'))
+        db.setup()
+        pool = DriverPool(size=1, driver_factory=factory)
+        crawler = BrunchCrawler(pool=pool, db=db, readiness=PageReadiness(), base_url=server.url)
+        try:
+            # 첫 검색은 드라이버 기동 시간이 섞이므로 따로 잽니다
+            started = time.perf_counter()
+            crawler.search('브런치')
+            first_ms = (time.perf_counter() - started) * 1000
+
+            stats, results = timed(lambda: crawler.search('브런치'), rounds)
+        finally:
+            crawler.close()
+            pool.close()
+            db.close()
+
+    stats.update({'first_ms': first_ms, 'results': len(results), 'driver': 'chrome' if chrome else 'replay'})
+    return stats
+
+def bench_parse(rounds):
+    with open(ARTICLE_FIXTURE, encoding='utf-8') as f:
+        html = f.read()
+
+    soup_stats, soup = timed(lambda: brunch_parser.make_soup(html), rounds)
+    extract_stats, content = timed(lambda: brunch_parser.extract_brunch_content(soup), rounds)
+    return {
+        'html_parser': brunch_parser.HTML_PARSER,
+        'html_kb': len(html.encode('utf-8')) / 1024,
+        'content_chars': len(content),
+        'soup_ms': soup_stats['p50_ms'],
+        'extract_ms': extract_stats['p50_ms'],
+        'total_ms': soup_stats['p50_ms'] + extract_stats['p50_ms']
+    }
+
+def make_articles(count, seed=0):
+    """한 해 동안 여러 작성자가 쓴 것처럼 보이는 합성 글을 만듭니다."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        words = rng.choices(WORDS, k=rng.randint(150, 400))
+        yield {
+            'url': f'https://brunch.co.kr/@bench{i % 500}/{i}',
+            'title': f'{rng.choice(WORDS)}에 대한 {rng.choice(WORDS)} 이야기 {i}',
+            'content': ' '.join(word + rng.choice(PARTICLES) for word in words),
+            'author': f'작성자{i % 500}',
+            'thumbnail': None,
+            'domain': 'brunch.co.kr',
+            'crawled_at': start + timedelta(seconds=i * 365 * 86400 // max(count, 1))
+        }
+
+def bench_corpus(app_module, path, size, single_saves, batch_size, tagger, repeat):
+    db = Database(path)
+    db.setup()
+    articles = make_articles(size)
+    result = {'articles': size}
+
+    # 한 글씩 저장 (요청마다 트랜잭션 하나)
+    single = [next(articles) for _ in range(min(size, single_saves))]
+    started = time.perf_counter()
+    for article in single:
+        db.save_article(article)
+    elapsed = time.perf_counter() - started
+    result['save_article_per_sec'] = len(single) / elapsed if elapsed else 0.0
+
+    # 나머지는 묶음으로 저장해 말뭉치를 채웁니다
+    saved = 0
+    started = time.perf_counter()
+    while True:
+        batch = [article for _, article in zip(range(batch_size), articles)]
+        if not batch:
+            break
+        db.save_articles(batch)
+        saved += len(batch)
+    elapsed = time.perf_counter() - started
+    result['save_articles_batch_per_sec'] = saved / elapsed if saved and elapsed else None
+
+    # 저장할 때 쌓인 키워드 작업을 이 스레드에서 모두 처리합니다
+    indexer = KeywordIndexer(db, NounExtractor(tagger), batch_size=200)
+    indexer.extractor.warm_up()
+    started = time.perf_counter()
+    processed = indexer.drain()
+    elapsed = time.perf_counter() - started
+    result['keyword_extractor'] = indexer.extractor.name
+    result['keyword_docs_per_sec'] = processed / elapsed if elapsed else 0.0
+
+    result['extract_keywords'] = timed(db.extract_keywords, repeat)[0]
+    end = datetime(2025, 12, 31).date()
+    result['top_keywords_30d'] = timed(lambda: db.top_keywords(end - timedelta(days=29), end), repeat)[0]
+    result['list_articles'] = timed(lambda: db.list_articles(limit=20), repeat)[0]
+
+    # 실제 /view_database 라우트를 이 말뭉치로 렌더링합니다
+    app_module.db = db
+    client = app_module.app.test_client()
+
+    def render():
+        response = client.get('/view_database')
+        assert response.status_code == 200, response.status_code
+        return len(response.data)
+
+    result['view_database'], page_bytes = timed(render, repeat)
+    result['view_database']['bytes'] = page_bytes
+
+    db.close()
+    result['db_mb'] = os.path.getsize(path) / 1024 / 1024
+    return result
+
+def load_app(tmp):
+    """벤치마크용 임시 DB와 설정으로 app 모듈을 불러옵니다. Chrome은 띄우지 않습니다."""
+    os.environ['NEWSLETTER_DB'] = os.path.join(tmp, 'app.db')
+    os.environ.setdefault('DRIVER_POOL_WARM_UP', '0')
+    os.environ.setdefault('KEYWORD_TAGGER', 'regex')
+    os.environ.setdefault('SEARCH_CACHE_PERSIST', '0')
+    cwd = os.getcwd()
+    # 예전 DB 파일을 가져오지 않도록 빈 디렉터리에서 불러옵니다
+    os.chdir(tmp)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    app.keyword_indexer.stop()
+    return app
+
+def flatten(report, prefix=''):
+    values = {}
+    for key, value in report.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            values.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+def compare(report, baseline, threshold):
+    """
+    이전 결과와 비교해 threshold(비율)보다 나빠진 지표를 찾습니다.
+    _ms로 끝나는 지표는 작을수록, _per_sec로 끝나는 지표는 클수록 좋은 것으로 봅니다.
+    """
+    current, previous = flatten(report), flatten(baseline)
+    regressions = []
+    for name, value in current.items():
+        before = previous.get(name)
+        if not before:
+            continue
+        if name.endswith('_ms'):
+            change = value / before - 1
+        elif name.endswith('_per_sec'):
+            change = before / value - 1 if value else float('inf')
+        else:
+            continue
+        if change > threshold:
+            regressions.append({'metric': name, 'before': before, 'after': value, 'worse_by': change})
+    return regressions
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SRC, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000', help='합성 말뭉치 크기 (쉼표로 구분)')
+    parser.add_argument('--rounds', type=int, default=20, help='검색/파싱 반복 횟수')
+    parser.add_argument('--repeat', type=int, default=10, help='말뭉치별 조회/렌더링 반복 횟수')
+    parser.add_argument('--single-saves', type=int, default=1000, help='한 글씩 저장해 잴 글 수')
+    parser.add_argument('--batch-size', type=int, default=500, help='나머지 글을 저장할 묶음 크기')
+    parser.add_argument('--tagger', default='regex', help='키워드 추출기 (regex, okt, mecab, auto)')
+    parser.add_argument('--latency', type=float, default=0.0, help='로컬 서버 응답 지연(ms)')
+    parser.add_argument('--chrome', action='store_true', help='검색을 실제 headless Chrome으로 측정')
+    parser.add_argument('--output', help='결과 JSON을 저장할 파일. 없으면 표준 출력')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=0.2, help='회귀로 볼 악화 비율')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform()
+        }
+    }
+
+    with FixtureServer(latency=args.latency / 1000) as server:
+        report['search'] = bench_search(server, args.rounds, args.chrome)
+    report['parse'] = bench_parse(args.rounds)
+
+    report['corpora'] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        app_module = load_app(tmp)
+        for size in [int(size) for size in args.sizes.split(',') if size]:
+            path = os.path.join(tmp, f'corpus_{size}.db')
+            report['corpora'][str(size)] = bench_corpus(
+                app_module, path, size, args.single_saves, args.batch_size, args.tagger, args.repeat
+            )
+            print(f"말뭉치 {size}개 측정 완료", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare(report, baseline, args.threshold)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if report.get('regressions'):
+        for regression in report['regressions']:
+            print(f"회귀: {regression['metric']} {regression['before']:.2f} → {regression['after']:.2f} "
+                  f"({regression['worse_by']:+.0%})", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+본문 정리/키워드 빈도 처리량 벤치마크
+
+저장된 글 본문(DB는 읽기 전용으로 엽니다)으로 예전 방식과 text_processing 모듈을 비교합니다.
+
+- count_keywords: 문장마다 정규식 두 개를 컴파일해 돌리던 방식 → 미리 컴파일한 정규식으로 본문을 한 번 훑는 방식
+- count_keywords_batch: 위 방식을 프로세스 풀에서 여러 글에 한꺼번에 (코어가 하나면 현재 프로세스에서 처리)
+- clean_text: re.sub 두 번 → str.split/join, 태그가 있을 때만 정규식
+
+결과가 예전 방식과 다르면 오류로 끝납니다.
+
+    python benchmarks/bench_text_processing.py
+    python benchmarks/bench_text_processing.py --db newsletter.db --repeat 4 --workers 4
+"""
+from collections import Counter
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from corpus_io import read_file
+import text_processing
+from text_processing import STOP_WORDS, KEYWORD_PATTERNS
+
+DEFAULT_DBS = [os.path.join(ROOT, 'newsletter.db'), os.path.join(ROOT, 'brunch_articles.db')]
+
+def legacy_count_keywords(content):
+    """예전 database.count_keywords"""
+    counter = Counter()
+    if not content:
+        return counter
+
+    sentences = re.split(r'[.!?]\s+', content)
+    for sentence in sentences:
+        for pattern in KEYWORD_PATTERNS:
+            found_words = re.findall(pattern, sentence)
+            counter.update(w for w in found_words if len(w) >= 2 and w not in STOP_WORDS)
+    return counter
+
+def legacy_clean_text(text):
+    """예전 brunch_parser.clean_text"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    return text.strip()
+
+def load_documents(paths):
+    documents = []
+    for path in paths:
+        if not os.path.exists(path):
+            print(f'{path}: 없어서 건너뜁니다')
+            continue
+        documents.extend(article['content'] for article in read_file(path) if article.get('content'))
+    return documents
+
+def timed(function, documents):
+    started = time.perf_counter()
+    result = function(documents)
+    return result, len(documents) / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', action='append', help='본문을 읽을 DB나 덤프 파일 (여러 번 줄 수 있음)')
+    parser.add_argument('--repeat', type=int, default=1, help='본문 목록을 몇 번 이어 붙일지')
+    parser.add_argument('--workers', type=int, default=None, help='count_keywords_batch 프로세스 수 (기본: 코어 수)')
+    args = parser.parse_args()
+
+    documents = load_documents(args.db or DEFAULT_DBS) * args.repeat
+    if not documents:
+        sys.exit('본문이 있는 글이 없습니다')
+    workers = args.workers or text_processing.default_workers()
+    print(f'글 {len(documents)}개, 평균 {sum(map(len, documents)) // len(documents)}자, 프로세스 {workers}개\n')
+
+    legacy_counts, legacy_rate = timed(lambda docs: [legacy_count_keywords(doc) for doc in docs], documents)
+    counts, rate = timed(lambda docs: [text_processing.count_keywords(doc) for doc in docs], documents)
+    batch_counts, batch_rate = timed(lambda docs: text_processing.count_keywords_batch(docs, workers), documents)
+    if counts != legacy_counts or batch_counts != legacy_counts:
+        sys.exit('count_keywords 결과가 예전 방식과 다릅니다')
+
+    legacy_cleaned, legacy_clean_rate = timed(lambda docs: [legacy_clean_text(doc) for doc in docs], documents)
+    cleaned, clean_rate = timed(lambda docs: [text_processing.clean_text(doc) for doc in docs], documents)
+    if cleaned != legacy_cleaned:
+        sys.exit('clean_text 결과가 예전 방식과 다릅니다')
+
+    results = {
+        'before (per-sentence re)': {'count_keywords': legacy_rate, 'clean_text': legacy_clean_rate},
+        'after (single pass)': {'count_keywords': rate, 'clean_text': clean_rate},
+        f'after (batch, {workers} procs)': {'count_keywords': batch_rate, 'clean_text': None},
+    }
+
+    keys = ['count_keywords', 'clean_text']
+    print(f"{'docs/sec':28}" + ''.join(f'{key:>18}' for key in keys))
+    for name, result in results.items():
+        print(f'{name:28}' + ''.join(f'{result[key]:>18.1f}' if result[key] is not None else f"{'-':>18}" for key in keys))
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,18 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
 from search_crawler import BrunchCrawler
 from database import Database
+from driver_pool import DriverPool, BrowserProfile, create_chrome_driver
+from crawl_jobs import CrawlJobQueue, QueueFull
+from search_cache import SearchCache
+from keyword_index import KeywordIndexer, NounExtractor
+import corpus_io
+from datetime import date, datetime, timedelta
 import threading
+import metrics
 import logging
+import atexit
+import json
+import time
 import os
 
 # 로깅 설정
@@ -13,47 +23,390 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
 # 데이터베이스 초기화
-db = Database()
+db = Database(os.environ.get('NEWSLETTER_DB', 'newsletter.db'))
 db.setup()
+# WebCrawler가 따로 쓰던 brunch_articles.db 등은 처음 한 번만 가져옵니다
+db.import_legacy_databases()
+db.warm_known_urls()
+
+# 저장된 글의 키워드는 백그라운드에서 형태소 분석기로 한 번씩만 뽑습니다
+# 정규식 추출기는 KEYWORD_PROCESSES개 프로세스에서 KEYWORD_BATCH_SIZE개씩 나눠 셀 수 있습니다
+keyword_indexer = KeywordIndexer(
+    db,
+    extractor=NounExtractor(os.environ.get('KEYWORD_TAGGER', 'auto')),
+    workers=int(os.environ.get('KEYWORD_WORKERS', 2)),
+    batch_size=int(os.environ.get('KEYWORD_BATCH_SIZE', 20)),
+    processes=int(os.environ.get('KEYWORD_PROCESSES', 0))
+)
+keyword_indexer.start()
+
+# 모든 요청 스레드가 함께 쓰는 WebDriver 풀
+# BROWSER_PROFILE=full이면 이미지/폰트/광고 요청을 막지 않습니다 (전송량 비교용)
+browser_profile = BrowserProfile.from_name(os.environ.get('BROWSER_PROFILE', 'light'))
+driver_pool = DriverPool(
+    size=int(os.environ.get('DRIVER_POOL_SIZE', 2)),
+    max_pages=int(os.environ.get('DRIVER_MAX_PAGES', 50)),
+    driver_factory=lambda: create_chrome_driver(browser_profile)
+)
+crawler = BrunchCrawler(
+    pool=driver_pool,
+    db=db,
+    pipeline_options={
+        'fetch_workers': int(os.environ.get('CRAWL_WORKERS', 4)),
+        'rate': float(os.environ.get('CRAWL_RATE_PER_HOST', 2.0)),
+        'batch_size': int(os.environ.get('CRAWL_BATCH_SIZE', 20))
+    },
+    # 설정하면 저장된 지 이 일수가 지난 글은 다시 크롤링합니다
+    max_age_days=float(os.environ['CRAWL_MAX_AGE_DAYS']) if os.environ.get('CRAWL_MAX_AGE_DAYS') else None
+)
+
+# CRAWL_ENGINE=async면 스레드 파이프라인 대신 asyncio 크롤러가 묶음 안의 글을 한꺼번에 가져옵니다
+if os.environ.get('CRAWL_ENGINE') == 'async':
+    from async_crawler import AsyncCrawler
+    async_crawler = AsyncCrawler(
+        db=db,
+        browser=crawler,
+        concurrency=int(os.environ.get('CRAWL_ASYNC_CONCURRENCY', 32)),
+        per_host=int(os.environ.get('CRAWL_ASYNC_PER_HOST', 4)),
+        batch_size=int(os.environ.get('CRAWL_BATCH_SIZE', 20)),
+        max_age_days=crawler.max_age_days
+    )
+    crawl_handler, crawl_metrics = async_crawler.run, async_crawler.metrics
+else:
+    crawl_handler, crawl_metrics = crawler.crawl_and_save_articles, crawler.pipeline.metrics
+
+# 검색 결과 글은 SQLite에 저장되는 작업 큐를 거쳐 고정된 수의 작업 스레드가 크롤링합니다
+job_queue = CrawlJobQueue(
+    db.db_path,
+    handler=crawl_handler,
+    workers=int(os.environ.get('CRAWL_JOB_WORKERS', 2)),
+    batch_size=int(os.environ.get('CRAWL_JOB_BATCH_SIZE', 10)),
+    max_pending=int(os.environ.get('CRAWL_JOB_MAX_PENDING', 500))
+)
+job_queue.setup()
+job_queue.start()
+
+# 같은 검색어는 브라우저를 다시 띄우지 않고 캐시에서 답합니다
+search_cache = SearchCache(
+    ttl=float(os.environ.get('SEARCH_CACHE_TTL', 300)),
+    stale_ttl=float(os.environ.get('SEARCH_CACHE_STALE_TTL', 3600)),
+    max_entries=int(os.environ.get('SEARCH_CACHE_SIZE', 256)),
+    db_path=db.db_path if os.environ.get('SEARCH_CACHE_PERSIST', '1') == '1' else None
+)
+search_cache.setup()
+
+# 등록 역순으로 실행되므로 작업 큐 → 파이프라인 → 드라이버 풀 → 키워드 작업 → DB 연결 순서로 종료됩니다
+atexit.register(db.close)
+atexit.register(keyword_indexer.stop, 10)
+atexit.register(driver_pool.close)
+atexit.register(crawler.pipeline.stop)
+atexit.register(job_queue.stop, 30)
+
+# 첫 검색이 Chrome 기동을 기다리지 않도록 미리 띄워 둡니다
+if os.environ.get('DRIVER_POOL_WARM_UP', '1') == '1':
+    threading.Thread(target=driver_pool.warm_up, daemon=True).start()
+
+# /metrics로 내보내는 지표. 크롤링/저장 구간 시간과 카운터는 각 모듈이 metrics.REGISTRY에 기록합니다
+REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    'newsletter_http_request_seconds', 'Flask 요청 처리 시간(초)', ('endpoint', 'method', 'status')
+)
+metrics.REGISTRY.gauge('newsletter_driver_pool_drivers', '상태별 WebDriver 수', ('state',)).set_function(
+    lambda: {(state,): driver_pool.stats()[state] for state in ('idle', 'in_use')}
+)
+metrics.REGISTRY.gauge('newsletter_crawl_jobs', '상태별 크롤링 작업 수', ('status',)).set_function(
+    lambda: {(status,): count for status, count in job_queue.stats().items() if status in ('pending', 'running', 'done', 'failed')}
+)
+metrics.REGISTRY.gauge('newsletter_keyword_jobs_pending', '키워드를 아직 뽑지 않은 글 수').set_function(
+    db.keyword_job_count
+)
+metrics.REGISTRY.gauge('newsletter_near_duplicate_articles', '다른 글에 묶인 거의 같은 글 수').set_function(
+    db.duplicate_count
+)
+
+# PROFILE_SAMPLE_RATE 비율의 요청(과 PROFILE_ALLOW_HEADER=1이면 X-Profile: 1 헤더가 붙은 요청)을 cProfile로 잽니다
+request_profiler = metrics.RequestProfiler.from_env()
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.profile = None
+    if request_profiler.enabled and request_profiler.should_profile(request.headers):
+        g.profile = request_profiler.start()
+
+@app.after_request
+def record_request_metrics(response):
+    # 스트리밍 응답은 본문을 보내기 전까지의 시간입니다
+    started = g.get('request_started')
+    if started is not None:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.endpoint or 'unknown', method=request.method, status=response.status_code
+        )
+
+    profile, g.profile = g.get('profile'), None
+    if profile is not None:
+        path = request_profiler.finish(profile, f"{request.method} {request.path}")
+        if path:
+            response.headers['X-Profile-File'] = os.path.basename(path)
+    return response
+
+@app.teardown_request
+def stop_request_profile(exc):
+    # after_request까지 가지 못하고 끝난 요청의 프로파일러를 끕니다
+    profile = g.get('profile')
+    if profile is not None:
+        profile.disable()
+        g.profile = None
 
 @app.route('/')
 def index():
     return render_template('index.html', title="Newsletter App - Cloud Version")
 
+# 로컬 전문 검색 결과가 이 수 이상이면 브런치를 검색하지 않습니다
+LOCAL_SEARCH_MIN_HITS = int(os.environ.get('LOCAL_SEARCH_MIN_HITS', 10))
+
+def local_search_results(query, sort_by, limit):
+    """저장된 글에서 검색해 브런치 검색 결과와 같은 형태로 돌려줍니다."""
+    order = 'recency' if sort_by == 'recency' else 'rank'
+    return [{
+        'title': article['title'],
+        'content': article['snippet'],
+        'url': article['url'],
+        'thumbnail': article['thumbnail'],
+        'author': article['author'],
+        'time': article['crawled_at'],
+        'comments': None,
+        'source': 'local'
+    } for article in db.search_articles(query, limit, order)]
+
+def enqueue_crawl(results):
+    """이미 저장된 글을 뺀 나머지만 크롤링 작업으로 등록합니다. 기다리지 않고 바로 반환합니다."""
+    urls = [r['url'] for r in results]
+    new_urls = crawler.filter_new_urls(urls)
+    try:
+        crawl = job_queue.enqueue(new_urls)
+        crawl['skipped'] = len(set(urls)) - len(new_urls)
+    except QueueFull as e:
+        logger.warning(str(e))
+        crawl = {'error': '크롤링 대기열이 가득 차 이번 검색 결과는 저장하지 않습니다'}
+    return crawl
+
 @app.route('/search', methods=['POST'])
 def search():
     query = request.form.get('query')
     sort_by = request.form.get('sort_by', 'recency')  # 기본값은 최신순
+    live = request.form.get('live') == '1'  # 로컬 결과와 상관없이 브런치 검색
     
     if not query:
         return jsonify({'error': '검색어를 입력해주세요'})
         
     try:
-        # 브런치 검색
-        crawler = BrunchCrawler()
-        results = crawler.search(query, sort_by)
+        # 캐시에 브런치 검색 결과가 있으면 저장된 글을 훑지 않고 바로 답합니다
+        results = search_cache.get_cached(query, sort_by, crawler.search)
         
-        # 백그라운드에서 크롤링 및 저장 시작
-        thread = threading.Thread(
-            target=crawler.crawl_and_save_articles,
-            args=([r['url'] for r in results],)
-        )
-        thread.daemon = True
-        thread.start()
+        # 저장된 글로 충분하면 브라우저를 띄우지 않고 바로 답합니다
+        if results is None and not live and LOCAL_SEARCH_MIN_HITS > 0:
+            local_results = local_search_results(query, sort_by, LOCAL_SEARCH_MIN_HITS)
+            if len(local_results) >= LOCAL_SEARCH_MIN_HITS:
+                return jsonify({
+                    'results': local_results,
+                    'source': 'local'
+                })
+        
+        # 브런치 검색
+        if results is None:
+            results = search_cache.get(query, sort_by, crawler.search)
         
         return jsonify({
-            'results': results
+            'results': results,
+            'source': 'live',
+            'crawl': enqueue_crawl(results)
         })
         
     except Exception as e:
         logger.error(f"검색 중 오류 발생: {str(e)}")
         return jsonify({'error': '검색 중 오류가 발생했습니다'})
 
+@app.route('/search/stream', methods=['POST'])
+def search_stream():
+    """
+    /search와 같은 검색을 하되, 결과를 파싱되는 대로 한 줄에 하나씩(NDJSON) 보냅니다.
+    
+    {"type": "result", "result": {...}} 줄이 이어지고 마지막에
+    {"type": "done", "source": ..., "crawl": ...} 또는 {"type": "error", "error": ...} 줄이 옵니다.
+    """
+    query = request.form.get('query')
+    sort_by = request.form.get('sort_by', 'recency')
+    live = request.form.get('live') == '1'
+    
+    def line(data):
+        return json.dumps(data, ensure_ascii=False) + '\n'
+        
+    def generate():
+        if not query:
+            yield line({'type': 'error', 'error': '검색어를 입력해주세요'})
+            return
+            
+        try:
+            # 캐시나 저장된 글로 답할 수 있으면 바로 보냅니다. 캐시를 먼저 봐야 저장된 글을 훑지 않습니다
+            results = search_cache.get_cached(query, sort_by, crawler.search)
+            source = 'live'
+            if results is None and not live and LOCAL_SEARCH_MIN_HITS > 0:
+                local_results = local_search_results(query, sort_by, LOCAL_SEARCH_MIN_HITS)
+                if len(local_results) >= LOCAL_SEARCH_MIN_HITS:
+                    results, source = local_results, 'local'
+                
+            if results is not None:
+                for result in results:
+                    yield line({'type': 'result', 'result': result})
+                crawl = enqueue_crawl(results) if source == 'live' else None
+                yield line({'type': 'done', 'source': source, 'crawl': crawl})
+                return
+                
+            # 브런치 검색 결과를 카드 하나씩 보냅니다
+            results = []
+            for result in crawler.iter_search(query, sort_by):
+                results.append(result)
+                yield line({'type': 'result', 'result': result})
+                
+            search_cache.put(query, sort_by, results)
+            yield line({'type': 'done', 'source': 'live', 'crawl': enqueue_crawl(results)})
+            
+        except Exception as e:
+            logger.error(f"검색 중 오류 발생: {str(e)}")
+            yield line({'type': 'error', 'error': '검색 중 오류가 발생했습니다'})
+            
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        # 프록시가 응답을 모았다가 한 번에 보내지 않도록 합니다
+        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
+    )
+
+@app.route('/pool_stats')
+def pool_stats():
+    return jsonify(driver_pool.stats())
+
+@app.route('/readiness_stats')
+def readiness_stats():
+    """페이지 종류별로 실제로 기다린 시간과 학습된 제한 시간"""
+    return jsonify(crawler.readiness.stats())
+
+@app.route('/keyword_stats')
+def keyword_stats():
+    """키워드 추출기 종류, 대기 중인 글 수, 글당 추출 시간"""
+    return jsonify(keyword_indexer.stats())
+
+@app.route('/pipeline_stats')
+def pipeline_stats():
+    return jsonify(crawl_metrics())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus가 수집하는 지표 (텍스트 형식)"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/local_search')
+def local_search():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': '검색어를 입력해주세요'}), 400
+        
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    order = request.args.get('order', 'rank')
+    return jsonify({'results': db.search_articles(query, limit, order)})
+
+@app.route('/search_cache_stats')
+def search_cache_stats():
+    return jsonify(search_cache.stats())
+
+@app.route('/crawl_jobs')
+def crawl_jobs():
+    status = request.args.get('status')
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    return jsonify({
+        'stats': job_queue.stats(),
+        'jobs': job_queue.list_jobs(status, limit)
+    })
+
+@app.route('/crawl_jobs/<int:job_id>')
+def crawl_job(job_id):
+    job = job_queue.get_job(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다'}), 404
+    return jsonify(job)
+
+# 글 목록 한 페이지의 기본 크기와 최대 크기
+ARTICLE_PAGE_SIZE = 20
+ARTICLE_PAGE_MAX = 100
+
 @app.route('/view_database')
 def view_database():
-    articles = db.get_all_articles()
+    articles, next_cursor = db.list_articles(limit=ARTICLE_PAGE_SIZE)
     keywords = db.extract_keywords()
-    return render_template('database.html', articles=articles, keywords=keywords)
+    return render_template('database.html', articles=articles, next_cursor=next_cursor, keywords=keywords)
+
+@app.route('/articles')
+def list_articles():
+    limit = min(max(request.args.get('limit', ARTICLE_PAGE_SIZE, type=int), 1), ARTICLE_PAGE_MAX)
+    try:
+        articles, next_cursor = db.list_articles(request.args.get('cursor'), limit, request.args.get('domain'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'articles': articles, 'next_cursor': next_cursor})
+
+@app.route('/export/articles')
+def export_articles():
+    """
+    저장된 글 전체를 NDJSON(기본) 또는 CSV로 스트리밍합니다. 글 수와 상관없이 메모리를 일정하게 씁니다.
+    
+    인자: format=ndjson|csv, gzip=1, since/until=YYYY-MM-DD (crawled_at 기준), domain, content=0 (본문 제외)
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in corpus_io.FORMATS:
+        return jsonify({'error': f"format은 {', '.join(corpus_io.FORMATS)} 중 하나여야 합니다"}), 400
+    try:
+        since = request.args.get('since')
+        since = datetime.strptime(since, '%Y-%m-%d').date() if since else None
+        until = request.args.get('until')
+        until = datetime.strptime(until, '%Y-%m-%d').date() if until else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+        
+    articles = db.iter_articles(
+        since=since, until=until,
+        domain=request.args.get('domain') or None,
+        content=request.args.get('content') != '0'
+    )
+    body = corpus_io.iter_export(articles, fmt)
+    filename = f'articles.{fmt}'
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'text/csv'
+    if request.args.get('gzip') == '1':
+        body = corpus_io.gzip_chunks(body)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+        
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/articles/<int:article_id>')
+def get_article(article_id):
+    article = db.get_article_by_id(article_id)
+    if article is None:
+        return jsonify({'error': '글을 찾을 수 없습니다'}), 404
+    return jsonify(article)
+
+@app.route('/articles/<int:article_id>/duplicates')
+def get_article_duplicates(article_id):
+    """이 글에 묶인 거의 같은 글 목록. 중복 글의 id로 부르면 대표 글 기준으로 돌려줍니다."""
+    article = db.get_article_by_id(article_id)
+    if article is None:
+        return jsonify({'error': '글을 찾을 수 없습니다'}), 404
+    canonical_id = article['canonical_id'] or article_id
+    return jsonify({'canonical_id': canonical_id, 'duplicates': db.get_duplicates(canonical_id)})
 
 @app.route('/extract_keywords', methods=['POST'])
 def extract_keywords():
@@ -63,6 +416,42 @@ def extract_keywords():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# 기간을 주지 않았을 때 쓰는 키워드 집계 기간(일)
+KEYWORD_WINDOW_DAYS = 7
+
+def keyword_window_args():
+    """요청 인자 start, end(YYYY-MM-DD)를 date로 바꿉니다. 없으면 오늘까지 KEYWORD_WINDOW_DAYS일입니다."""
+    end = request.args.get('end')
+    end = datetime.strptime(end, '%Y-%m-%d').date() if end else date.today()
+    start = request.args.get('start')
+    start = datetime.strptime(start, '%Y-%m-%d').date() if start else end - timedelta(days=KEYWORD_WINDOW_DAYS - 1)
+    return start, end
+
+@app.route('/keywords/top')
+def top_keywords():
+    """기간(과 작성자) 안의 상위 키워드"""
+    limit = min(max(request.args.get('limit', 30, type=int), 1), 100)
+    author = request.args.get('author') or None
+    try:
+        start, end = keyword_window_args()
+        keywords = db.top_keywords(start, end, author, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'start': start.isoformat(), 'end': end.isoformat(), 'author': author, 'keywords': keywords})
+
+@app.route('/keywords/trending')
+def trending_keywords():
+    """바로 앞 같은 길이의 기간보다 많이 나온 키워드"""
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    min_count = max(request.args.get('min_count', 3, type=int), 1)
+    author = request.args.get('author') or None
+    try:
+        start, end = keyword_window_args()
+        keywords = db.trending_keywords(start, end, author, limit, min_count)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'start': start.isoformat(), 'end': end.isoformat(), 'author': author, 'keywords': keywords})
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,341 @@
+from contextlib import asynccontextmanager
+import urllib.parse
+import threading
+import logging
+import asyncio
+import random
+import time
+import aiohttp
+import brunch_parser
+from http_fetcher import DEFAULT_HEADERS
+# AsyncCrawler.metrics()와 이름이 겹치지 않도록 필요한 것만 가져옵니다
+from metrics import CRAWL_FAILURES, DUPLICATES_SKIPPED, PAGES_CRAWLED, span
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class _Run:
+    """crawl_and_save_articles() 한 번 또는 crawl() 한 번이 쓰는 세션과 세마포어입니다."""
+
+    def __init__(self, session, concurrency):
+        self.session = session
+        self.limit = asyncio.Semaphore(concurrency)
+        self.hosts = {}
+
+    def host_limit(self, url, per_host):
+        host = urllib.parse.urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = asyncio.Semaphore(per_host)
+        return self.hosts[host]
+
+class AsyncCrawler:
+    """
+    asyncio로 여러 글을 동시에 가져오는 크롤러입니다. BrunchCrawler와 같은 search, crawl,
+    crawl_and_save_articles를 코루틴으로 제공합니다.
+
+    - 전체 동시 요청 수는 concurrency, 호스트별 동시 요청 수는 per_host로 제한합니다.
+    - 글마다 page_timeout초 제한 시간이 있고, 넘으면 그 글만 실패로 처리합니다.
+    - DB 쓰기는 작성 태스크 하나가 묶음으로 처리합니다.
+    - 검색 결과 페이지와 정적 HTML에 본문이 없는 글은 browser(BrunchCrawler)로 렌더링합니다.
+    """
+
+    def __init__(self, db, browser=None, concurrency=32, per_host=4, page_timeout=20.0,
+                 max_retries=2, backoff=1.0, batch_size=20, flush_interval=1.0, max_age_days=None):
+        """
+        Args:
+            db (Database): 글을 저장할 데이터베이스
+            browser (BrunchCrawler): 검색과 렌더링에 쓸 브라우저 크롤러. 없으면 정적 HTML만 씁니다.
+            concurrency (int): 동시에 진행하는 요청 수
+            per_host (int): 호스트별 동시 요청 수
+            page_timeout (float): 글 하나에 쓸 수 있는 최대 시간(초). 재시도 포함
+            max_retries (int): 요청 실패 시 재시도 횟수
+            backoff (float): 재시도 대기 시간의 기준(초). 시도마다 두 배로 늘어납니다.
+            batch_size (int): 한 트랜잭션에 저장할 최대 글 수
+            flush_interval (float): 묶음이 덜 찼어도 저장하는 간격(초)
+            max_age_days (float): 이미 저장된 글도 이 기간보다 오래됐으면 다시 크롤링합니다.
+        """
+        self.db = db
+        self.browser = browser
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.page_timeout = page_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_age_days = max_age_days
+
+        # 여러 스레드가 각자 이벤트 루프로 run()을 부를 수 있으므로 통계는 락으로 보호합니다
+        self._stats_lock = threading.Lock()
+        self._counts = {
+            'submitted': 0,
+            'fetched': 0,
+            'not_modified': 0,
+            'rendered': 0,
+            'saved': 0,
+            'failed': 0,
+            'retried': 0,
+            'timeouts': 0,
+            'cancelled': 0,
+            'batches': 0
+        }
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._fetch_time = 0.0
+        self._write_time = 0.0
+
+    def run(self, article_urls, timeout=None):
+        """
+        crawl_and_save_articles()를 새 이벤트 루프에서 실행합니다. 작업 큐의 handler로 씁니다.
+
+        Returns:
+            dict: URL별 결과. 성공한 URL은 None, 실패한 URL은 오류 메시지
+        """
+        return asyncio.run(self.crawl_and_save_articles(article_urls, timeout))
+
+    async def search(self, query, sort_by='recency'):
+        """브런치 검색 결과. 검색 페이지는 스크립트로 그려지므로 브라우저 크롤러에 맡깁니다."""
+        if self.browser is None:
+            raise RuntimeError("검색에는 브라우저 크롤러가 필요합니다")
+        return await asyncio.to_thread(self.browser.search, query, sort_by)
+
+    async def crawl(self, url):
+        """글 하나를 가져옵니다. 저장하지는 않습니다."""
+        async with self._open_run() as run:
+            return await asyncio.wait_for(self._crawl_page(run, url), self.page_timeout)
+
+    async def crawl_and_save_articles(self, article_urls, timeout=None):
+        """
+        주어진 URL들의 글을 동시에 크롤링하여 데이터베이스에 저장합니다.
+
+        Args:
+            article_urls (list): 크롤링할 글 URL 목록
+            timeout (float): 전체 제한 시간(초). 넘으면 남은 글은 취소하고 실패로 처리합니다.
+
+        Returns:
+            dict: URL별 결과. 성공한 URL은 None, 실패한 URL은 오류 메시지
+        """
+        existing = await asyncio.to_thread(self.db.existing_urls, article_urls, self.max_age_days)
+        urls = [url for url in dict.fromkeys(article_urls) if url not in existing]
+        DUPLICATES_SKIPPED.inc(len(existing))
+        if not urls:
+            return {}
+
+        validators = await asyncio.to_thread(self.db.get_validators, urls)
+        self._count('submitted', len(urls))
+
+        results = {}
+        writes = asyncio.Queue()
+
+        async with self._open_run() as run:
+            writer = asyncio.create_task(self._write_loop(writes, results))
+            tasks = {
+                asyncio.create_task(self._crawl_one(run, url, validators.get(url), writes, results)): url
+                for url in urls
+            }
+
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                for task in pending:
+                    results.setdefault(tasks[task], "전체 제한 시간을 넘어 취소되었습니다")
+                self._count('cancelled', len(pending))
+
+            await writes.put(_STOP)
+            await writer
+
+        return results
+
+    def metrics(self):
+        """처리량, 동시 요청 수, 단계별 소요 시간을 반환합니다."""
+        with self._stats_lock:
+            counts = dict(self._counts)
+            finished = counts['fetched'] + counts['not_modified']
+            return {
+                'counts': counts,
+                'in_flight': self._in_flight,
+                'peak_in_flight': self._peak_in_flight,
+                'concurrency': self.concurrency,
+                'per_host': self.per_host,
+                'fetch_avg': self._fetch_time / finished if finished else 0.0,
+                'write_avg': self._write_time / counts['batches'] if counts['batches'] else 0.0
+            }
+
+    @asynccontextmanager
+    async def _open_run(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(headers=DEFAULT_HEADERS, connector=connector) as session:
+            yield _Run(session, self.concurrency)
+
+    async def _crawl_one(self, run, url, validator, writes, results):
+        """글 하나를 가져와 작성 태스크에 넘깁니다. 실패는 results에 기록합니다."""
+        etag, last_modified = validator or (None, None)
+        try:
+            # 제한 시간은 차례를 기다린 시간을 빼고 실제로 가져오기 시작한 뒤부터 잽니다
+            async with run.limit, run.host_limit(url, self.per_host):
+                article = await asyncio.wait_for(
+                    self._crawl_page(run, url, etag, last_modified), self.page_timeout
+                )
+            # None은 바뀌지 않은 글(304)입니다
+            await writes.put((url, article))
+
+        except asyncio.TimeoutError:
+            self._count('timeouts')
+            self._fail(results, url, f"{self.page_timeout}초 안에 끝나지 않았습니다")
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            self._fail(results, url, str(e))
+
+    async def _crawl_page(self, run, url, etag=None, last_modified=None):
+        html, etag, last_modified = await self._fetch_with_retries(run, url, etag, last_modified)
+        if html is None:
+            self._count('not_modified')
+            return None
+        self._count('fetched')
+
+        # 파싱은 CPU 작업이라 이벤트 루프를 막지 않도록 스레드에서 합니다
+        article = await asyncio.to_thread(self._parse, html, url)
+        if article is None:
+            if self.browser is None:
+                raise Exception("메인 콘텐츠를 찾을 수 없습니다")
+            # 정적 HTML에 본문이 없으면 브라우저로 렌더링합니다
+            article = await asyncio.to_thread(self.browser.render_article, url)
+            self._count('rendered')
+
+        article['etag'] = etag
+        article['last_modified'] = last_modified
+        return article
+
+    def _parse(self, html, url):
+        with span('parse'):
+            return brunch_parser.parse_article(brunch_parser.make_soup(html), url)
+
+    async def _fetch_with_retries(self, run, url, etag, last_modified):
+        attempt = 0
+        while True:
+            try:
+                return await self._fetch(run, url, etag, last_modified)
+            except aiohttp.ClientResponseError as e:
+                # 404 같은 클라이언트 오류는 다시 시도해도 소용없습니다 (429 제외)
+                if attempt >= self.max_retries or (e.status < 500 and e.status != 429):
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            attempt += 1
+            self._count('retried')
+            logger.info(f"{url} 가져오기 실패, {delay:.1f}초 후 재시도합니다 ({attempt}/{self.max_retries}): {str(error)}")
+            await asyncio.sleep(delay)
+
+    async def _fetch(self, run, url, etag, last_modified):
+        """
+        URL을 가져옵니다. 바뀌지 않았으면(304) html은 None입니다.
+
+        Returns:
+            tuple: (html, etag, last_modified)
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        self._track_in_flight(1)
+        started = time.monotonic()
+        try:
+            with span('http_fetch'):
+                async with run.session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        return None, etag, last_modified
+                    response.raise_for_status()
+                    html = await response.text()
+                    return html, response.headers.get('ETag'), response.headers.get('Last-Modified')
+        finally:
+            with self._stats_lock:
+                self._fetch_time += time.monotonic() - started
+            self._track_in_flight(-1)
+
+    async def _write_loop(self, writes, results):
+        """크롤링이 끝난 글을 모아 한 트랜잭션으로 저장하는 단일 작성 태스크"""
+        pending = []
+        loop = asyncio.get_running_loop()
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(writes.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            stopping = item is _STOP
+            if item is not None and not stopping:
+                pending.append(item)
+                if deadline is None:
+                    deadline = loop.time() + self.flush_interval
+
+            if pending and (stopping or len(pending) >= self.batch_size or loop.time() >= deadline):
+                await asyncio.to_thread(self._flush, pending, results)
+                pending = []
+                deadline = None
+
+            if stopping:
+                return
+
+    def _flush(self, pending, results):
+        started = time.monotonic()
+        touched = [url for url, article in pending if article is None]
+        articles = [article for _, article in pending if article is not None]
+
+        touched_ok = self.db.touch_articles(touched)
+        ok = self.db.save_articles(articles)
+        with self._stats_lock:
+            self._write_time += time.monotonic() - started
+            self._counts['batches'] += 1
+
+        for url in touched:
+            if touched_ok:
+                results[url] = None
+            else:
+                self._fail(results, url, "데이터베이스 저장 실패")
+
+        if ok:
+            self._count('saved', len(articles))
+            for article in articles:
+                results[article['url']] = None
+            return
+
+        # 묶음 저장이 실패하면 어느 글이 문제인지 하나씩 저장해 봅니다
+        for article in articles:
+            if self.db.save_article(article):
+                self._count('saved')
+                results[article['url']] = None
+            else:
+                self._fail(results, article['url'], "데이터베이스 저장 실패")
+
+    def _track_in_flight(self, delta):
+        with self._stats_lock:
+            self._in_flight += delta
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _fail(self, results, url, error):
+        logger.error(f"글 크롤링 중 오류 발생: {url} ({error})")
+        self._count('failed')
+        CRAWL_FAILURES.inc(engine='async')
+        results[url] = error
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self._counts[key] += n
+        if key in ('fetched', 'rendered', 'not_modified'):
+            PAGES_CRAWLED.inc(n, engine='async', result=key)
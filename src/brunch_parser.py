@@ -0,0 +1,199 @@
+from datetime import datetime
+from bs4 import BeautifulSoup
+import urllib.parse
+from text_processing import clean_text
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    # lxml이 없으면 느리지만 표준 라이브러리 파서를 씁니다
+    HTML_PARSER = 'html.parser'
+
+# 글 페이지로 판단하는 데 필요한 선택자
+REQUIRED_SELECTORS = ('.wrap_article', '.cover_title')
+
+# 검색 결과 카드 하나
+SEARCH_CARD_SELECTOR = 'li[data-articleuid]'
+
+# 본문에서 소제목으로 쓰는 태그
+HEADING_TAGS = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+
+def make_soup(html):
+    """HTML 문자열을 한 번에 파싱합니다. lxml이 있으면 lxml을 씁니다."""
+    return BeautifulSoup(html, HTML_PARSER)
+
+def absolute_url(url, base='https://brunch.co.kr'):
+    """상대 경로나 //로 시작하는 주소를 https 절대 주소로 바꿉니다."""
+    if not url:
+        return None
+    if url.startswith('//'):
+        return 'https:' + url
+    return urllib.parse.urljoin(base, url)
+
+def extract_brunch_content(soup):
+    content_parts = []
+
+    # 1. 커버 섹션 처리
+    cover = soup.select_one('.wrap_cover')
+    if cover:
+        # 제목
+        title_elem = cover.select_one('h1.cover_title')
+        if title_elem:
+            content_parts.append(f"제목: {clean_text(title_elem.text)}\n")
+
+        # 부제목
+        subtitle_elem = cover.select_one('p.cover_sub_title')
+        if subtitle_elem:
+            content_parts.append(f"부제: {clean_text(subtitle_elem.text)}\n")
+
+        # 작성자 정보
+        author_elem = cover.select_one('#wrapArticleInfo .text_author a')
+        if author_elem:
+            content_parts.append(f"작성자: {clean_text(author_elem.text)}")
+
+        # 작성일
+        date_elem = cover.select_one('#wrapArticleInfo .date')
+        if date_elem:
+            content_parts.append(f"작성일: {clean_text(date_elem.text)}")
+
+        content_parts.append("\n" + "="*50 + "\n")  # 구분선
+
+    # 2. 본문 섹션 처리
+    body = soup.select_one('.wrap_body')
+    if body:
+        # 모든 콘텐츠 아이템 처리
+        items = body.select('.wrap_item')
+        for item in items:
+            classes = item.get('class', [])
+
+            # 텍스트 아이템
+            if 'item_type_text' in classes:
+                text = clean_text(item.get_text())
+                if text:
+                    # 제목 (h1~h6)
+                    if item.name in HEADING_TAGS:
+                        content_parts.append(f"\n## {text}\n")
+                    else:
+                        content_parts.append(text + "\n")
+
+            # 이미지 아이템
+            elif 'item_type_img' in classes:
+                img = item.select_one('img')
+                if img:
+                    img_url = absolute_url(img.get('src', ''))
+                    if img_url:
+                        content_parts.append(f"\n[이미지: {img_url}]\n")
+
+                # 이미지 캡션
+                caption = item.select_one('.text_caption')
+                if caption:
+                    caption_text = clean_text(caption.get_text())
+                    if caption_text:
+                        content_parts.append(f"[이미지 설명: {caption_text}]\n")
+
+            # 인용구 아이템
+            elif 'item_type_quote' in classes:
+                quote = clean_text(item.get_text())
+                if quote:
+                    content_parts.append(f"\n> {quote}\n")
+
+            # 구분선
+            elif 'item_type_hr' in classes:
+                content_parts.append("\n---\n")
+
+    return "\n".join(content_parts)
+
+def has_article_content(soup):
+    """정적 HTML에 글 본문을 읽는 데 필요한 요소가 모두 있는지 확인합니다."""
+    return all(soup.select_one(selector) for selector in REQUIRED_SELECTORS)
+
+def parse_article(soup, url):
+    """
+    브런치 글 페이지 HTML에서 글 정보를 추출합니다.
+
+    Returns:
+        dict: 글 정보. 필요한 요소가 없으면 None
+    """
+    if not has_article_content(soup):
+        return None
+
+    title_elem = soup.select_one('h1.cover_title') or soup.select_one('.cover_title')
+    title = clean_text(title_elem.text) if title_elem else 'No Title'
+
+    # 작성자
+    author_elem = soup.select_one('#wrapArticleInfo .text_author a') or soup.select_one('.author_name')
+    author = clean_text(author_elem.text) if author_elem else None
+
+    # 썸네일 (있는 경우만)
+    thumbnail = None
+    cover_img = soup.select_one('.cover_img')
+    if cover_img and cover_img.get('src'):
+        thumbnail = cover_img['src']
+    else:
+        og_image = soup.select_one('meta[property="og:image"]')
+        if og_image and og_image.get('content'):
+            thumbnail = og_image['content']
+    thumbnail = absolute_url(thumbnail)
+
+    return {
+        'url': url,
+        'title': title or 'No Title',
+        'content': extract_brunch_content(soup).strip(),
+        'author': author,
+        'thumbnail': thumbnail,
+        'domain': urllib.parse.urlparse(url).netloc,
+        'crawled_at': datetime.now()
+    }
+
+def _select_text(elem, selector):
+    found = elem.select_one(selector)
+    return clean_text(found.get_text(' ')) if found else None
+
+def iter_search_results(soup):
+    """
+    브런치 검색 결과 페이지 HTML에서 결과 카드를 하나씩 추출하는 대로 돌려줍니다.
+
+    제목, 링크, 미리보기가 없는 카드는 건너뜁니다.
+
+    Yields:
+        dict: title, content, url, thumbnail, author, time, comments
+    """
+    for card in soup.select(SEARCH_CARD_SELECTOR):
+        title = _select_text(card, '.tit_subject')
+        link = card.select_one('a.link_post')
+        content = _select_text(card, '.article_content')
+        if title is None or link is None or content is None:
+            continue
+
+        # 썸네일 (있는 경우만)
+        thumb = card.select_one('img.img_thumb')
+        thumbnail = absolute_url(thumb.get('src')) if thumb else None
+
+        # 작성자
+        author = _select_text(card, '.post_append span:last-child')
+        if author is None:
+            author = 'Unknown'
+        elif author.startswith('By '):
+            author = author[3:]
+
+        comments = _select_text(card, '.num_txt')
+
+        yield {
+            'title': title,
+            'content': content,
+            'url': absolute_url(link.get('href')),
+            'thumbnail': thumbnail,
+            'author': author,
+            'time': _select_text(card, '.publish_time'),
+            'comments': comments if comments is not None else '0'
+        }
+
+def parse_search_results(soup):
+    """
+    브런치 검색 결과 페이지 HTML에서 결과 카드를 모두 추출합니다.
+
+    Returns:
+        list: iter_search_results()가 돌려주는 dict 목록
+    """
+    return list(iter_search_results(soup))
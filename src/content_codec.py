@@ -0,0 +1,62 @@
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    # zstandard는 BODY_CODEC=zstd로 고를 때와 zstd로 저장된 본문을 읽을 때만 필요합니다
+    zstandard = None
+
+CODEC_PLAIN = 'plain'
+CODEC_ZLIB = 'zlib'
+CODEC_ZSTD = 'zstd'
+
+# 새로 저장하는 본문에 쓰는 코덱. 읽을 때는 행마다 저장된 코덱을 따릅니다
+# 기본은 표준 라이브러리 zlib이고, zstd는 BODY_CODEC 환경 변수로 골랐을 때만 씁니다
+DEFAULT_CODEC = os.environ.get('BODY_CODEC', CODEC_ZLIB)
+if DEFAULT_CODEC not in (CODEC_PLAIN, CODEC_ZLIB, CODEC_ZSTD):
+    raise ValueError(f"BODY_CODEC에 알 수 없는 코덱을 지정했습니다: {DEFAULT_CODEC}")
+if DEFAULT_CODEC == CODEC_ZSTD and zstandard is None:
+    # 저장할 때마다 실패하지 않도록 시작할 때 바로 알립니다
+    raise ImportError("BODY_CODEC=zstd를 쓰려면 zstandard 패키지가 필요합니다")
+
+# 이보다 짧은 본문은 압축해도 거의 줄지 않으므로 그대로 저장합니다
+MIN_COMPRESS_BYTES = 128
+
+def compress(text, codec=None):
+    """
+    본문을 압축합니다.
+
+    Returns:
+        tuple: (코덱 이름, bytes)
+    """
+    raw = (text or '').encode('utf-8')
+    codec = codec or DEFAULT_CODEC
+
+    if len(raw) < MIN_COMPRESS_BYTES or codec == CODEC_PLAIN:
+        return CODEC_PLAIN, raw
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard 패키지가 설치되어 있지 않습니다")
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=9).compress(raw)
+    if codec == CODEC_ZLIB:
+        return CODEC_ZLIB, zlib.compress(raw, 9)
+    raise ValueError(f"알 수 없는 코덱입니다: {codec}")
+
+def decompress(codec, data):
+    """compress()로 저장한 본문을 문자열로 되돌립니다."""
+    if data is None:
+        return None
+    if isinstance(data, str):
+        return data
+    if codec == CODEC_PLAIN:
+        raw = data
+    elif codec == CODEC_ZLIB:
+        raw = zlib.decompress(data)
+    elif codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd로 압축된 본문을 읽으려면 zstandard 패키지가 필요합니다")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        raise ValueError(f"알 수 없는 코덱입니다: {codec}")
+    return bytes(raw).decode('utf-8')
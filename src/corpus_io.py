@@ -0,0 +1,214 @@
+"""
+글 전체를 NDJSON/CSV로 내보내고 다시 가져옵니다.
+
+내보내기는 Database.iter_articles()로 묶음씩 읽어 한 줄씩 쓰므로 글 수와 상관없이 메모리를 일정하게 씁니다.
+가져오기는 Database.bulk_import()로 묶음마다 한 트랜잭션으로 저장하고 인덱스는 끝난 뒤 한 번에 만듭니다.
+.gz 파일은 자동으로 압축하거나 풉니다. .db 파일도 가져올 수 있습니다 (예전 brunch_articles.db 등).
+
+    python src/corpus_io.py export --db newsletter.db --since 2025-01-01 --domain brunch.co.kr -o articles.ndjson.gz
+    python src/corpus_io.py export --db newsletter.db --format csv -o articles.csv
+    python src/corpus_io.py import --db new.db articles.ndjson.gz brunch_articles.db
+"""
+from datetime import datetime
+import argparse
+import sqlite3
+import logging
+import gzip
+import json
+import zlib
+import csv
+import io
+import os
+import sys
+from database import Database, read_legacy_articles
+
+logger = logging.getLogger(__name__)
+
+# 내보내는 글의 필드. CSV는 이 순서로 열을 씁니다
+EXPORT_FIELDS = (
+    'url', 'title', 'content', 'author', 'thumbnail', 'domain',
+    'crawled_at', 'created_at', 'etag', 'last_modified'
+)
+
+FORMATS = ('ndjson', 'csv')
+
+# gzip 압축 수준. gzip.open()의 기본값 9는 6보다 몇 배 느리지만 크기는 거의 같습니다
+GZIP_LEVEL = 6
+
+# 본문이 긴 글도 CSV 한 칸에 들어가도록 필드 길이 제한을 풉니다
+csv.field_size_limit(2 ** 31 - 1)
+
+def iter_ndjson(articles):
+    """글마다 JSON 한 줄을 돌려줍니다."""
+    for article in articles:
+        yield json.dumps({field: article.get(field) for field in EXPORT_FIELDS}, ensure_ascii=False) + '\n'
+
+def iter_csv(articles):
+    """머리 줄과 글마다 CSV 한 줄을 돌려줍니다. 없는 값은 빈 칸입니다."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(row):
+        writer.writerow(row)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(EXPORT_FIELDS)
+    for article in articles:
+        yield line(['' if article.get(field) is None else article.get(field) for field in EXPORT_FIELDS])
+
+def iter_export(articles, fmt='ndjson'):
+    """fmt('ndjson' 또는 'csv') 형식의 줄을 돌려줍니다."""
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    return iter_ndjson(articles) if fmt == 'ndjson' else iter_csv(articles)
+
+def gzip_chunks(chunks, level=GZIP_LEVEL, flush_bytes=64 * 1024):
+    """
+    문자열 조각들을 gzip으로 압축하며 돌려줍니다. 응답 스트림에 바로 쓸 수 있습니다.
+
+    압축기가 모은 출력이 flush_bytes를 넘을 때마다 내보내 메모리를 일정하게 씁니다.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    pending = []
+    size = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            pending.append(data)
+            size += len(data)
+        if size >= flush_bytes:
+            yield b''.join(pending)
+            pending, size = [], 0
+    pending.append(compressor.flush())
+    yield b''.join(pending)
+
+def read_ndjson(lines):
+    """NDJSON 줄에서 글을 읽습니다. 빈 줄은 건너뜁니다."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{number}번째 줄을 읽을 수 없습니다: {str(e)}")
+
+def read_csv(lines):
+    """iter_csv()로 쓴 CSV에서 글을 읽습니다. 빈 칸은 None입니다."""
+    for row in csv.DictReader(lines):
+        yield {field: row.get(field) or None for field in EXPORT_FIELDS}
+
+def _open_text(path, mode):
+    # 이름이 .gz로 끝나거나(쓰기) gzip 헤더로 시작하면(읽기) 압축 파일로 엽니다
+    if 'w' in mode:
+        compressed = path.endswith('.gz')
+    else:
+        with open(path, 'rb') as f:
+            compressed = f.read(2) == b'\x1f\x8b'
+    if compressed:
+        return gzip.open(path, mode + 't', compresslevel=GZIP_LEVEL, encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+def detect_format(path):
+    """파일 이름으로 형식을 고릅니다: 'db', 'csv' 또는 'ndjson'"""
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.db') or name.endswith('.sqlite'):
+        return 'db'
+    return 'csv' if name.endswith('.csv') else 'ndjson'
+
+def export_file(db, path, fmt=None, **filters):
+    """
+    글을 파일로 내보냅니다. path가 '-'면 표준 출력에 씁니다.
+
+    Args:
+        fmt (str): 'ndjson' 또는 'csv'. 없으면 파일 이름으로 고릅니다.
+        filters: Database.iter_articles()의 since, until, domain, content
+
+    Returns:
+        int: 내보낸 글 수
+    """
+    fmt = fmt or ('ndjson' if path == '-' else detect_format(path))
+    count = 0
+
+    def counted(articles):
+        nonlocal count
+        for article in articles:
+            count += 1
+            yield article
+
+    lines = iter_export(counted(db.iter_articles(**filters)), fmt)
+    if path == '-':
+        sys.stdout.writelines(lines)
+    else:
+        with _open_text(path, 'w') as f:
+            f.writelines(lines)
+    return count
+
+def read_file(path, fmt=None):
+    """덤프 파일이나 예전 DB 파일에서 글을 하나씩 읽습니다."""
+    fmt = fmt or detect_format(path)
+    if fmt == 'db':
+        source = sqlite3.connect(f'file:{os.path.abspath(path)}?mode=ro', uri=True)
+        try:
+            yield from read_legacy_articles(source)
+        finally:
+            source.close()
+        return
+
+    with _open_text(path, 'r') as f:
+        yield from (read_csv(f) if fmt == 'csv' else read_ndjson(f))
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=os.environ.get('NEWSLETTER_DB', 'newsletter.db'), help='데이터베이스 파일')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='글을 NDJSON/CSV로 내보냅니다')
+    export.add_argument('-o', '--output', default='-', help="출력 파일. .gz로 끝나면 gzip으로 압축합니다 ('-'는 표준 출력)")
+    export.add_argument('--format', choices=FORMATS, help='없으면 출력 파일 이름으로 고릅니다')
+    export.add_argument('--since', type=_parse_date, help='crawled_at이 이 날짜(YYYY-MM-DD) 이후인 글만')
+    export.add_argument('--until', type=_parse_date, help='crawled_at이 이 날짜(YYYY-MM-DD)까지인 글만')
+    export.add_argument('--domain', help='이 도메인의 글만')
+    export.add_argument('--no-content', action='store_true', help='본문을 빼고 내보냅니다 (가져오기용으로는 쓰지 마세요)')
+
+    load = commands.add_parser('import', help='NDJSON/CSV 덤프나 DB 파일의 글을 가져옵니다')
+    load.add_argument('paths', nargs='+', help='덤프 파일 (.ndjson, .csv, .db. 뒤에 .gz를 붙여도 됩니다)')
+    load.add_argument('--format', choices=FORMATS + ('db',), help='없으면 파일 이름으로 고릅니다')
+    load.add_argument('--batch-size', type=int, default=1000, help='한 트랜잭션에 저장할 글 수')
+    load.add_argument('--skip-existing', action='store_true', help='이미 저장된 URL의 글은 덮어쓰지 않습니다')
+    load.add_argument('--no-defer-indexes', action='store_true',
+                      help='인덱스를 지우지 않고 글마다 갱신합니다 (큰 DB에 적은 글을 더할 때)')
+
+    args = parser.parse_args(argv)
+    # 표준 출력으로 내보낼 때 진행 로그가 섞이지 않도록 로그는 표준 오류로 보냅니다
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    db = Database(args.db)
+    db.setup()
+    try:
+        if args.command == 'export':
+            count = export_file(
+                db, args.output, args.format,
+                since=args.since, until=args.until, domain=args.domain, content=not args.no_content
+            )
+            logger.info(f"글 {count}개를 내보냈습니다")
+        else:
+            for path in args.paths:
+                counts = db.bulk_import(
+                    read_file(path, args.format),
+                    batch_size=args.batch_size,
+                    defer_indexes=not args.no_defer_indexes,
+                    skip_existing=args.skip_existing
+                )
+                logger.info(f"{path}: {counts}")
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+from datetime import datetime
+import sqlite3
+import threading
+import logging
+import database
+
+logger = logging.getLogger(__name__)
+
+class QueueFull(Exception):
+    """대기 중인 작업이 너무 많아 새 작업을 받을 수 없을 때 발생합니다."""
+    pass
+
+class CrawlJobQueue:
+    """
+    SQLite 테이블에 저장되는 크롤링 작업 큐입니다.
+
+    작업은 URL당 하나만 존재하므로 여러 검색이 같은 글을 넣어도 한 번만 크롤링합니다.
+    고정된 수의 작업 스레드가 작업을 묶음으로 가져가 handler에 넘기고,
+    프로세스가 재시작되면 실행 중이던 작업은 다시 대기 상태로 돌아갑니다.
+    """
+
+    def __init__(self, db_path, handler, workers=2, batch_size=10,
+                 max_pending=500, max_attempts=3, poll_interval=5.0):
+        """
+        Args:
+            db_path (str): 작업 테이블을 둘 데이터베이스 경로
+            handler (callable): URL 목록을 받아 URL별 결과(성공 None, 실패 오류 메시지)를 반환하는 함수
+            workers (int): 작업 스레드 수
+            batch_size (int): 작업 스레드가 한 번에 가져가는 작업 수
+            max_pending (int): 대기 중인 작업 수 상한. 넘으면 enqueue()가 QueueFull을 발생시킵니다.
+            max_attempts (int): 실패한 작업을 다시 시도하는 최대 횟수
+            poll_interval (float): 새 작업이 있는지 확인하는 간격(초)
+        """
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._stopping = False
+
+    def _connect(self):
+        # Database와 같은 WAL/busy_timeout 설정으로 엽니다
+        return database.connect(self.db_path)
+
+    def setup(self):
+        """작업 테이블을 만들고 중단된 작업을 대기 상태로 되돌립니다."""
+        conn = self._connect()
+        c = conn.cursor()
+
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at DATETIME,
+                updated_at DATETIME
+            )
+        ''')
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_crawl_jobs_status
+            ON crawl_jobs (status, id)
+        ''')
+
+        # 이전 프로세스가 처리하다 만 작업
+        c.execute('''
+            UPDATE crawl_jobs SET status = 'pending', updated_at = ?
+            WHERE status = 'running'
+        ''', (self._now(),))
+        if c.rowcount:
+            logger.info(f"중단된 크롤링 작업 {c.rowcount}개를 다시 대기열에 넣었습니다")
+
+        conn.commit()
+        conn.close()
+
+    def start(self):
+        """작업 스레드를 띄웁니다."""
+        if self._threads:
+            return
+
+        self._stopping = False
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work_loop, name=f'crawl-job-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """작업 스레드에 종료를 알리고 처리 중인 묶음이 끝날 때까지 기다립니다."""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enqueue(self, urls):
+        """
+        URL들을 크롤링 작업으로 등록합니다. 기다리지 않고 바로 반환합니다.
+
+        이미 대기 중이거나 실행 중인 URL은 건너뛰고, 끝났거나 실패한 URL은 다시 대기 상태로 만듭니다.
+
+        Returns:
+            dict: {'queued': 새로 등록한 작업 수, 'duplicates': 이미 진행 중이라 건너뛴 수}
+
+        Raises:
+            QueueFull: 새로 등록할 작업까지 더하면 대기 중인 작업이 max_pending을 넘을 때
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {'queued': 0, 'duplicates': 0}
+
+        conn = self._connect()
+        c = conn.cursor()
+
+        try:
+            # 쓰기 잠금을 먼저 잡아 대기 작업 수 확인과 등록 사이에 다른 요청이 끼어들지 못하게 합니다
+            c.execute('BEGIN IMMEDIATE')
+
+            # 이미 대기 중이거나 실행 중인 URL은 상한 계산에서 빼고 건너뜁니다
+            active = set()
+            for n in range(0, len(urls), 500):
+                chunk = urls[n:n + 500]
+                placeholders = ','.join('?' * len(chunk))
+                c.execute(
+                    f"SELECT url FROM crawl_jobs WHERE url IN ({placeholders}) AND status IN ('pending', 'running')",
+                    chunk
+                )
+                active.update(row[0] for row in c.fetchall())
+            new_urls = [url for url in urls if url not in active]
+
+            c.execute("SELECT COUNT(*) FROM crawl_jobs WHERE status = 'pending'")
+            pending = c.fetchone()[0]
+            if new_urls and pending + len(new_urls) > self.max_pending:
+                raise QueueFull(f"대기 중인 크롤링 작업이 너무 많습니다 ({pending}/{self.max_pending})")
+
+            now = self._now()
+            queued = 0
+            for url in new_urls:
+                c.execute('''
+                    INSERT INTO crawl_jobs (url, status, attempts, created_at, updated_at)
+                    VALUES (?, 'pending', 0, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        status = 'pending', attempts = 0, error = NULL, updated_at = excluded.updated_at
+                    WHERE status IN ('done', 'failed')
+                ''', (url, now, now))
+                queued += c.rowcount
+
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            raise
+
+        finally:
+            conn.close()
+
+        if queued:
+            with self._wakeup:
+                self._wakeup.notify_all()
+
+        return {'queued': queued, 'duplicates': len(urls) - queued}
+
+    def get_job(self, job_id):
+        """작업 하나의 상태를 조회합니다."""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        row = conn.execute('SELECT * FROM crawl_jobs WHERE id = ?', (job_id,)).fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def list_jobs(self, status=None, limit=50):
+        """최근 작업 목록을 조회합니다."""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        if status:
+            rows = conn.execute(
+                'SELECT * FROM crawl_jobs WHERE status = ? ORDER BY id DESC LIMIT ?',
+                (status, limit)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                'SELECT * FROM crawl_jobs ORDER BY id DESC LIMIT ?',
+                (limit,)
+            ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        """상태별 작업 수를 반환합니다."""
+        conn = self._connect()
+        rows = conn.execute('SELECT status, COUNT(*) FROM crawl_jobs GROUP BY status').fetchall()
+        conn.close()
+
+        stats = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        stats.update(dict(rows))
+        stats['max_pending'] = self.max_pending
+        stats['workers'] = self.workers
+        return stats
+
+    def _work_loop(self):
+        while not self._stopping:
+            try:
+                jobs = self._claim()
+            except Exception as e:
+                logger.error(f"크롤링 작업을 가져오는 중 오류 발생: {str(e)}")
+                jobs = []
+
+            if not jobs:
+                with self._wakeup:
+                    if not self._stopping:
+                        self._wakeup.wait(self.poll_interval)
+                continue
+
+            urls = [url for _, url, _ in jobs]
+            try:
+                results = self.handler(urls) or {}
+            except Exception as e:
+                logger.error(f"크롤링 작업 처리 중 오류 발생: {str(e)}")
+                results = {url: str(e) for url in urls}
+
+            self._complete(jobs, results)
+
+    def _claim(self):
+        conn = self._connect()
+        c = conn.cursor()
+
+        try:
+            c.execute('BEGIN IMMEDIATE')
+            c.execute('''
+                SELECT id, url, attempts FROM crawl_jobs
+                WHERE status = 'pending'
+                ORDER BY id
+                LIMIT ?
+            ''', (self.batch_size,))
+            jobs = c.fetchall()
+
+            if jobs:
+                c.executemany('''
+                    UPDATE crawl_jobs SET status = 'running', attempts = attempts + 1, updated_at = ?
+                    WHERE id = ?
+                ''', [(self._now(), job_id) for job_id, _, _ in jobs])
+
+            conn.commit()
+            return jobs
+
+        except Exception:
+            conn.rollback()
+            raise
+
+        finally:
+            conn.close()
+
+    def _complete(self, jobs, results):
+        now = self._now()
+        updates = []
+        for job_id, url, attempts in jobs:
+            # handler가 결과를 돌려주지 않은 URL(예: 이미 저장된 글)은 완료로 봅니다
+            error = results.get(url)
+            if error is None:
+                updates.append(('done', None, now, job_id))
+            elif attempts + 1 < self.max_attempts:
+                updates.append(('pending', error, now, job_id))
+            else:
+                updates.append(('failed', error, now, job_id))
+
+        conn = self._connect()
+        try:
+            conn.executemany(
+                'UPDATE crawl_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?',
+                updates
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _now(self):
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,394 @@
+import requests
+import threading
+import logging
+import random
+import queue
+import time
+import urllib.parse
+import brunch_parser
+# CrawlPipeline.metrics()와 이름이 겹치지 않도록 필요한 것만 가져옵니다
+from metrics import CRAWL_FAILURES, PAGES_CRAWLED, span
+
+logger = logging.getLogger(__name__)
+
+# 큐에 넣어 스레드를 종료시키는 표시
+_STOP = object()
+
+class TokenBucket:
+    """초당 rate개의 토큰이 차는 버킷입니다. 최대 capacity개까지 몰아서 쓸 수 있습니다."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 기다립니다. 기다린 시간(초)을 반환합니다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+class RateLimiter:
+    """도메인별 토큰 버킷으로 같은 호스트에 보내는 요청 속도를 제한합니다."""
+
+    def __init__(self, rate=2.0, burst=2):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        domain = urllib.parse.urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(domain)
+            if bucket is None:
+                bucket = self._buckets[domain] = TokenBucket(self.rate, self.burst)
+        return bucket.acquire()
+
+class CrawlBatch:
+    """submit()으로 넣은 URL 묶음의 진행 상황입니다."""
+
+    def __init__(self, urls):
+        self.urls = list(urls)
+        self.results = {}   # url -> None(성공) 또는 오류 메시지
+        self.validators = {}  # url -> (etag, last_modified). 조건부 요청에 씁니다
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if not self.urls:
+            self._done.set()
+
+    def _finish(self, url, error=None):
+        with self._lock:
+            self.results[url] = error
+            if len(self.results) >= len(self.urls):
+                self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        묶음의 모든 URL이 처리될 때까지 기다립니다.
+
+        Returns:
+            dict: URL별 결과. 성공한 URL은 None, 실패한 URL은 오류 메시지
+        """
+        self._done.wait(timeout)
+        with self._lock:
+            return dict(self.results)
+
+class CrawlPipeline:
+    """
+    가져오기 → 파싱 → 저장 단계를 큐로 연결한 크롤링 파이프라인입니다.
+
+    가져오기는 fetch_workers개의 스레드가 도메인별 속도 제한 안에서 동시에 처리하고,
+    저장은 스레드 하나가 여러 글을 모아 한 트랜잭션으로 씁니다.
+    """
+
+    def __init__(self, fetch, db, render=None, fetch_workers=4, parse_workers=1,
+                 rate=2.0, burst=2, max_retries=3, backoff=1.0,
+                 batch_size=20, flush_interval=2.0, queue_size=200):
+        """
+        Args:
+            fetch (callable): (url, etag, last_modified) -> FetchResult. 브라우저 없이 페이지를 가져옵니다.
+            db (Database): 글을 저장할 데이터베이스
+            render (callable): url -> 글 정보(dict). 정적 HTML에 본문이 없을 때 브라우저로 가져옵니다.
+            fetch_workers (int): 가져오기 스레드 수
+            parse_workers (int): 파싱 스레드 수
+            rate (float): 도메인별 초당 요청 수
+            burst (int): 도메인별로 한 번에 몰아 보낼 수 있는 요청 수
+            max_retries (int): 가져오기 실패 시 재시도 횟수
+            backoff (float): 첫 재시도 대기 시간(초). 재시도마다 두 배로 늘어납니다.
+            batch_size (int): 한 트랜잭션에 저장할 최대 글 수
+            flush_interval (float): 글이 batch_size만큼 모이지 않아도 저장하는 간격(초)
+            queue_size (int): 단계 사이 큐의 최대 길이
+        """
+        self.fetch = fetch
+        self.render = render
+        self.db = db
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.limiter = RateLimiter(rate, burst)
+
+        # 가져오기 큐는 submit()이 막히지 않도록 크기 제한을 두지 않습니다
+        self._fetch_queue = queue.Queue()
+        self._parse_queue = queue.Queue(queue_size)
+        self._write_queue = queue.Queue(queue_size)
+
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._started_at = None
+        self._counts = {
+            'submitted': 0,
+            'fetched': 0,
+            'not_modified': 0,
+            'rendered': 0,
+            'parsed': 0,
+            'saved': 0,
+            'failed': 0,
+            'retried': 0,
+            'batches': 0
+        }
+        self._rate_wait = 0.0
+        self._fetch_time = 0.0
+        self._write_time = 0.0
+
+    def start(self):
+        """단계별 스레드를 띄웁니다. 이미 떠 있으면 아무것도 하지 않습니다."""
+        with self._start_lock:
+            if self._threads:
+                return
+
+            self._started_at = time.monotonic()
+            for i in range(self.fetch_workers):
+                self._spawn(self._fetch_loop, f'crawl-fetch-{i}')
+            for i in range(self.parse_workers):
+                self._spawn(self._parse_loop, f'crawl-parse-{i}')
+            self._spawn(self._write_loop, 'crawl-write')
+
+    def submit(self, urls):
+        """
+        URL 목록을 파이프라인에 넣습니다. 기다리지 않고 바로 반환합니다.
+
+        Returns:
+            CrawlBatch: 진행 상황을 확인하거나 wait()로 끝날 때까지 기다릴 수 있습니다.
+        """
+        self.start()
+        batch = CrawlBatch(urls)
+        # 이미 저장된 글은 조건부 요청으로 바뀌었을 때만 다시 받습니다
+        batch.validators = self.db.get_validators(batch.urls)
+        self._count('submitted', len(batch.urls))
+        for url in batch.urls:
+            self._fetch_queue.put((batch, url, False))
+        return batch
+
+    def run(self, urls, timeout=None):
+        """URL 목록을 넣고 모두 처리될 때까지 기다립니다."""
+        return self.submit(urls).wait(timeout)
+
+    def stop(self):
+        """처리 중인 글을 저장한 뒤 스레드를 종료합니다."""
+        with self._start_lock:
+            threads, self._threads = self._threads, []
+        if not threads:
+            return
+
+        for _ in range(self.fetch_workers):
+            self._fetch_queue.put(_STOP)
+        for thread in threads[:self.fetch_workers]:
+            thread.join()
+        for _ in range(self.parse_workers):
+            self._parse_queue.put(_STOP)
+        for thread in threads[self.fetch_workers:-1]:
+            thread.join()
+        self._write_queue.put(_STOP)
+        threads[-1].join()
+
+    def metrics(self):
+        """처리량과 큐 길이를 반환합니다."""
+        with self._stats_lock:
+            counts = dict(self._counts)
+            rate_wait = self._rate_wait
+            fetch_time = self._fetch_time
+            write_time = self._write_time
+
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        fetches = counts['fetched'] + counts['not_modified'] + counts['rendered']
+        return {
+            **counts,
+            'writes': self.db.write_stats(),
+            'queue_depth': {
+                'fetch': self._fetch_queue.qsize(),
+                'parse': self._parse_queue.qsize(),
+                'write': self._write_queue.qsize()
+            },
+            'workers': {
+                'fetch': self.fetch_workers,
+                'parse': self.parse_workers
+            },
+            'elapsed': elapsed,
+            'throughput': counts['saved'] / elapsed if elapsed else 0.0,
+            'fetch_avg': fetch_time / fetches if fetches else 0.0,
+            'rate_limit_wait': rate_wait,
+            'write_avg': write_time / counts['batches'] if counts['batches'] else 0.0
+        }
+
+    def _spawn(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self._counts[key] += n
+        if key in ('fetched', 'rendered', 'not_modified'):
+            PAGES_CRAWLED.inc(n, engine='pipeline', result=key)
+
+    def _fetch_loop(self):
+        while True:
+            item = self._fetch_queue.get()
+            if item is _STOP:
+                return
+
+            batch, url, use_browser = item
+            try:
+                if use_browser:
+                    article = self._with_retries(self.render, url)
+                    self._count('rendered')
+                    self._write_queue.put((batch, url, article))
+                    continue
+
+                etag, last_modified = batch.validators.get(url, (None, None))
+                try:
+                    result = self._with_retries(lambda u: self.fetch(u, etag, last_modified), url)
+                except requests.RequestException as e:
+                    if self.render is None:
+                        raise
+                    # 브라우저 없이 가져오지 못하면 브라우저로 다시 시도합니다
+                    logger.info(f"HTTP 요청 실패, 브라우저로 다시 시도합니다: {url} ({str(e)})")
+                    self._fetch_queue.put((batch, url, True))
+                    continue
+
+                if result.not_modified:
+                    # 바뀌지 않은 글은 파싱하지 않고 crawled_at만 갱신합니다
+                    self._count('not_modified')
+                    self._write_queue.put((batch, url, None))
+                    continue
+
+                self._count('fetched')
+                self._parse_queue.put((batch, url, result))
+
+            except Exception as e:
+                self._fail(batch, url, e)
+
+    def _parse_loop(self):
+        while True:
+            item = self._parse_queue.get()
+            if item is _STOP:
+                return
+
+            batch, url, result = item
+            try:
+                with span('parse'):
+                    article = brunch_parser.parse_article(brunch_parser.make_soup(result.html), url)
+                if article is None:
+                    if self.render is None:
+                        raise Exception("메인 콘텐츠를 찾을 수 없습니다")
+                    # 정적 HTML에 본문이 없으면 브라우저로 렌더링합니다
+                    self._fetch_queue.put((batch, url, True))
+                    continue
+
+                article['etag'] = result.etag
+                article['last_modified'] = result.last_modified
+                self._count('parsed')
+                self._write_queue.put((batch, url, article))
+
+            except Exception as e:
+                self._fail(batch, url, e)
+
+    def _write_loop(self):
+        pending = []
+        deadline = None
+        stopping = False
+
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._write_queue.get(timeout=timeout)
+                if item is _STOP:
+                    stopping = True
+                else:
+                    pending.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+
+            if pending and (stopping or len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(pending)
+                pending = []
+                deadline = None
+
+    def _flush(self, pending):
+        started = time.monotonic()
+        touched = [(batch, url) for batch, url, article in pending if article is None]
+        pending = [item for item in pending if item[2] is not None]
+
+        touched_ok = self.db.touch_articles([url for _, url in touched])
+        ok = self.db.save_articles([article for _, _, article in pending])
+        with self._stats_lock:
+            self._write_time += time.monotonic() - started
+            self._counts['batches'] += 1
+
+        for batch, url in touched:
+            if touched_ok:
+                batch._finish(url)
+            else:
+                self._fail(batch, url, Exception("데이터베이스 저장 실패"))
+
+        if ok:
+            self._count('saved', len(pending))
+            for batch, url, article in pending:
+                logger.info(f"글을 저장했습니다: {article['title']}")
+                batch._finish(url)
+            return
+
+        # 묶음 저장이 실패하면 어느 글이 문제인지 하나씩 저장해 봅니다
+        for batch, url, article in pending:
+            if self.db.save_article(article):
+                self._count('saved')
+                batch._finish(url)
+            else:
+                self._fail(batch, url, Exception("데이터베이스 저장 실패"))
+
+    def _with_retries(self, fn, url):
+        attempt = 0
+        while True:
+            wait = self.limiter.acquire(url)
+            started = time.monotonic()
+            try:
+                return fn(url)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                self._count('retried')
+                logger.info(f"{url} 가져오기 실패, {delay:.1f}초 후 재시도합니다 ({attempt}/{self.max_retries}): {str(e)}")
+                time.sleep(delay)
+            finally:
+                with self._stats_lock:
+                    self._rate_wait += wait
+                    self._fetch_time += time.monotonic() - started
+
+    def _is_retryable(self, e):
+        # 404 같은 클라이언트 오류는 다시 시도해도 소용없습니다 (429 제외)
+        if isinstance(e, requests.HTTPError) and e.response is not None:
+            status = e.response.status_code
+            return status == 429 or status >= 500
+        return True
+
+    def _fail(self, batch, url, error):
+        logger.error(f"글 크롤링 중 오류 발생: {url} ({str(error)})")
+        self._count('failed')
+        CRAWL_FAILURES.inc(engine='pipeline')
+        batch._finish(url, str(error))
@@ -1,70 +1,1232 @@
 import sqlite3
 import os
-from datetime import datetime
-import re
+import threading
+from datetime import datetime, timedelta
+import json
+import html
+import base64
+import hashlib
 from collections import Counter
+import urllib.parse
+import logging
+import content_codec
+import near_duplicate
+import metrics
+from text_processing import count_keywords, map_documents
+
+logger = logging.getLogger(__name__)
+
+# setup()이 맞추는 스키마 버전. 스키마를 바꿀 때는 _migrate_vN()을 추가하고 이 값을 올립니다
+SCHEMA_VERSION = 3
+
+# 하나로 합치기 전에 따로 쓰던 DB 파일. import_legacy_databases()가 한 번씩 가져옵니다
+LEGACY_DATABASES = ('brunch_articles.db', os.path.join('instance', 'newsletter.db'))
+
+# 3글자 미만 단어로만 검색할 때 본문까지 훑는 최근 글 수. 본문을 풀어야 해서 전체를 훑으면 글 수에 비례해 느려집니다
+SHORT_TERM_SCAN_WINDOW = 1000
+
+# bulk_import()가 가져오는 동안 지웠다가 끝나고 한 번에 다시 만드는 인덱스
+DEFERRED_INDEXES = {
+    'idx_articles_crawled_at_id': 'articles (crawled_at DESC, id DESC)',
+    'idx_articles_domain_crawled_at': 'articles (domain, crawled_at DESC, id DESC)',
+    'idx_keyword_jobs_queued_at': 'keyword_jobs (queued_at)'
+}
+
+def connect(db_path, **kwargs):
+    """
+    이 앱의 SQLite 연결을 엽니다. 같은 DB 파일을 쓰는 모듈은 모두 이 함수로 연결해 설정을 맞춥니다.
+    
+    Args:
+        db_path (str): 데이터베이스 경로
+        **kwargs: sqlite3.connect()에 그대로 넘길 인자
+    """
+    conn = sqlite3.connect(db_path, timeout=30, **kwargs)
+    # 읽기와 쓰기가 서로 막지 않도록 WAL 모드를 씁니다 (DB 파일에 저장되는 설정)
+    conn.execute('PRAGMA journal_mode = WAL')
+    # WAL에서는 NORMAL로도 손상 없이 안전하고, 커밋마다 fsync하지 않아 쓰기가 빠릅니다
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute('PRAGMA busy_timeout = 30000')
+    # article_texts 뷰와 전문 검색 snippet()이 압축된 본문을 읽을 때 씁니다
+    conn.create_function('decompress_body', 2, content_codec.decompress, deterministic=True)
+    return conn
+    
+def migrate_inline_content(conn):
+    """
+    articles.content에 그대로 저장된 본문을 압축해 article_bodies로 옮기고 content 컬럼을 없앱니다.
+    
+    스키마 버전 1로 올릴 때 씁니다. 이미 옮긴 DB에서는 아무것도 하지 않습니다.
+    
+    Returns:
+        int: 옮긴 글 수
+    """
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS article_bodies (
+            article_id INTEGER PRIMARY KEY,
+            codec TEXT NOT NULL,
+            body BLOB NOT NULL
+        )
+    ''')
+    
+    c.execute('PRAGMA table_info(articles)')
+    if 'content' not in {row[1] for row in c.fetchall()}:
+        return 0
+        
+    rows = c.execute('''
+        SELECT id, content FROM articles
+        WHERE content IS NOT NULL
+          AND id NOT IN (SELECT article_id FROM article_bodies)
+    ''').fetchall()
+    c.executemany(
+        'INSERT INTO article_bodies (article_id, codec, body) VALUES (?, ?, ?)',
+        [(article_id,) + content_codec.compress(content) for article_id, content in rows]
+    )
+    
+    # content를 읽는 예전 전문 검색 트리거를 먼저 지워야 컬럼을 지울 수 있습니다
+    for trigger in ('articles_fts_ai', 'articles_fts_ad', 'articles_fts_au'):
+        c.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    try:
+        c.execute('ALTER TABLE articles DROP COLUMN content')
+    except sqlite3.OperationalError:
+        # DROP COLUMN은 SQLite 3.35 이상에서만 지원합니다. 그보다 낮으면 비워 두기만 합니다
+        c.execute('UPDATE articles SET content = NULL')
+    return len(rows)
+
+def _next_month(day):
+    """day가 속한 달의 다음 달 1일"""
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _like_pattern(term):
+    """term이 그대로 들어 있는지 찾는 LIKE 패턴. %, _, \\는 ESCAPE '\\'로 이스케이프합니다."""
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def _like_where(terms, columns, operator='AND'):
+    """terms가 모두(operator가 OR면 하나라도) columns 중 하나에 들어 있는 글을 찾는 조건과 인자"""
+    like = '(' + ' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in columns) + ')'
+    params = []
+    for term in terms:
+        params.extend([_like_pattern(term)] * len(columns))
+    return '(' + f' {operator} '.join([like] * len(terms)) + ')', params
+
+def url_domain(url):
+    """URL의 호스트 이름"""
+    return urllib.parse.urlparse(url or '').netloc or None
+
+def format_timestamp(value):
+    """
+    datetime이나 여러 형식의 시각 문자열을 'YYYY-MM-DD HH:MM:SS'로 맞춥니다.
+    
+    crawled_at 정렬과 키셋 페이지네이션이 문자열 비교라 모든 글이 같은 형식이어야 합니다.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value).replace('T', ' ')[:19]
+
+def read_legacy_articles(conn):
+    """
+    예전 DB 파일에서 글을 읽습니다. 다음 구조를 모두 읽을 수 있습니다.
+    
+    - newsletter.db / brunch_articles.db의 articles (본문이 content 컬럼이나 article_bodies에 있는 경우)
+    - instance/newsletter.db의 newsletters (SQLAlchemy 모델로 만든 테이블)
+    
+    SQLite의 CURRENT_TIMESTAMP와 SQLAlchemy의 utcnow로 넣은 시각은 UTC이므로 현지 시각으로 바꿉니다.
+    
+    Yields:
+        dict: _write_article()에 넘길 글
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    
+    if 'articles' in tables:
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(articles)')}
+        
+        def column(name, expression=None):
+            return (expression or f'a.{name}') if name in columns else 'NULL'
+            
+        if 'content' in columns:
+            body = 'NULL, a.content'
+            source = 'articles a'
+        elif 'article_bodies' in tables:
+            body = 'b.codec, b.body'
+            source = 'articles a LEFT JOIN article_bodies b ON b.article_id = a.id'
+        else:
+            body = 'NULL, NULL'
+            source = 'articles a'
+            
+        rows = conn.execute(f'''
+            SELECT a.url, a.title, {body}, {column('author')}, {column('thumbnail')}, {column('domain')},
+                   {column('crawled_at')}, {column('created_at', "datetime(a.created_at, 'localtime')")},
+                   {column('etag')}, {column('last_modified')}
+            FROM {source}
+            WHERE a.url IS NOT NULL
+            ORDER BY a.id
+        ''')
+        for url, title, codec, content, author, thumbnail, domain, crawled_at, created_at, etag, last_modified in rows:
+            yield {
+                'url': url,
+                'title': title,
+                'content': content_codec.decompress(codec, content),
+                'author': author,
+                'thumbnail': thumbnail,
+                'domain': domain,
+                'crawled_at': crawled_at,
+                'created_at': created_at,
+                'etag': etag,
+                'last_modified': last_modified
+            }
+            
+    if 'newsletters' in tables:
+        rows = conn.execute('''
+            SELECT url, title, content, domain,
+                   datetime(date, 'localtime'), datetime(created_at, 'localtime')
+            FROM newsletters
+            ORDER BY seq
+        ''')
+        for url, title, content, domain, date, created_at in rows:
+            yield {
+                'url': url,
+                'title': title,
+                'content': content,
+                'author': None,
+                'thumbnail': None,
+                'domain': domain,
+                'crawled_at': date,
+                'created_at': created_at
+            }
+
+def article_hash(article):
+    """글 내용이 바뀌었는지 비교하기 위한 해시를 만듭니다."""
+    parts = [article.get('title'), article.get('content'), article.get('author'), article.get('thumbnail')]
+    raw = '\x1f'.join(part or '' for part in parts)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
 
 class Database:
     def __init__(self, db_path='newsletter.db'):
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # 저장된 URL 집합. warm_known_urls()를 호출하기 전까지는 None입니다
+        self._known_urls = None
+        # 다시 크롤링한 글 중 실제로 다시 쓴 글과 건너뛴 글의 수
+        self._write_counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'not_modified': 0}
+        self._write_counts_lock = threading.Lock()
+        
+    def _connect(self):
+        """
+        현재 스레드의 연결을 반환합니다. 처음 호출할 때만 연결을 엽니다.
+        
+        스레드마다 연결을 하나씩 계속 쓰므로 준비된 문장 캐시도 요청 간에 재사용됩니다.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect(self.db_path, cached_statements=256, check_same_thread=False)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+        
+    def close(self):
+        """이 Database가 연 모든 스레드의 연결을 닫습니다. 프로세스 종료 시에 호출합니다."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
         
     def setup(self):
-        """데이터베이스와 테이블을 생성합니다."""
-        conn = sqlite3.connect(self.db_path)
+        """
+        데이터베이스를 현재 스키마 버전으로 만듭니다.
+        
+        PRAGMA user_version에 적용한 스키마 버전을 기록하고, 그보다 새 _migrate_vN()만 차례로 적용합니다.
+        """
+        conn = self._connect()
         c = conn.cursor()
         
-        # articles 테이블 생성
+        version = c.execute('PRAGMA user_version').fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.db_path}의 스키마 버전({version})이 이 코드({SCHEMA_VERSION})보다 새롭습니다")
+            
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            getattr(self, f'_migrate_v{target}')(conn)
+            c.execute(f'PRAGMA user_version = {target}')
+            conn.commit()
+            logger.info(f"{self.db_path} 스키마 버전: {target - 1} → {target}")
+            
+        # 대량 가져오기가 중간에 끊겨 빠진 인덱스가 있으면 다시 만듭니다
+        self._restore_deferred_indexes(conn)
+        
+        # 키워드 인덱스가 비어 있으면 기존 글을 모두 키워드 작업으로 넣습니다
+        c.execute('SELECT EXISTS (SELECT 1 FROM keyword_totals)')
+        has_index = c.fetchone()[0]
+        c.execute('SELECT EXISTS (SELECT 1 FROM keyword_jobs)')
+        has_jobs = c.fetchone()[0]
+        
+        if not has_index and not has_jobs:
+            self.enqueue_all_keywords()
+            
+    def _migrate_v1(self, conn):
+        """
+        버전 1: 스키마 버전을 기록하기 전의 구조. 이전 코드가 만든 어떤 newsletter.db도 이 구조로 맞춥니다.
+        """
+        c = conn.cursor()
+        
+        # articles 테이블 생성 (본문은 article_bodies에 압축해 따로 둡니다)
         c.execute('''
             CREATE TABLE IF NOT EXISTS articles (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 url TEXT UNIQUE,
                 title TEXT,
-                content TEXT,
                 author TEXT,
                 thumbnail TEXT,
-                crawled_at DATETIME
+                crawled_at DATETIME,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT
             )
         ''')
         
+        # 이전 버전에서 만든 테이블에 조건부 요청용 컬럼 추가
+        c.execute('PRAGMA table_info(articles)')
+        columns = {row[1] for row in c.fetchall()}
+        for column in ('etag', 'last_modified', 'content_hash'):
+            if column not in columns:
+                c.execute(f'ALTER TABLE articles ADD COLUMN {column} TEXT')
+        
+        # 이전 버전에서 articles에 그대로 저장한 본문을 압축해 옮깁니다
+        migrated = migrate_inline_content(conn)
+        
+        # 본문을 풀어 글 정보와 함께 보여 주는 뷰. 글 하나를 볼 때와 전문 검색 snippet()에서만 씁니다
+        c.execute('''
+            CREATE VIEW IF NOT EXISTS article_texts AS
+            SELECT a.id, a.url, a.title, decompress_body(b.codec, b.body) AS content,
+                   a.author, a.thumbnail, a.crawled_at
+            FROM articles a
+            LEFT JOIN article_bodies b ON b.article_id = a.id
+        ''')
+        
+        # 최신순 목록의 키셋 페이지네이션용 인덱스
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_articles_crawled_at_id
+            ON articles (crawled_at DESC, id DESC)
+        ''')
+        
+        # 글별 키워드 빈도 테이블. day/author는 일별 집계에 더한 날짜와 작성자입니다
+        c.execute("SELECT EXISTS (SELECT 1 FROM pragma_table_info('article_keywords') WHERE name = 'url')")
+        keywords_by_url = c.fetchone()[0]
+        if keywords_by_url:
+            c.execute('ALTER TABLE article_keywords RENAME TO article_keywords_old')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS article_keywords (
+                article_id INTEGER NOT NULL,
+                word TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                day TEXT,
+                author TEXT,
+                PRIMARY KEY (article_id, word)
+            ) WITHOUT ROWID
+        ''')
+        if keywords_by_url:
+            # URL로 묶던 예전 테이블은 글 id로 옮기고, 비어 있던 day/author도 글 정보로 채웁니다
+            c.execute('''
+                INSERT INTO article_keywords (article_id, word, count, day, author)
+                SELECT a.id, k.word, k.count,
+                       COALESCE(date(a.crawled_at), date('now', 'localtime')),
+                       COALESCE(a.author, '')
+                FROM article_keywords_old k
+                JOIN articles a ON a.url = k.url
+            ''')
+            c.execute('DROP TABLE article_keywords_old')
+        # 작성자별 기간 조회는 따로 집계하지 않고 이 인덱스로 article_keywords에서 합칩니다
+        c.execute('CREATE INDEX IF NOT EXISTS idx_article_keywords_author ON article_keywords (author, day)')
+        
+        # 전체 키워드 빈도 집계 테이블
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS keyword_totals (
+                word TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            )
+        ''')
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_keyword_totals_count
+            ON keyword_totals (count DESC)
+        ''')
+        
+        # 기간별/작성자별 키워드 집계 테이블. 글의 키워드를 반영할 때 함께 갱신합니다
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS keyword_daily (
+                day TEXT NOT NULL,
+                word TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (day, word)
+            ) WITHOUT ROWID
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS keyword_monthly (
+                month TEXT NOT NULL,
+                word TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (month, word)
+            ) WITHOUT ROWID
+        ''')
+        
+        # 기간 안에서 많이 나온 단어를 고르는 인덱스와 단어별 합계를 구하는 인덱스
+        c.execute('CREATE INDEX IF NOT EXISTS idx_keyword_daily_count ON keyword_daily (day, count)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_keyword_daily_word ON keyword_daily (word, day, count)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_keyword_monthly_count ON keyword_monthly (month, count)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_keyword_monthly_word ON keyword_monthly (word, month, count)')
+        
+        # 키워드를 아직 뽑지 않은 글. 저장할 때 넣고 KeywordIndexer가 백그라운드에서 처리합니다
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS keyword_jobs (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                queued_at DATETIME
+            )
+        ''')
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_keyword_jobs_queued_at
+            ON keyword_jobs (queued_at)
+        ''')
+        # 키워드 인덱스를 만든 추출기 이름 등
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS keyword_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        
+        # 제목/본문/작성자 전문 검색 인덱스
+        fts_created = self._create_fts(c)
+        
         conn.commit()
-        conn.close()
+        
+        if fts_created or migrated:
+            # 이미 저장된 글을 새 인덱스에 채웁니다
+            c.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+            conn.commit()
+        
+        # URL로 묶던 키워드를 옮겼으면 기간별 집계도 다시 만듭니다
+        if keywords_by_url:
+            self._rebuild_keyword_rollups(c)
+            conn.commit()
+        
+    def _migrate_v2(self, conn):
+        """
+        버전 2: WebCrawler(brunch_articles.db)와 같은 글 정보를 한 곳에 둡니다.
+        
+        - articles에 domain, created_at 추가 (기존 글은 URL과 crawled_at으로 채웁니다)
+        - article_texts 뷰에 domain, created_at 추가
+        - 도메인별 최신순 목록 인덱스
+        - 가져온 예전 DB 파일 기록 테이블
+        """
+        c = conn.cursor()
+        
+        c.execute('PRAGMA table_info(articles)')
+        columns = {row[1] for row in c.fetchall()}
+        for column, column_type in (('domain', 'TEXT'), ('created_at', 'DATETIME')):
+            if column not in columns:
+                c.execute(f'ALTER TABLE articles ADD COLUMN {column} {column_type}')
+        
+        rows = c.execute('SELECT id, url FROM articles WHERE domain IS NULL').fetchall()
+        c.executemany(
+            'UPDATE articles SET domain = ? WHERE id = ?',
+            [(url_domain(url), article_id) for article_id, url in rows]
+        )
+        c.execute('UPDATE articles SET created_at = crawled_at WHERE created_at IS NULL')
+        
+        # 전문 검색 인덱스가 읽는 title, content, author는 그대로 두고 열만 덧붙입니다
+        c.execute('DROP VIEW IF EXISTS article_texts')
+        c.execute('''
+            CREATE VIEW article_texts AS
+            SELECT a.id, a.url, a.title, decompress_body(b.codec, b.body) AS content,
+                   a.author, a.thumbnail, a.crawled_at, a.domain, a.created_at
+            FROM articles a
+            LEFT JOIN article_bodies b ON b.article_id = a.id
+        ''')
+        
+        # url은 UNIQUE 제약의 인덱스, crawled_at은 idx_articles_crawled_at_id를 씁니다
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_articles_domain_crawled_at
+            ON articles (domain, crawled_at DESC, id DESC)
+        ''')
+        
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS legacy_imports (
+                path TEXT PRIMARY KEY,
+                imported_at DATETIME,
+                articles INTEGER
+            )
+        ''')
+        
+    def _migrate_v3(self, conn):
+        """
+        버전 3: 거의 같은 글(다른 주소로 다시 올린 글, 머리말/꼬리말만 다른 글)을 대표 글에 묶습니다.
+        
+        - articles.canonical_id: 대표 글의 id. 대표 글 자신은 NULL입니다
+        - article_signatures, article_lsh: 본문의 MinHash 서명과 LSH 버킷 (near_duplicate 참고)
+        - 대표 글만 보여 주는 article_search_texts 뷰. 전문 검색 인덱스는 이 뷰를 원본으로 다시 만듭니다
+        - 기존 글은 먼저 저장된 글을 대표로 묶고, 중복 글의 키워드를 집계에서 뺍니다
+        """
+        c = conn.cursor()
+        
+        c.execute('PRAGMA table_info(articles)')
+        if 'canonical_id' not in {row[1] for row in c.fetchall()}:
+            c.execute('ALTER TABLE articles ADD COLUMN canonical_id INTEGER')
+        # 중복 글이 적으므로 대표 글별 중복 글 조회용 인덱스는 중복 글만 담습니다
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS idx_articles_canonical_id
+            ON articles (canonical_id) WHERE canonical_id IS NOT NULL
+        ''')
+        
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS article_signatures (
+                article_id INTEGER PRIMARY KEY,
+                signature BLOB NOT NULL
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS article_lsh (
+                bucket INTEGER NOT NULL,
+                article_id INTEGER NOT NULL,
+                PRIMARY KEY (bucket, article_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        c.execute('DROP VIEW IF EXISTS article_texts')
+        c.execute('''
+            CREATE VIEW article_texts AS
+            SELECT a.id, a.url, a.title, decompress_body(b.codec, b.body) AS content,
+                   a.author, a.thumbnail, a.crawled_at, a.domain, a.created_at, a.canonical_id
+            FROM articles a
+            LEFT JOIN article_bodies b ON b.article_id = a.id
+        ''')
+        c.execute('''
+            CREATE VIEW IF NOT EXISTS article_search_texts AS
+            SELECT id, url, title, content, author, thumbnail, crawled_at, domain, created_at
+            FROM article_texts
+            WHERE canonical_id IS NULL
+        ''')
+        
+        # 먼저 저장된 글이 대표가 되도록 id 순서로 서명을 만들며 묶습니다
+        duplicates = 0
+        for article_id, content in conn.execute('SELECT id, content FROM article_texts ORDER BY id').fetchall():
+            if self._link_duplicate(c, article_id, content) is not None:
+                duplicates += 1
+        
+        c.execute('''
+            DELETE FROM article_keywords
+            WHERE article_id IN (SELECT id FROM articles WHERE canonical_id IS NOT NULL)
+        ''')
+        self._rebuild_keyword_rollups(c)
+        
+        if self._create_fts(c, 'article_search_texts'):
+            c.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+        if duplicates:
+            logger.info(f"거의 같은 글 {duplicates}개를 대표 글에 묶었습니다")
+        
+    def _create_fts(self, c, content='article_texts'):
+        """
+        content 뷰를 원본으로 하는 FTS5 인덱스를 만듭니다. 인덱스는 _write_article()이 함께 갱신합니다.
+        
+        Returns:
+            bool: 인덱스를 새로 만들었으면 True
+        """
+        c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'")
+        row = c.fetchone()
+        if row and f"'{content}'" in row[0]:
+            return False
+        if row:
+            # 본문을 articles나 다른 뷰에서 읽던 예전 인덱스는 지우고 다시 만듭니다
+            c.execute('DROP TABLE articles_fts')
+            
+        # 한국어는 띄어쓰기 단위 토큰으로는 조사 때문에 검색이 잘 안 되므로 trigram 토크나이저를 씁니다
+        try:
+            c.execute(f'''
+                CREATE VIRTUAL TABLE articles_fts USING fts5(
+                    title, content, author,
+                    content='{content}', content_rowid='id',
+                    tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            # trigram은 SQLite 3.34 이상에서만 지원합니다
+            c.execute(f'''
+                CREATE VIRTUAL TABLE articles_fts USING fts5(
+                    title, content, author,
+                    content='{content}', content_rowid='id'
+                )
+            ''')
+            
+        return True
+        
+    def _link_duplicate(self, c, article_id, content, index=True):
+        """
+        글의 MinHash 서명을 저장하고, LSH 버킷이 겹치는 글 중 유사도가 THRESHOLD 이상인 글이 있으면 그 대표 글에 묶습니다.
+        
+        후보는 버킷 키 인덱스 조회 한 번으로 찾으므로 저장된 글 수와 상관없이 비교할 글이 몇 개뿐입니다.
+        여러 대표 글과 비슷하면 가장 먼저 저장된 대표 글을 고릅니다.
+        대표 글의 본문이 이전과 비슷하지 않게 바뀌면 묶여 있던 글은 _promote_duplicate()로 따로 대표를 세웁니다.
+        
+        Returns:
+            int: 묶은 대표 글의 id. 대표 글이면(또는 본문이 짧아 비교하지 않으면) None
+        """
+        signature = near_duplicate.signature(content)
+        
+        c.execute('SELECT signature FROM article_signatures WHERE article_id = ?', (article_id,))
+        old = c.fetchone()
+        if old is not None:
+            old_signature = near_duplicate.unpack(old[0])
+            c.executemany(
+                'DELETE FROM article_lsh WHERE bucket = ? AND article_id = ?',
+                [(bucket, article_id) for bucket in near_duplicate.band_keys(old_signature)]
+            )
+            # 묶여 있던 글은 이전 본문과 비슷한 글이므로 본문이 달라졌으면 새 대표 글을 따라가지 않습니다
+            if signature is None or near_duplicate.similarity(signature, old_signature) < near_duplicate.THRESHOLD:
+                self._promote_duplicate(c, article_id, index)
+        
+        if signature is None:
+            c.execute('DELETE FROM article_signatures WHERE article_id = ?', (article_id,))
+            c.execute('UPDATE articles SET canonical_id = NULL WHERE id = ?', (article_id,))
+            return None
+        keys = near_duplicate.band_keys(signature)
+        
+        c.execute(
+            f"SELECT DISTINCT article_id FROM article_lsh WHERE bucket IN ({','.join('?' * len(keys))})",
+            keys
+        )
+        candidates = {row[0] for row in c.fetchall()}
+        candidates.discard(article_id)
+        
+        canonical_id = None
+        if candidates:
+            marks = ','.join('?' * len(candidates))
+            c.execute(f'''
+                SELECT s.article_id, s.signature, a.canonical_id
+                FROM article_signatures s
+                JOIN articles a ON a.id = s.article_id
+                WHERE s.article_id IN ({marks})
+            ''', tuple(candidates))
+            for candidate_id, candidate_signature, candidate_canonical in c.fetchall():
+                root = candidate_canonical or candidate_id
+                if root == article_id or (canonical_id is not None and root >= canonical_id):
+                    continue
+                if near_duplicate.similarity(signature, near_duplicate.unpack(candidate_signature)) >= near_duplicate.THRESHOLD:
+                    canonical_id = root
+        
+        c.execute(
+            'INSERT OR REPLACE INTO article_signatures (article_id, signature) VALUES (?, ?)',
+            (article_id, near_duplicate.pack(signature))
+        )
+        c.executemany(
+            'INSERT OR IGNORE INTO article_lsh (bucket, article_id) VALUES (?, ?)',
+            [(bucket, article_id) for bucket in keys]
+        )
+        c.execute('UPDATE articles SET canonical_id = ? WHERE id = ?', (canonical_id, article_id))
+        if canonical_id is not None:
+            # 본문이 이전과 비슷하면 묶여 있던 글도 이 글과 비슷하므로 새 대표 글로 옮깁니다
+            c.execute('UPDATE articles SET canonical_id = ? WHERE canonical_id = ?', (canonical_id, article_id))
+        return canonical_id
+        
+    def _promote_duplicate(self, c, article_id, index=True):
+        """
+        article_id에 묶인 글 중 가장 먼저 저장된 글을 대표 글로 올리고 나머지는 그 글에 묶습니다.
+        
+        올린 글은 전문 검색 인덱스에 넣고(index가 False면 bulk_import()가 나중에 채웁니다) 키워드를 다시 뽑게 합니다.
+        
+        Returns:
+            int: 새 대표 글의 id. 묶인 글이 없으면 None
+        """
+        c.execute('SELECT MIN(id) FROM articles WHERE canonical_id = ?', (article_id,))
+        promoted = c.fetchone()[0]
+        if promoted is None:
+            return None
+            
+        c.execute('UPDATE articles SET canonical_id = NULL WHERE id = ?', (promoted,))
+        c.execute('UPDATE articles SET canonical_id = ? WHERE canonical_id = ?', (promoted, article_id))
+        
+        c.execute('''
+            SELECT a.url, a.title, a.author, a.content_hash, b.codec, b.body
+            FROM articles a
+            LEFT JOIN article_bodies b ON b.article_id = a.id
+            WHERE a.id = ?
+        ''', (promoted,))
+        url, title, author, content_hash, codec, body = c.fetchone()
+        if index:
+            c.execute(
+                'INSERT INTO articles_fts (rowid, title, content, author) VALUES (?, ?, ?, ?)',
+                (promoted, title, content_codec.decompress(codec, body), author)
+            )
+        self._queue_keywords(c, url, content_hash)
+        return promoted
+        
+    def _remove_keywords(self, c, article_id, deltas):
+        """글의 기존 키워드 빈도를 글별 테이블에서 지우고, 집계에서 뺄 양을 deltas에 모읍니다."""
+        c.execute('SELECT word, count, day FROM article_keywords WHERE article_id = ?', (article_id,))
+        old_counts = c.fetchall()
+        if not old_counts:
+            return
+        
+        for word, count, day in old_counts:
+            deltas['totals'][word] -= count
+            if day:
+                deltas['daily'][day, word] -= count
+        c.execute('DELETE FROM article_keywords WHERE article_id = ?', (article_id,))
+        
+    def _add_keywords(self, c, article_id, counts, deltas):
+        """글의 키워드 빈도를 글별 테이블에 넣고, 집계에 더할 양을 deltas에 모읍니다."""
+        if not counts:
+            return
+        
+        # 글을 처음 저장한(또는 내용이 바뀌어 다시 저장한) 날짜로 집계합니다
+        c.execute('''
+            SELECT COALESCE(date(crawled_at), date('now', 'localtime')), COALESCE(author, '')
+            FROM articles WHERE id = ?
+        ''', (article_id,))
+        day, author = c.fetchone() or (datetime.now().strftime('%Y-%m-%d'), '')
+        
+        c.executemany(
+            'INSERT INTO article_keywords (article_id, word, count, day, author) VALUES (?, ?, ?, ?, ?)',
+            [(article_id, word, count, day, author) for word, count in counts.items()]
+        )
+        for word, count in counts.items():
+            deltas['totals'][word] += count
+            deltas['daily'][day, word] += count
+        
+    def _apply_keyword_deltas(self, c, deltas):
+        """
+        여러 글에서 모은 증감을 전체/일별/월별 집계에 단어마다 한 번씩 반영합니다. 0 이하가 된 행은 지웁니다.
+        
+        같은 묶음의 글들은 대부분 같은 단어를 쓰므로 글마다 집계를 고치는 것보다 쓰기가 훨씬 적습니다.
+        """
+        monthly = Counter()
+        for (day, word), delta in deltas['daily'].items():
+            monthly[day[:7], word] += delta
+        
+        totals = [(word, delta) for word, delta in deltas['totals'].items() if delta]
+        daily = [(day, word, delta) for (day, word), delta in deltas['daily'].items() if delta]
+        monthly = [(month, word, delta) for (month, word), delta in monthly.items() if delta]
+        
+        c.executemany('''
+            INSERT INTO keyword_totals (word, count) VALUES (?, ?)
+            ON CONFLICT(word) DO UPDATE SET count = count + excluded.count
+        ''', totals)
+        c.executemany('''
+            INSERT INTO keyword_daily (day, word, count) VALUES (?, ?, ?)
+            ON CONFLICT(day, word) DO UPDATE SET count = count + excluded.count
+        ''', daily)
+        c.executemany('''
+            INSERT INTO keyword_monthly (month, word, count) VALUES (?, ?, ?)
+            ON CONFLICT(month, word) DO UPDATE SET count = count + excluded.count
+        ''', monthly)
+        
+        c.executemany(
+            'DELETE FROM keyword_totals WHERE word = ? AND count <= 0',
+            [(word,) for word, delta in totals if delta < 0]
+        )
+        c.executemany(
+            'DELETE FROM keyword_daily WHERE day = ? AND word = ? AND count <= 0',
+            [(day, word) for day, word, delta in daily if delta < 0]
+        )
+        c.executemany(
+            'DELETE FROM keyword_monthly WHERE month = ? AND word = ? AND count <= 0',
+            [(month, word) for month, word, delta in monthly if delta < 0]
+        )
+        
+    def _rebuild_keyword_rollups(self, c):
+        """article_keywords에서 전체/일별/월별 집계를 모두 다시 만듭니다."""
+        c.execute('DELETE FROM keyword_totals')
+        c.execute('DELETE FROM keyword_daily')
+        c.execute('DELETE FROM keyword_monthly')
+        c.execute('''
+            INSERT INTO keyword_totals (word, count)
+            SELECT word, SUM(count) FROM article_keywords GROUP BY word
+        ''')
+        c.execute('''
+            INSERT INTO keyword_daily (day, word, count)
+            SELECT day, word, SUM(count) FROM article_keywords GROUP BY day, word
+        ''')
+        c.execute('''
+            INSERT INTO keyword_monthly (month, word, count)
+            SELECT substr(day, 1, 7), word, SUM(count) FROM article_keywords GROUP BY substr(day, 1, 7), word
+        ''')
+        
+    def rebuild_keyword_index(self, count=count_keywords, workers=1):
+        """
+        저장된 모든 글로 키워드 인덱스를 지금 바로 다시 만듭니다.
+        
+        키워드는 쓰기 트랜잭션을 열기 전에 모두 세어 두므로 세는 동안 다른 저장을 막지 않습니다.
+        
+        Args:
+            count (callable): 본문 -> Counter. 기본값은 정규식 기반 count_keywords
+            workers (int): 키워드를 셀 프로세스 수 (text_processing.map_documents). None이면 모든 코어.
+                2 이상이면 count는 모듈 수준 함수여야 합니다.
+        """
+        conn = self._connect()
+        c = conn.cursor()
+        
+        try:
+            rows = conn.execute('SELECT id, content FROM article_search_texts').fetchall()
+            counts = map_documents(count, [content for _, content in rows], workers)
+            
+            c.execute('DELETE FROM article_keywords')
+            c.execute('DELETE FROM keyword_totals')
+            c.execute('DELETE FROM keyword_daily')
+            c.execute('DELETE FROM keyword_monthly')
+            c.execute('DELETE FROM keyword_jobs')
+        
+            deltas = {'totals': Counter(), 'daily': Counter()}
+            for (article_id, _), article_counts in zip(rows, counts):
+                self._add_keywords(c, article_id, article_counts, deltas)
+            self._apply_keyword_deltas(c, deltas)
+        
+            conn.commit()
+        
+        except Exception as e:
+            print(f"Error rebuilding keyword index: {str(e)}")
+            conn.rollback()
+        
+    def enqueue_all_keywords(self):
+        """모든 글을 키워드 작업으로 넣습니다. 추출기를 바꿨을 때 인덱스를 다시 만드는 데 씁니다."""
+        conn = self._connect()
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        c = conn.execute('''
+            INSERT INTO keyword_jobs (url, content_hash, queued_at)
+            SELECT url, content_hash, ? FROM articles WHERE true
+            ON CONFLICT(url) DO UPDATE SET
+                content_hash = excluded.content_hash, queued_at = excluded.queued_at
+        ''', (now,))
+        conn.commit()
+        return c.rowcount
+        
+    def _queue_keywords(self, c, url, content_hash):
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        c.execute('''
+            INSERT INTO keyword_jobs (url, content_hash, queued_at) VALUES (?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                content_hash = excluded.content_hash, queued_at = excluded.queued_at
+        ''', (url, content_hash, now))
+        
+    def pending_keyword_jobs(self, limit=20, exclude=()):
+        """
+        키워드를 아직 뽑지 않은 글을 오래된 순서로 가져옵니다.
+        
+        Args:
+            limit (int): 최대 개수
+            exclude (set): 이미 처리 중이라 건너뛸 URL
+            
+        Returns:
+            list: (url, content_hash, 본문) 목록. 지워진 글과 다른 글에 묶인 중복 글은 본문이 None입니다.
+        """
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT j.url, j.content_hash, CASE WHEN t.canonical_id IS NULL THEN t.content END
+            FROM keyword_jobs j
+            LEFT JOIN article_texts t ON t.url = j.url
+            ORDER BY j.queued_at
+            LIMIT ?
+        ''', (limit + len(exclude),)).fetchall()
+        return [row for row in rows if row[0] not in exclude][:limit]
+        
+    def apply_keywords(self, results):
+        """
+        백그라운드에서 뽑은 글별 키워드 빈도를 한 트랜잭션으로 반영합니다.
+        
+        작업을 꺼낸 뒤 글이 다시 저장되어 content_hash가 달라졌으면 그 결과는 버리고 새 작업을 남겨 둡니다.
+        
+        Args:
+            results (list): (url, content_hash, Counter) 목록
+            
+        Returns:
+            int: 반영한 글 수
+        """
+        conn = self._connect()
+        c = conn.cursor()
+        applied = 0
+        
+        deltas = {'totals': Counter(), 'daily': Counter()}
+        
+        try:
+            for url, content_hash, counts in results:
+                c.execute('SELECT content_hash FROM keyword_jobs WHERE url = ?', (url,))
+                job = c.fetchone()
+                if job is None or job[0] != content_hash:
+                    continue
+                    
+                c.execute('SELECT id, canonical_id FROM articles WHERE url = ?', (url,))
+                row = c.fetchone()
+                if row is not None:
+                    self._remove_keywords(c, row[0], deltas)
+                    # 작업을 꺼낸 뒤 중복 글로 묶였으면 키워드를 빼기만 합니다
+                    if counts is not None and row[1] is None:
+                        self._add_keywords(c, row[0], counts, deltas)
+                c.execute('DELETE FROM keyword_jobs WHERE url = ?', (url,))
+                applied += 1
+                
+            self._apply_keyword_deltas(c, deltas)
+            conn.commit()
+            return applied
+            
+        except Exception as e:
+            print(f"Error applying keywords: {str(e)}")
+            conn.rollback()
+            return 0
+            
+    def keyword_job_count(self):
+        """키워드를 뽑기를 기다리는 글 수"""
+        return self._connect().execute('SELECT COUNT(*) FROM keyword_jobs').fetchone()[0]
+        
+    def get_keyword_state(self, key):
+        row = self._connect().execute('SELECT value FROM keyword_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+        
+    def set_keyword_state(self, key, value):
+        conn = self._connect()
+        conn.execute('''
+            INSERT INTO keyword_state (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        ''', (key, value))
+        conn.commit()
+        
+    def _write_article(self, c, article, index=True):
+        """
+        글 한 개를 현재 트랜잭션 안에서 저장하고 키워드 작업을 넣습니다.
+        
+        내용이 그대로인 글은 crawled_at과 캐시 검증값만 갱신하고, 바뀐 글은 id를 유지한 채 덮어씁니다.
+        crawled_at, created_at, domain을 주면 그 값을 쓰고, 없으면 현재 시각과 URL의 호스트로 채웁니다.
+        index가 False면 전문 검색 인덱스에 새 본문을 넣지 않습니다 (bulk_import()가 끝난 뒤 글 수를 보고 한 번에 채웁니다).
+        바뀐 글의 이전 항목은 index와 상관없이 바로 뺍니다.
+        거의 같은 글이 이미 있으면 본문은 저장하되 canonical_id로 대표 글에 묶습니다.
+        
+        Returns:
+            str: "inserted", "updated" 또는 "unchanged"
+        """
+        crawled_at = format_timestamp(article.get('crawled_at')) or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        content_hash = article_hash(article)
+        
+        c.execute('''
+            SELECT a.id, a.content_hash, a.title, a.author, a.canonical_id, b.codec, b.body
+            FROM articles a
+            LEFT JOIN article_bodies b ON b.article_id = a.id
+            WHERE a.url = ?
+        ''', (article['url'],))
+        row = c.fetchone()
+        
+        if row is not None and row[1] == content_hash:
+            c.execute('''
+                UPDATE articles
+                SET crawled_at = ?,
+                    etag = COALESCE(?, etag),
+                    last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+            ''', (crawled_at, article.get('etag'), article.get('last_modified'), article['url']))
+            return 'unchanged'
+            
+        # 다시 크롤링한 글이면 이전 전문 검색 항목을 먼저 뺍니다 (중복 글은 색인되어 있지 않습니다)
+        # (이전 키워드 빈도는 새 키워드를 뽑을 때 함께 바꿉니다)
+        # 인덱스를 미룰 때도 빼야 글 수가 달라져 나중에 다시 채워집니다. 남겨 두면 이전 본문으로 검색됩니다.
+        # 다만 같은 가져오기에서 넣어 아직 색인되지 않은 글에 delete를 보내면 인덱스가 깨지므로 확인합니다
+        indexed = row is not None and row[4] is None
+        if indexed and not index:
+            c.execute('SELECT EXISTS (SELECT 1 FROM articles_fts_docsize WHERE id = ?)', (row[0],))
+            indexed = bool(c.fetchone()[0])
+        if indexed:
+            article_id, _, old_title, old_author, _, codec, body = row
+            c.execute('''
+                INSERT INTO articles_fts (articles_fts, rowid, title, content, author)
+                VALUES ('delete', ?, ?, ?, ?)
+            ''', (article_id, old_title, content_codec.decompress(codec, body), old_author))
+            
+        # created_at은 처음 저장할 때만 넣습니다
+        c.execute('''
+            INSERT INTO articles 
+            (url, title, author, thumbnail, domain, crawled_at, created_at, etag, last_modified, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                title = excluded.title,
+                author = excluded.author,
+                thumbnail = excluded.thumbnail,
+                domain = excluded.domain,
+                crawled_at = excluded.crawled_at,
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                content_hash = excluded.content_hash
+        ''', (
+            article['url'],
+            article.get('title'),
+            article.get('author'),
+            article.get('thumbnail'),
+            article.get('domain') or url_domain(article['url']),
+            crawled_at,
+            format_timestamp(article.get('created_at')) or crawled_at,
+            article.get('etag'),
+            article.get('last_modified'),
+            content_hash
+        ))
+        article_id = row[0] if row is not None else c.lastrowid
+        
+        c.execute('''
+            INSERT INTO article_bodies (article_id, codec, body) VALUES (?, ?, ?)
+            ON CONFLICT(article_id) DO UPDATE SET codec = excluded.codec, body = excluded.body
+        ''', (article_id,) + content_codec.compress(article.get('content')))
+        
+        # 거의 같은 글이 이미 있으면 그 글에 묶고 전문 검색과 키워드 집계에서 뺍니다
+        canonical_id = self._link_duplicate(c, article_id, article.get('content'), index)
+        if index and canonical_id is None:
+            c.execute(
+                'INSERT INTO articles_fts (rowid, title, content, author) VALUES (?, ?, ?, ?)',
+                (article_id, article.get('title'), article.get('content'), article.get('author'))
+            )
+        
+        # 형태소 분석은 느리므로 저장 트랜잭션 밖에서 KeywordIndexer가 처리합니다
+        self._queue_keywords(c, article['url'], content_hash)
+        return 'inserted' if row is None else 'updated'
         
     def save_article(self, article):
         """글을 데이터베이스에 저장합니다."""
-        conn = sqlite3.connect(self.db_path)
+        return self.save_articles([article])
+        
+    def save_articles(self, articles):
+        """
+        여러 글을 한 트랜잭션으로 저장합니다.
+        
+        Returns:
+            bool: 저장에 성공하면 True. 실패하면 아무 글도 저장되지 않습니다.
+        """
+        conn = self._connect()
         c = conn.cursor()
         
         try:
-            c.execute('''
-                INSERT OR REPLACE INTO articles 
-                (url, title, content, author, thumbnail, crawled_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                article['url'],
-                article['title'],
-                article['content'],
-                article['author'],
-                article.get('thumbnail'),
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            ))
+            with metrics.span('db_write'):
+                results = [self._write_article(c, article) for article in articles]
+                conn.commit()
             
-            conn.commit()
+            if self._known_urls is not None:
+                self._known_urls.update(article['url'] for article in articles)
+            with self._write_counts_lock:
+                for result in results:
+                    self._write_counts[result] += 1
+            return True
             
         except Exception as e:
             print(f"Error saving article: {str(e)}")
             conn.rollback()
+            return False
             
+    def import_database(self, path):
+        """
+        예전 DB 파일의 글을 이 데이터베이스로 가져옵니다. 원본 파일은 읽기만 합니다.
+        
+        한 번 가져온 파일은 legacy_imports에 기록해 다시 가져오지 않고,
+        이미 저장된 URL은 이 데이터베이스의 글을 그대로 둡니다.
+        
+        Returns:
+            int: 새로 가져온 글 수
+        """
+        path = os.path.abspath(path)
+        if not os.path.exists(path) or os.path.abspath(self.db_path) == path:
+            return 0
+        
+        conn = self._connect()
+        if conn.execute('SELECT 1 FROM legacy_imports WHERE path = ?', (path,)).fetchone():
+            return 0
+        
+        source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            # 같은 URL이 여러 번 있으면 나중 행을 씁니다
+            articles = {article['url']: article for article in read_legacy_articles(source)}
+        finally:
+            source.close()
+        
+        existing = self.existing_urls(list(articles))
+        articles = [article for url, article in articles.items() if url not in existing]
+        c = conn.cursor()
+        
+        try:
+            results = [self._write_article(c, article) for article in articles]
+            c.execute(
+                'INSERT INTO legacy_imports (path, imported_at, articles) VALUES (?, ?, ?)',
+                (path, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), len(articles))
+            )
+            conn.commit()
+        
+        except Exception as e:
+            print(f"Error importing {path}: {str(e)}")
+            conn.rollback()
+            return 0
+        
+        if self._known_urls is not None:
+            self._known_urls.update(article['url'] for article in articles)
+        with self._write_counts_lock:
+            for result in results:
+                self._write_counts[result] += 1
+        logger.info(f"{path}에서 글 {len(articles)}개를 가져왔습니다")
+        return len(articles)
+        
+    def import_legacy_databases(self, paths=LEGACY_DATABASES):
+        """LEGACY_DATABASES 중 있는 파일을 모두 가져옵니다. 가져온 글 수를 반환합니다."""
+        return sum(self.import_database(path) for path in paths)
+        
+    def bulk_import(self, articles, batch_size=1000, defer_indexes=True, skip_existing=False):
+        """
+        덤프처럼 많은 글을 batch_size개씩 한 트랜잭션으로 저장합니다. articles는 한 번만 읽으므로 제너레이터여도 됩니다.
+        
+        defer_indexes가 True면 목록/작업 큐 인덱스(DEFERRED_INDEXES)와 전문 검색 인덱스를 저장하는 동안 갱신하지 않고
+        끝난 뒤 한 번에 다시 만듭니다. 새 인스턴스를 채울 때처럼 가져올 글이 이미 있는 글보다 많을 때 빠릅니다.
+        묶음 저장이 실패하면 그 묶음은 한 글씩 다시 저장해 문제 있는 글만 건너뜁니다.
+        skip_existing이 True면 이미 저장된 URL은 덮어쓰지 않습니다 (예전 덤프로 새 글을 되돌리지 않도록).
+        
+        Returns:
+            dict: 결과별 글 수 (inserted, updated, unchanged, skipped, failed)
+        """
+        conn = self._connect()
+        c = conn.cursor()
+        index = not defer_indexes
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'failed': 0}
+        
+        def flush(batch):
+            if skip_existing:
+                existing = self.existing_urls([article.get('url') for article in batch])
+                counts['skipped'] += sum(1 for article in batch if article.get('url') in existing)
+                batch = [article for article in batch if article.get('url') not in existing]
+                
+            try:
+                with metrics.span('db_write'):
+                    saved = [(article['url'], self._write_article(c, article, index)) for article in batch]
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.warning(f"묶음 저장에 실패해 한 글씩 다시 저장합니다: {str(e)}")
+                saved = []
+                for article in batch:
+                    try:
+                        saved.append((article['url'], self._write_article(c, article, index)))
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        logger.error(f"글을 가져오지 못했습니다: {article.get('url')} ({str(e)})")
+                        counts['failed'] += 1
+        
+            # save_articles()처럼 저장한 묶음마다 바로 쓰기 통계에 더합니다
+            with self._write_counts_lock:
+                for _, result in saved:
+                    counts[result] += 1
+                    self._write_counts[result] += 1
+            if self._known_urls is not None:
+                self._known_urls.update(url for url, _ in saved)
+        
+        if defer_indexes:
+            for name in DEFERRED_INDEXES:
+                c.execute(f'DROP INDEX IF EXISTS {name}')
+            conn.commit()
+        
+        try:
+            batch = []
+            for article in articles:
+                batch.append(article)
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+                    logger.info(f"{self.db_path}에 글 {sum(counts.values())}개를 가져왔습니다")
+            if batch:
+                flush(batch)
         finally:
-            conn.close()
+            if defer_indexes:
+                self._restore_deferred_indexes(conn)
+        
+        return counts
+        
+    def _restore_deferred_indexes(self, conn):
+        """
+        bulk_import()가 지운 인덱스를 다시 만들고, 전문 검색 인덱스의 글 수가 대표 글 수와 다르면 다시 채웁니다.
+        
+        가져오기가 중간에 끊겨도 다음 setup()이 이 메서드로 복구합니다.
+        """
+        for name, target in DEFERRED_INDEXES.items():
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+        
+        indexed = conn.execute('SELECT COUNT(*) FROM articles_fts_docsize').fetchone()[0]
+        total = conn.execute('SELECT COUNT(*) FROM articles WHERE canonical_id IS NULL').fetchone()[0]
+        if indexed != total:
+            logger.info(f"전문 검색 인덱스를 다시 채웁니다 (글 {total}개, 색인된 글 {indexed}개)")
+            conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+        conn.commit()
+        
+    def touch_articles(self, urls):
+        """
+        서버가 304 Not Modified로 답한 글의 crawled_at만 갱신합니다.
+        
+        Returns:
+            bool: 갱신에 성공하면 True
+        """
+        if not urls:
+            return True
+            
+        conn = self._connect()
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        try:
+            conn.executemany('UPDATE articles SET crawled_at = ? WHERE url = ?', [(now, url) for url in urls])
+            conn.commit()
+            
+            with self._write_counts_lock:
+                self._write_counts['not_modified'] += len(urls)
+            return True
+            
+        except Exception as e:
+            print(f"Error touching articles: {str(e)}")
+            conn.rollback()
+            return False
+            
+    def get_validators(self, urls):
+        """
+        조건부 요청에 쓸 ETag와 Last-Modified 값을 조회합니다.
+        
+        Returns:
+            dict: url -> (etag, last_modified). 저장된 값이 하나도 없는 URL은 빠집니다.
+        """
+        urls = list(dict.fromkeys(urls))
+        if self._known_urls is not None:
+            urls = [url for url in urls if url in self._known_urls]
             
+        conn = self._connect()
+        validators = {}
+        for n in range(0, len(urls), 500):
+            chunk = urls[n:n + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(f'''
+                SELECT url, etag, last_modified FROM articles
+                WHERE url IN ({placeholders})
+                  AND (etag IS NOT NULL OR last_modified IS NOT NULL)
+            ''', chunk)
+            for url, etag, last_modified in rows:
+                validators[url] = (etag, last_modified)
+        return validators
+        
+    def write_stats(self):
+        """
+        저장 요청 결과별 글 수를 반환합니다.
+        
+        inserted: 새 글, updated: 내용이 바뀌어 다시 쓴 글,
+        unchanged: 내용 해시가 같아 crawled_at만 갱신한 글, not_modified: 304 응답으로 다운로드하지 않은 글
+        """
+        with self._write_counts_lock:
+            stats = dict(self._write_counts)
+        stats['rewrites_saved'] = stats['unchanged'] + stats['not_modified']
+        return stats
+        
     def get_all_articles(self):
-        """저장된 모든 글을 가져옵니다."""
-        conn = sqlite3.connect(self.db_path)
+        """저장된 모든 대표 글을 가져옵니다. 다른 글에 묶인 중복 글은 빼고 가져옵니다."""
+        conn = self._connect()
         c = conn.cursor()
         
         c.execute('''
-            SELECT url, title, content, author, thumbnail, crawled_at
-            FROM articles
+            SELECT url, title, content, author, thumbnail, crawled_at, domain, created_at
+            FROM article_search_texts
             ORDER BY crawled_at DESC
         ''')
         
@@ -76,61 +1238,549 @@ class Database:
                 'content': row[2],
                 'author': row[3],
                 'thumbnail': row[4],
-                'crawled_at': row[5]
+                'crawled_at': row[5],
+                'domain': row[6],
+                'created_at': row[7]
             })
             
-        conn.close()
         return articles
         
+    def iter_articles(self, since=None, until=None, domain=None, content=True, batch_size=500):
+        """
+        저장된 글을 id 순서로 batch_size개씩 읽어 하나씩 돌려줍니다. 전체를 메모리에 올리지 않습니다.
+        
+        묶음마다 마지막 id 다음부터 다시 조회하므로 읽는 동안 읽기 트랜잭션을 오래 잡고 있지 않고,
+        내보내는 중에 저장된 글도 id가 크면 뒤에 이어서 나옵니다.
+        
+        Args:
+            since (date): crawled_at이 이 날짜 이후(포함)인 글만
+            until (date): crawled_at이 이 날짜까지(포함)인 글만
+            domain (str): 이 도메인의 글만
+            content (bool): False면 본문을 읽지 않습니다 (content는 None)
+            batch_size (int): 한 번에 읽는 글 수
+        
+        Yields:
+            dict: url, title, content, author, thumbnail, domain, crawled_at, created_at, etag, last_modified
+        """
+        # 조건 열 앞의 +는 해당 인덱스를 쓰지 않게 합니다. id 범위를 차례로 읽어야 묶음마다 다시 정렬하지 않습니다
+        conditions, params = [], []
+        if since is not None:
+            conditions.append('+a.crawled_at >= ?')
+            params.append(since.isoformat())
+        if until is not None:
+            conditions.append('+a.crawled_at < ?')
+            params.append((until + timedelta(days=1)).isoformat())
+        if domain:
+            conditions.append('+a.domain = ?')
+            params.append(domain)
+        
+        body = 'b.codec, b.body' if content else 'NULL, NULL'
+        source = 'articles a LEFT JOIN article_bodies b ON b.article_id = a.id' if content else 'articles a'
+        sql = f'''
+            SELECT a.id, a.url, a.title, {body}, a.author, a.thumbnail, a.domain,
+                   a.crawled_at, a.created_at, a.etag, a.last_modified
+            FROM {source}
+            WHERE {' AND '.join(['a.id > ?'] + conditions)}
+            ORDER BY a.id
+            LIMIT ?
+        '''
+        
+        conn = self._connect()
+        last_id = 0
+        while True:
+            rows = conn.execute(sql, [last_id] + params + [batch_size]).fetchall()
+            for row in rows:
+                yield {
+                    'url': row[1],
+                    'title': row[2],
+                    'content': content_codec.decompress(row[3], row[4]) if content else None,
+                    'author': row[5],
+                    'thumbnail': row[6],
+                    'domain': row[7],
+                    'crawled_at': row[8],
+                    'created_at': row[9],
+                    'etag': row[10],
+                    'last_modified': row[11]
+                }
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+        
+    def list_articles(self, cursor=None, limit=20, domain=None):
+        """
+        최신순 글 목록을 한 페이지씩 가져옵니다. 본문(content)과 다른 글에 묶인 중복 글은 가져오지 않습니다.
+        
+        Args:
+            cursor (str): 이전 페이지의 next_cursor. None이면 첫 페이지
+            limit (int): 페이지 크기
+            domain (str): 주면 이 도메인의 글만 가져옵니다
+            
+        Returns:
+            tuple: (글 목록, 다음 페이지 cursor). 마지막 페이지면 cursor는 None
+        """
+        conn = self._connect()
+        c = conn.cursor()
+        
+        conditions, params = ['canonical_id IS NULL'], []
+        if domain:
+            # (domain, crawled_at, id) 인덱스를 그대로 따라 읽습니다
+            conditions.append('domain = ?')
+            params.append(domain)
+        if cursor:
+            crawled_at, article_id = self._decode_cursor(cursor)
+            conditions.append('(crawled_at, id) < (?, ?)')
+            params.extend([crawled_at, article_id])
+        c.execute(f'''
+            SELECT id, url, title, author, thumbnail, crawled_at, domain, created_at
+            FROM articles
+            WHERE {' AND '.join(conditions)}
+            ORDER BY crawled_at DESC, id DESC
+            LIMIT ?
+        ''', params + [limit + 1])
+        rows = c.fetchall()
+        
+        articles = []
+        for row in rows[:limit]:
+            articles.append({
+                'id': row[0],
+                'url': row[1],
+                'title': row[2],
+                'author': row[3],
+                'thumbnail': row[4],
+                'crawled_at': row[5],
+                'domain': row[6],
+                'created_at': row[7]
+            })
+            
+        next_cursor = None
+        if len(rows) > limit:
+            last = articles[-1]
+            next_cursor = self._encode_cursor(last['crawled_at'], last['id'])
+            
+        return articles, next_cursor
+        
+    def _encode_cursor(self, crawled_at, article_id):
+        raw = json.dumps([crawled_at, article_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+        
+    def _decode_cursor(self, cursor):
+        try:
+            crawled_at, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return crawled_at, int(article_id)
+        except Exception:
+            raise ValueError(f"잘못된 cursor입니다: {cursor}")
+            
+    def get_article_by_id(self, article_id):
+        """
+        ID로 글 하나를 본문까지 포함해 조회합니다. 압축된 본문은 이때만 풉니다.
+        
+        중복 글도 조회할 수 있고, canonical_id에 대표 글의 id가 들어 있습니다 (대표 글이면 None).
+        """
+        conn = self._connect()
+        c = conn.cursor()
+        
+        c.execute('''
+            SELECT id, url, title, content, author, thumbnail, crawled_at, domain, created_at, canonical_id
+            FROM article_texts
+            WHERE id = ?
+        ''', (article_id,))
+        row = c.fetchone()
+        
+        if row is None:
+            return None
+            
+        return {
+            'id': row[0],
+            'url': row[1],
+            'title': row[2],
+            'content': row[3],
+            'author': row[4],
+            'thumbnail': row[5],
+            'crawled_at': row[6],
+            'domain': row[7],
+            'created_at': row[8],
+            'canonical_id': row[9]
+        }
+        
+    def get_duplicates(self, article_id):
+        """
+        대표 글에 묶인 중복 글 목록을 id 순서로 가져옵니다. 본문은 가져오지 않습니다.
+        
+        Returns:
+            list: id, url, title, author, crawled_at, domain을 담은 글 목록
+        """
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT id, url, title, author, crawled_at, domain
+            FROM articles
+            WHERE canonical_id = ?
+            ORDER BY id
+        ''', (article_id,)).fetchall()
+        return [
+            {'id': row[0], 'url': row[1], 'title': row[2], 'author': row[3], 'crawled_at': row[4], 'domain': row[5]}
+            for row in rows
+        ]
+        
+    def duplicate_count(self):
+        """다른 글에 묶인 중복 글 수"""
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM articles WHERE canonical_id IS NOT NULL'
+        ).fetchone()[0]
+        
+    def search_articles(self, query, limit=20, order='rank'):
+        """
+        저장된 글을 전문 검색합니다. 다른 글에 묶인 중복 글은 결과에 나오지 않습니다.
+        
+        trigram 인덱스는 3글자 미만 단어를 찾지 못하므로, 3글자 이상 단어로 인덱스에서 후보를 찾은 뒤
+        짧은 단어는 후보에서만 LIKE로 거릅니다. 짧은 단어만 있거나 후보가 너무 많으면 본문은
+        최근 SHORT_TERM_SCAN_WINDOW개 글에서만 풀어 보고, 제목과 작성자는 모든 글에서 찾습니다.
+        
+        Args:
+            query (str): 검색어. 띄어쓰기로 나눈 단어가 모두 들어 있는 글을 찾습니다.
+            limit (int): 최대 결과 수
+            order (str): "rank"면 BM25 점수순, "recency"면 최신순
+            
+        Returns:
+            list: 검색 결과 목록. snippet은 검색어를 <mark>로 감싼 HTML입니다.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+            
+        conn = self._connect()
+        c = conn.cursor()
+        
+        long_terms = [term for term in terms if len(term) >= 3]
+        short_terms = [term for term in terms if len(term) < 3]
+        
+        if long_terms:
+            # 각 단어를 따옴표로 감싸 FTS 문법 문자로 해석되지 않게 합니다
+            match = ' '.join('"' + term.replace('"', '""') + '"' for term in long_terms)
+            order_by = 'rank' if order == 'rank' else 'a.crawled_at DESC'
+            where, params, join = 'articles_fts MATCH ?', [match], ''
+            if short_terms:
+                # FTS 열을 읽으면 행 전체를 읽어 본문을 풀므로 짧은 단어는 articles와 article_bodies에서 직접 봅니다.
+                # 후보가 많으면 짧은 단어만 있을 때처럼 범위를 줄여 본문을 푸는 글 수를 제한합니다
+                c.execute('SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH ?', (match,))
+                if c.fetchone()[0] > SHORT_TERM_SCAN_WINDOW:
+                    title_where, title_params = _like_where(short_terms, ('a.title', 'a.author'), 'OR')
+                    where += f' AND (a.crawled_at >= ? OR {title_where})'
+                    params += [self._short_term_window_start(c)] + title_params
+                short_where, short_params = _like_where(
+                    short_terms, ('a.title', 'a.author', 'decompress_body(b.codec, b.body)')
+                )
+                where += ' AND ' + short_where
+                params += short_params
+                join = 'LEFT JOIN article_bodies b ON b.article_id = a.id'
+            c.execute(f'''
+                SELECT a.id, a.url, a.title, a.author, a.thumbnail, a.crawled_at,
+                       snippet(articles_fts, 1, char(2), char(3), '…', 32),
+                       bm25(articles_fts, 10.0, 1.0, 5.0) AS rank
+                FROM articles_fts
+                JOIN articles a ON a.id = articles_fts.rowid
+                {join}
+                WHERE {where}
+                ORDER BY {order_by}
+                LIMIT ?
+            ''', params + [limit])
+            rows = c.fetchall()
+        else:
+            # 본문은 최근 SHORT_TERM_SCAN_WINDOW개 글과 제목/작성자에 단어가 하나라도 있는 글에서만 풉니다.
+            # 최신순으로 훑으며 앞 조건을 먼저 보므로 범위 밖의 글은 본문을 풀지 않고 건너뜁니다
+            since = self._short_term_window_start(c)
+            title_where, title_params = _like_where(terms, ('title', 'author'), 'OR')
+            where, params = _like_where(terms, ('title', 'author', 'content'))
+            c.execute(f'''
+                SELECT id, url, title, author, thumbnail, crawled_at, content, 0
+                FROM article_search_texts
+                WHERE (crawled_at >= ? OR {title_where}) AND {where}
+                ORDER BY crawled_at DESC
+                LIMIT ?
+            ''', [since] + title_params + params + [limit])
+            rows = [row[:6] + (self._make_snippet(row[6], terms),) + row[7:] for row in c.fetchall()]
+            
+        
+        results = []
+        for row in rows:
+            results.append({
+                'id': row[0],
+                'url': row[1],
+                'title': row[2],
+                'author': row[3],
+                'thumbnail': row[4],
+                'crawled_at': row[5],
+                'snippet': self._snippet_html(row[6]),
+                'score': -row[7]
+            })
+        return results
+        
+    def _short_term_window_start(self, c):
+        """짧은 단어 검색에서 본문까지 훑는 최근 SHORT_TERM_SCAN_WINDOW개 글 중 가장 오래된 글의 crawled_at"""
+        c.execute('''
+            SELECT crawled_at FROM articles
+            WHERE canonical_id IS NULL
+            ORDER BY crawled_at DESC, id DESC
+            LIMIT 1 OFFSET ?
+        ''', (SHORT_TERM_SCAN_WINDOW - 1,))
+        row = c.fetchone()
+        return row[0] if row else ''
+        
+    def _make_snippet(self, content, terms, width=60):
+        """검색어가 처음 나오는 곳 앞뒤를 잘라 snippet()과 같은 형식으로 만듭니다."""
+        content = content or ''
+        positions = [content.find(term) for term in terms if term in content]
+        if not positions:
+            return content[:width * 2]
+            
+        start = max(0, min(positions) - width)
+        end = min(len(content), min(positions) + width)
+        text = content[start:end]
+        for term in terms:
+            text = text.replace(term, '\x02' + term + '\x03')
+        return ('…' if start > 0 else '') + text + ('…' if end < len(content) else '')
+        
+    def _snippet_html(self, snippet):
+        """본문은 이스케이프하고 검색어 표시만 <mark> 태그로 바꿉니다."""
+        text = html.escape(snippet or '')
+        return text.replace('\x02', '<mark>').replace('\x03', '</mark>')
+        
+    def warm_known_urls(self):
+        """저장된 모든 URL을 메모리에 올려 existing_urls()가 새 URL은 DB를 조회하지 않고 걸러내게 합니다."""
+        conn = self._connect()
+        known = {row[0] for row in conn.execute('SELECT url FROM articles')}
+        self._known_urls = known
+        return len(known)
+        
+    def existing_urls(self, urls, max_age_days=None):
+        """
+        주어진 URL 중 이미 저장된 URL을 한 번의 조회로 찾습니다.
+        
+        Args:
+            urls (list): 확인할 URL 목록
+            max_age_days (float): 주면 이 기간 안에 크롤링한 글만 저장된 것으로 봅니다.
+            
+        Returns:
+            set: 이미 저장된 (그리고 충분히 최근인) URL 집합
+        """
+        candidates = list(dict.fromkeys(urls))
+        if self._known_urls is not None:
+            # 메모리에 없는 URL은 확실히 새 글이므로 DB에 물어볼 필요가 없습니다
+            candidates = [url for url in candidates if url in self._known_urls]
+        if not candidates:
+            return set()
+            
+        conn = self._connect()
+        existing = set()
+        
+        # SQLite 바인딩 변수 개수 제한(기본 999)을 넘지 않도록 나눠서 조회합니다
+        for n in range(0, len(candidates), 500):
+            chunk = candidates[n:n + 500]
+            placeholders = ','.join('?' * len(chunk))
+            if max_age_days is None:
+                rows = conn.execute(
+                    f'SELECT url FROM articles WHERE url IN ({placeholders})',
+                    chunk
+                )
+            else:
+                cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+                rows = conn.execute(
+                    f'SELECT url FROM articles WHERE url IN ({placeholders}) AND crawled_at >= ?',
+                    chunk + [cutoff]
+                )
+            existing.update(row[0] for row in rows)
+            
+        return existing
+        
     def get_article(self, url):
         """URL로 글을 조회합니다."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         c = conn.cursor()
         
-        c.execute('SELECT * FROM articles WHERE url = ?', (url,))
+        c.execute('SELECT * FROM article_texts WHERE url = ?', (url,))
         article = c.fetchone()
         
-        conn.close()
         return article
         
     def extract_keywords(self):
-        """모든 글의 내용에서 상위 30개 키워드를 추출합니다."""
-        conn = sqlite3.connect(self.db_path)
+        """키워드 인덱스에서 상위 30개 키워드를 가져옵니다."""
+        conn = self._connect()
         c = conn.cursor()
         
-        # 모든 글의 내용을 가져옴
-        c.execute('SELECT content FROM articles')
-        contents = [row[0] for row in c.fetchall()]
-        conn.close()
-        
-        # 불용어 목록
-        stop_words = {
-            '있습니다', '있는', '있다', '그리고', '그런데', '하지만', '입니다', '이런', 
-            '저런', '그런', '이렇게', '저렇게', '그렇게', '때문에', '이것', '저것', '그것',
-            '이번', '저번', '이후', '이전', '통해', '따라', '위해', '라고', '이라고',
-            '하는', '한다', '됩니다', '된다'
-        }
+        c.execute('''
+            SELECT word, count
+            FROM keyword_totals
+            ORDER BY count DESC, word
+            LIMIT 30
+        ''')
+        keywords = [(row[0], row[1]) for row in c.fetchall()]
         
-        # 한글 단어 추출 (2글자 이상)
-        words = []
-        for content in contents:
-            if content:
-                # 문장 단위로 분리
-                sentences = re.split(r'[.!?]\s+', content)
-                for sentence in sentences:
-                    # 조사를 제외한 명사 추출 시도
-                    # 1. 조사 패턴
-                    patterns = [
-                        r'[가-힣]{2,}(?=[은는이가을를에의로])',  # 조사 앞의 단어
-                        r'[가-힣]{2,}(?=[^가-힣]|$)'  # 문장 끝이나 한글이 아닌 문자 앞의 단어
-                    ]
-                    
-                    for pattern in patterns:
-                        found_words = re.findall(pattern, sentence)
-                        words.extend([w for w in found_words if len(w) >= 2 and w not in stop_words])
+        return keywords
         
-        # 상위 30개 키워드 추출
-        counter = Counter(words)
-        keywords = counter.most_common(30)
+    def _keyword_window(self, start, end, author=None):
+        """
+        기간 [start, end]를 읽을 집계 테이블 구간으로 나눕니다.
         
-        return keywords
+        작성자를 주지 않으면 기간 안에 통째로 들어가는 달은 월별 집계로, 나머지 앞뒤 날짜는 일별 집계로 읽어
+        긴 기간도 적은 행만 합칩니다.
+        
+        Returns:
+            list: (FROM 절과 조건, 인자 목록, 구간의 기간 수) 목록
+        """
+        if author is not None:
+            # 작성자별 집계는 따로 두지 않고 (author, day) 인덱스로 글별 빈도를 읽습니다
+            return [(
+                'article_keywords WHERE author = ? AND day BETWEEN ? AND ?',
+                [author, start.isoformat(), end.isoformat()],
+                (end - start).days + 1
+            )]
+        
+        # 기간 안에 통째로 들어가는 첫 달과 마지막 달의 1일
+        first_month = start if start.day == 1 else _next_month(start)
+        last_month = end.replace(day=1)
+        if end + timedelta(days=1) != _next_month(end):
+            last_month = (last_month - timedelta(days=1)).replace(day=1)
+        if first_month > last_month:
+            return [(
+                'keyword_daily WHERE day BETWEEN ? AND ?',
+                [start.isoformat(), end.isoformat()],
+                (end - start).days + 1
+            )]
+        
+        months_end = _next_month(last_month)
+        months = (last_month.year - first_month.year) * 12 + last_month.month - first_month.month + 1
+        parts = [(
+            'keyword_monthly WHERE month BETWEEN ? AND ?',
+            [first_month.isoformat()[:7], last_month.isoformat()[:7]],
+            months
+        )]
+        if start < first_month:
+            parts.append((
+                'keyword_daily WHERE day >= ? AND day < ?',
+                [start.isoformat(), first_month.isoformat()],
+                (first_month - start).days
+            ))
+        if months_end <= end:
+            parts.append((
+                'keyword_daily WHERE day BETWEEN ? AND ?',
+                [months_end.isoformat(), end.isoformat()],
+                (end - months_end).days + 1
+            ))
+        return parts
+        
+    def _window_totals(self, parts, words=None, min_row_count=None):
+        """
+        구간들의 단어별 빈도 합계를 구합니다.
+        
+        Args:
+            parts (list): _keyword_window()의 결과
+            words (list): 이 단어들만 합칩니다
+            min_row_count (int): 어느 한 기간에서라도 이 이상 나온 단어만 합칩니다
+        
+        Returns:
+            dict: 단어 -> 빈도 합계
+        """
+        conn = self._connect()
+        if min_row_count is not None:
+            # 기간별 빈도 인덱스로 한 기간에서 많이 나온 단어만 먼저 고릅니다
+            words = set()
+            for where, params, _ in parts:
+                rows = conn.execute(
+                    f'SELECT DISTINCT word FROM {where} AND count >= ?', params + [min_row_count]
+                ).fetchall()
+                words.update(row[0] for row in rows)
+        
+        selects, params = [], []
+        for where, part_params, _ in parts:
+            if words is None:
+                selects.append(f'SELECT word, count FROM {where}')
+                params += part_params
+            else:
+                selects.append(f'SELECT word, count FROM {where} AND word IN (SELECT value FROM json_each(?))')
+                params += part_params + [json.dumps(list(words), ensure_ascii=False)]
+        
+        union = ' UNION ALL '.join(selects)
+        rows = conn.execute(f'SELECT word, SUM(count) FROM ({union}) GROUP BY word', params).fetchall()
+        return dict(rows)
+        
+    def top_keywords(self, start, end, author=None, limit=30):
+        """
+        기간(과 작성자) 안의 상위 키워드를 집계 테이블에서 가져옵니다.
+        
+        기간 안의 모든 단어를 합치지 않고, 전체 상위 단어들로 limit번째 빈도의 하한 L을 구한 뒤
+        어느 한 기간에서라도 L / 기간 수 이상 나온 단어만 합칩니다. 상위 limit개에 드는 단어는 반드시
+        이 조건을 만족하므로 결과는 전부 합친 것과 같습니다.
+        
+        Args:
+            start (date): 시작일 (포함)
+            end (date): 종료일 (포함)
+            author (str): 작성자. 없으면 모든 작성자
+            limit (int): 최대 개수
+        
+        Returns:
+            list: (단어, 빈도) 목록
+        """
+        if start > end:
+            raise ValueError("시작일이 종료일보다 늦습니다")
+        
+        parts = self._keyword_window(start, end, author)
+        if author is not None:
+            # 작성자 구간은 하루에도 글마다 행이 있어 한 기간의 빈도로 거를 수 없으므로 모두 합칩니다
+            ranked = sorted(self._window_totals(parts).items(), key=lambda item: (-item[1], item[0]))
+            return ranked[:limit]
+            
+        periods = sum(part[2] for part in parts)
+        
+        candidates = [row[0] for row in self._connect().execute(
+            'SELECT word FROM keyword_totals ORDER BY count DESC LIMIT ?', (limit * 4,)
+        )]
+        totals = self._window_totals(parts, words=candidates)
+        min_row_count = 1
+        if len(totals) >= limit:
+            bound = sorted(totals.values(), reverse=True)[limit - 1]
+            min_row_count = -(-bound // periods)
+        
+        if min_row_count > 1:
+            totals.update(self._window_totals(parts, min_row_count=min_row_count))
+        else:
+            totals = self._window_totals(parts)
+        
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+        
+    def trending_keywords(self, start, end, author=None, limit=20, min_count=3, candidates=500):
+        """
+        기간 [start, end]에 바로 앞 같은 길이의 기간보다 많이 나온 키워드를 가져옵니다.
+        
+        이번 기간 상위 candidates개 단어 중에서 증가율 (이번 빈도 + 1) / (이전 빈도 + 1)이 큰 순서로 고릅니다.
+        이번 기간에 min_count번 미만 나온 단어는 뺍니다.
+        
+        Returns:
+            list: {'word', 'count', 'previous', 'growth'} 목록
+        """
+        if start > end:
+            raise ValueError("시작일이 종료일보다 늦습니다")
+        
+        current = [
+            (word, count) for word, count in self.top_keywords(start, end, author, candidates)
+            if count >= min_count
+        ]
+        if not current:
+            return []
+        
+        previous_end = start - timedelta(days=1)
+        previous_start = previous_end - (end - start)
+        previous = self._window_totals(
+            self._keyword_window(previous_start, previous_end, author), words=[word for word, _ in current]
+        )
+        
+        trending = []
+        for word, count in current:
+            before = previous.get(word, 0)
+            trending.append({
+                'word': word,
+                'count': count,
+                'previous': before,
+                'growth': round((count + 1.0) / (before + 1), 3)
+            })
+        trending.sort(key=lambda item: (-item['growth'], -item['count'], item['word']))
+        return trending[:limit]
@@ -0,0 +1,351 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+from contextlib import contextmanager
+import threading
+import logging
+import metrics
+import time
+
+logger = logging.getLogger(__name__)
+
+# ChromeDriverManager().install()은 프로세스당 한 번만 호출합니다
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def get_driver_path():
+    """설치된 chromedriver 경로를 반환합니다. 처음 호출할 때만 설치합니다."""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+# 글을 읽는 데 필요 없는 광고/분석 스크립트 도메인
+BLOCKED_DOMAINS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'facebook.net',
+    'connect.facebook.net',
+    'analytics.kakao.com',
+    'stat.tiara.kakao.com',
+    'display.ad.daum.net',
+    'adfit.kakao.com',
+)
+
+# 패턴은 전체 URL에 맞춰 보므로 쿼리 문자열이 붙은 주소도 걸리도록 뒤에 *를 붙입니다
+_IMAGE_PATTERNS = ('*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.svg*', '*.ico*',
+                   '*img1.daumcdn.net/thumb/*')
+_MEDIA_PATTERNS = ('*.mp4*', '*.webm*', '*.mp3*', '*.m4a*', '*.m3u8*')
+_FONT_PATTERNS = ('*.woff*', '*.ttf*', '*.otf*', '*.eot*')
+
+class BrowserProfile:
+    """
+    크롤링용 Chrome 설정입니다.
+
+    텍스트와 img src 속성만 읽으므로 이미지, 미디어, 폰트, 광고/분석 요청은 막습니다.
+    막은 이미지도 src 속성은 DOM에 그대로 남습니다.
+    """
+
+    def __init__(self, block_images=True, block_media=True, block_fonts=True, block_stylesheets=False,
+                 blocked_domains=BLOCKED_DOMAINS, page_load_strategy='eager', js_heap_mb=512):
+        """
+        Args:
+            block_images (bool): 이미지 요청을 막을지 여부
+            block_media (bool): 동영상/오디오 요청을 막을지 여부
+            block_fonts (bool): 웹 폰트 요청을 막을지 여부
+            block_stylesheets (bool): CSS 요청을 막을지 여부. 레이아웃에 따라 내용을 그리는 페이지가 있어 기본값은 False
+            blocked_domains (tuple): 요청을 막을 도메인
+            page_load_strategy (str): 'eager'면 DOMContentLoaded에서 driver.get()이 반환됩니다 (나머지는 page_ready가 기다림)
+            js_heap_mb (int): 렌더러의 V8 힙 상한(MB). None이면 제한하지 않습니다.
+        """
+        self.block_images = block_images
+        self.block_media = block_media
+        self.block_fonts = block_fonts
+        self.block_stylesheets = block_stylesheets
+        self.blocked_domains = tuple(blocked_domains)
+        self.page_load_strategy = page_load_strategy
+        self.js_heap_mb = js_heap_mb
+
+    @classmethod
+    def full(cls):
+        """아무것도 막지 않는 일반 브라우저 설정 (비교용)"""
+        return cls(block_images=False, block_media=False, block_fonts=False,
+                   blocked_domains=(), page_load_strategy='normal', js_heap_mb=None)
+
+    @classmethod
+    def from_name(cls, name):
+        """BROWSER_PROFILE 환경 변수 값('light' 또는 'full')으로 설정을 고릅니다."""
+        return cls.full() if name == 'full' else cls()
+
+    def blocked_url_patterns(self):
+        """CDP Network.setBlockedURLs에 넘길 URL 패턴"""
+        patterns = []
+        if self.block_images:
+            patterns.extend(_IMAGE_PATTERNS)
+        if self.block_media:
+            patterns.extend(_MEDIA_PATTERNS)
+        if self.block_fonts:
+            patterns.extend(_FONT_PATTERNS)
+        if self.block_stylesheets:
+            patterns.append('*.css*')
+        patterns.extend(f'*{domain}*' for domain in self.blocked_domains)
+        return patterns
+
+    def chrome_options(self, options=None):
+        """헤드리스 Chrome 옵션에 이 설정을 적용해 반환합니다."""
+        options = options or Options()
+        options.add_argument('--headless')  # 헤드리스 모드
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        # 네트워크 유휴 대기와 페이지별 전송량 측정(page_ready)에 쓰는 CDP 네트워크 이벤트
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        options.page_load_strategy = self.page_load_strategy
+
+        # 크롤링에 필요 없는 기능
+        for argument in ('--disable-extensions', '--disable-gpu', '--disable-background-networking',
+                         '--disable-sync', '--disable-default-apps', '--disable-component-update',
+                         '--disable-notifications', '--mute-audio', '--no-first-run',
+                         '--disable-features=Translate,MediaRouter,OptimizationHints'):
+            options.add_argument(argument)
+
+        if self.js_heap_mb:
+            options.add_argument(f'--js-flags=--max-old-space-size={self.js_heap_mb}')
+
+        prefs = {}
+        if self.block_images:
+            prefs['profile.managed_default_content_settings.images'] = 2
+            options.add_argument('--blink-settings=imagesEnabled=false')
+        if self.block_media:
+            prefs['profile.managed_default_content_settings.media_stream'] = 2
+            options.add_argument('--autoplay-policy=user-gesture-required')
+        if prefs:
+            options.add_experimental_option('prefs', prefs)
+        return options
+
+    def apply(self, driver):
+        """띄운 드라이버에 CDP로 요청 차단을 겁니다. CDP를 쓸 수 없는 드라이버는 그냥 둡니다."""
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            # 페이지별 메모리 측정(page_ready)에 씁니다
+            driver.execute_cdp_cmd('Performance.enable', {})
+            patterns = self.blocked_url_patterns()
+            if patterns:
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        except Exception as e:
+            logger.warning(f"요청 차단 설정 실패: {str(e)}")
+        return driver
+
+def create_chrome_driver(profile=None):
+    """헤드리스 Chrome WebDriver를 새로 띄웁니다. profile이 없으면 가벼운 기본 설정을 씁니다."""
+    profile = profile or BrowserProfile()
+    service = ChromeService(get_driver_path())
+    driver = webdriver.Chrome(service=service, options=profile.chrome_options())
+    return profile.apply(driver)
+
+class DriverPoolTimeout(Exception):
+    """정해진 시간 안에 사용할 수 있는 드라이버가 없을 때 발생합니다."""
+    pass
+
+class DriverPool:
+    """
+    여러 스레드가 함께 쓰는 WebDriver 풀입니다.
+
+    드라이버는 최대 size개까지만 띄우고, 빌려간 드라이버는 반납되면 다시 씁니다.
+    max_pages번 사용한 드라이버나 응답하지 않는 드라이버는 종료하고 새로 띄웁니다.
+    """
+
+    def __init__(self, size=2, max_pages=50, acquire_timeout=60, driver_factory=None):
+        self.size = size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self.driver_factory = driver_factory or create_chrome_driver
+
+        self._cond = threading.Condition()
+        self._idle = []        # 반납된 드라이버 (LIFO)
+        self._pages = {}       # id(driver) -> 사용 횟수
+        self._total = 0        # 띄워져 있거나 띄우는 중인 드라이버 수
+        self._closed = False
+
+        # 통계
+        self._acquired = 0
+        self._waited = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._created = 0
+        self._recycled = 0
+        self._crashed = 0
+
+    def warm_up(self, count=None):
+        """드라이버를 미리 띄워 첫 요청이 Chrome 기동 시간을 기다리지 않게 합니다."""
+        count = self.size if count is None else min(count, self.size)
+
+        while True:
+            with self._cond:
+                if self._closed or self._total >= count:
+                    return
+                self._total += 1
+
+            driver = self._spawn()
+            with self._cond:
+                if driver is None:
+                    return
+                self._idle.append(driver)
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """
+        드라이버를 빌립니다.
+
+        Args:
+            timeout (float): 최대 대기 시간(초). None이면 acquire_timeout을 씁니다.
+
+        Returns:
+            WebDriver: 사용이 끝나면 release()로 반납해야 합니다.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            driver = None
+            spawn = False
+
+            with self._cond:
+                while not self._idle and self._total >= self.size:
+                    if self._closed:
+                        raise DriverPoolTimeout("드라이버 풀이 종료되었습니다")
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise DriverPoolTimeout(f"{timeout}초 안에 사용할 수 있는 드라이버가 없습니다")
+                    waited = True
+                    self._cond.wait(remaining)
+
+                if self._closed:
+                    raise DriverPoolTimeout("드라이버 풀이 종료되었습니다")
+
+                if self._idle:
+                    driver = self._idle.pop()
+                else:
+                    self._total += 1
+                    spawn = True
+
+            if spawn:
+                driver = self._spawn()
+                if driver is None:
+                    raise WebDriverException("Chrome 드라이버를 띄우지 못했습니다")
+            elif not self._is_healthy(driver):
+                # 이전 사용 중에 죽은 드라이버는 버리고 다시 시도합니다
+                with self._cond:
+                    self._crashed += 1
+                self._discard(driver)
+                continue
+
+            wait = time.monotonic() - started
+            with self._cond:
+                self._acquired += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+                if waited:
+                    self._waited += 1
+            return driver
+
+    def release(self, driver, broken=False):
+        """빌린 드라이버를 반납합니다. 고장났거나 사용 한도를 넘긴 드라이버는 종료합니다."""
+        with self._cond:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+
+            if broken:
+                self._crashed += 1
+            elif pages >= self.max_pages:
+                self._recycled += 1
+            elif not self._closed:
+                self._idle.append(driver)
+                self._cond.notify()
+                return
+
+        self._discard(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """with 문으로 드라이버를 빌리고 자동으로 반납합니다."""
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = not self._is_healthy(driver)
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def stats(self):
+        """풀 크기와 대기 시간 통계를 반환합니다."""
+        with self._cond:
+            return {
+                'size': self.size,
+                'total': self._total,
+                'idle': len(self._idle),
+                'in_use': self._total - len(self._idle),
+                'acquired': self._acquired,
+                'waited': self._waited,
+                'timeouts': self._timeouts,
+                'wait_avg': self._wait_total / self._acquired if self._acquired else 0.0,
+                'wait_max': self._wait_max,
+                'created': self._created,
+                'recycled': self._recycled,
+                'crashed': self._crashed
+            }
+
+    def close(self):
+        """풀을 닫고 쉬고 있는 드라이버를 모두 종료합니다."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+
+        for driver in idle:
+            self._discard(driver)
+
+    def _spawn(self):
+        try:
+            with metrics.span('driver_launch'):
+                driver = self.driver_factory()
+        except Exception as e:
+            logger.error(f"Chrome 드라이버 초기화 오류: {str(e)}")
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            return None
+
+        with self._cond:
+            self._created += 1
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+        with self._cond:
+            self._pages.pop(id(driver), None)
+            self._total -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, driver):
+        try:
+            driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
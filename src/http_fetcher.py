@@ -0,0 +1,105 @@
+from requests.adapters import HTTPAdapter
+import requests
+import logging
+import brunch_parser
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive'
+}
+
+class FetchResult:
+    """HTTP 응답 중 크롤링에 필요한 부분입니다."""
+
+    def __init__(self, url, status, html=None, etag=None, last_modified=None):
+        self.url = url
+        self.status = status
+        self.html = html
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def not_modified(self):
+        """조건부 요청에 서버가 304로 답해 본문을 다시 받지 않았는지 여부"""
+        return self.status == 304
+
+class HttpFetcher:
+    """
+    브라우저 없이 requests로 페이지를 가져옵니다.
+
+    Session 하나를 여러 스레드가 함께 쓰므로 같은 호스트에 대한 연결은 keep-alive로 재사용됩니다.
+    """
+
+    def __init__(self, timeout=10, pool_size=16):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def fetch(self, url):
+        """URL의 HTML을 가져옵니다."""
+        return self.fetch_page(url).html
+
+    def fetch_page(self, url, etag=None, last_modified=None):
+        """
+        URL을 가져옵니다. 이전 응답의 ETag/Last-Modified를 주면 조건부 요청을 보냅니다.
+
+        Returns:
+            FetchResult: 바뀌지 않았으면 status가 304이고 html은 None입니다.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        with metrics.span('http_fetch'):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return FetchResult(url, 304, etag=etag, last_modified=last_modified)
+
+        response.raise_for_status()
+        return FetchResult(
+            url,
+            response.status_code,
+            html=response.text,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+
+    def fetch_article(self, url):
+        """
+        정적 HTML만으로 글을 추출합니다.
+
+        Returns:
+            dict: 글 정보. 요청이 실패했거나 필요한 요소가 없으면 None (브라우저로 다시 시도해야 함)
+        """
+        try:
+            result = self.fetch_page(url)
+        except requests.RequestException as e:
+            logger.info(f"HTTP 요청 실패, 브라우저로 다시 시도합니다: {url} ({str(e)})")
+            return None
+
+        with metrics.span('parse'):
+            article = brunch_parser.parse_article(brunch_parser.make_soup(result.html), url)
+        if article is None:
+            logger.info(f"정적 HTML에 본문이 없어 브라우저로 다시 시도합니다: {url}")
+            return None
+
+        article['etag'] = result.etag
+        article['last_modified'] = result.last_modified
+        return article
+
+    def close(self):
+        self.session.close()
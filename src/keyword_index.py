@@ -0,0 +1,291 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import Counter
+import threading
+import logging
+import re
+import time
+import metrics
+from text_processing import STOP_WORDS, count_keywords
+
+logger = logging.getLogger(__name__)
+
+# 한글/영문/숫자로만 이루어진 명사만 키워드로 씁니다
+_WORD_RE = re.compile(r'^[가-힣A-Za-z0-9]+$')
+
+# Mecab 품사 중 일반명사, 고유명사
+_MECAB_NOUN_TAGS = {'NNG', 'NNP'}
+
+# 분석기가 실패해 다음 묶음에서 다시 시도할 작업
+_RETRY = object()
+
+class NounExtractor:
+    """
+    konlpy 형태소 분석기로 글에서 명사를 뽑습니다.
+
+    분석기는 처음 쓸 때 한 번만 띄우고(Okt는 JVM 기동) 이후에는 계속 재사용합니다.
+    konlpy나 분석기를 쓸 수 없으면 정규식 기반 count_keywords로 대신합니다.
+    """
+
+    def __init__(self, tagger='auto'):
+        """
+        Args:
+            tagger (str): 'mecab', 'okt', 'regex' 또는 'auto' (Mecab → Okt → 정규식 순서로 시도)
+        """
+        self.tagger = tagger
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._name = None
+
+    @property
+    def name(self):
+        """실제로 쓰는 분석기 이름. 처음 호출할 때 분석기를 띄웁니다."""
+        with self._lock:
+            if self._name is None:
+                self._name = self._load_name()
+        return self._name
+
+    def count(self, text):
+        """본문의 명사별 등장 횟수를 셉니다."""
+        if not text:
+            return Counter()
+        if self.name == 'regex':
+            return count_keywords(text)
+
+        counter = Counter()
+        for word in self._nouns(text):
+            if len(word) >= 2 and word not in STOP_WORDS and _WORD_RE.match(word):
+                counter[word] += 1
+        return counter
+
+    def warm_up(self):
+        """분석기를 미리 띄워 첫 글이 기동 시간을 기다리지 않게 합니다."""
+        self.count('형태소 분석기를 미리 띄웁니다.')
+
+    def _load_name(self):
+        candidates = ['mecab', 'okt'] if self.tagger == 'auto' else [self.tagger]
+        for name in candidates:
+            if name == 'regex':
+                break
+            try:
+                self._tagger(name)
+                logger.info(f"키워드 추출에 {name} 형태소 분석기를 씁니다")
+                return name
+            except Exception as e:
+                logger.info(f"{name} 형태소 분석기를 쓸 수 없습니다: {str(e)}")
+        logger.info("키워드 추출에 정규식 방식을 씁니다")
+        return 'regex'
+
+    def _tagger(self, name=None):
+        # 분석기 객체는 스레드마다 하나씩 둡니다 (Okt의 JVM은 프로세스에 하나만 뜹니다)
+        name = name or self._name
+        tagger = getattr(self._local, name, None)
+        if tagger is None:
+            if name == 'mecab':
+                from konlpy.tag import Mecab
+                tagger = Mecab()
+            elif name == 'okt':
+                from konlpy.tag import Okt
+                tagger = Okt()
+            else:
+                raise ValueError(f"알 수 없는 분석기입니다: {name}")
+            setattr(self._local, name, tagger)
+        return tagger
+
+    def _nouns(self, text):
+        tagger = self._tagger()
+        if self._name == 'mecab':
+            return [word for word, tag in tagger.pos(text) if tag in _MECAB_NOUN_TAGS]
+        # Okt는 norm으로 오타/반복을 정규화한 뒤 명사만 고릅니다
+        return [word for word, tag in tagger.pos(text, norm=True, stem=True) if tag == 'Noun']
+
+class KeywordIndexer:
+    """
+    저장된 글의 키워드를 백그라운드에서 한 번씩 뽑아 키워드 인덱스에 반영합니다.
+
+    글을 저장하면 keyword_jobs에 작업이 생기고, 작업 스레드가 묶음으로 가져가
+    workers개의 스레드에서 명사를 뽑은 뒤 한 트랜잭션으로 반영합니다.
+    분석기가 실패한 글은 다른 방식으로 센 결과를 섞지 않도록 작업을 남겨 두었다가 다시 시도하고,
+    max_attempts번 실패하면 키워드 없이 작업을 끝냅니다.
+    정규식 추출기는 GIL 때문에 스레드로는 코어를 하나만 쓰므로, processes를 주면 프로세스 풀에서 셉니다.
+    """
+
+    def __init__(self, db, extractor=None, workers=2, batch_size=20, poll_interval=2.0, processes=0,
+                 max_attempts=3):
+        """
+        Args:
+            db (Database): 키워드 인덱스를 둔 데이터베이스
+            extractor (NounExtractor): 명사 추출기. 없으면 기본 설정으로 만듭니다.
+            workers (int): 명사를 뽑는 스레드 수
+            batch_size (int): 한 번에 가져와 반영하는 글 수. processes를 쓰면 크게 잡아야 코어가 고루 일합니다.
+            poll_interval (float): 새 작업이 있는지 확인하는 간격(초)
+            processes (int): 정규식 추출기일 때 키워드를 셀 프로세스 수. 1 이하면 스레드에서 셉니다.
+                (형태소 분석기는 다른 프로세스로 보낼 수 없어 항상 스레드에서 셉니다)
+            max_attempts (int): 분석기가 실패한 글을 몇 번까지 시도할지
+        """
+        self.db = db
+        self.extractor = extractor or NounExtractor()
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.processes = processes
+        self.max_attempts = max_attempts
+
+        self._executor = None
+        self._pool = None
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stopping = False
+
+        self._stats_lock = threading.Lock()
+        self._counts = {'processed': 0, 'applied': 0, 'failed': 0, 'dropped': 0, 'batches': 0}
+        self._extract_time = 0.0
+        self._attempts = {}  # url -> 분석기가 실패한 횟수
+
+    def start(self):
+        """작업 스레드를 띄웁니다. 추출기가 바뀌었으면 모든 글을 다시 처리하도록 작업을 넣습니다."""
+        if self._thread is not None:
+            return
+
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='keyword')
+        if self.processes > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        self._thread = threading.Thread(target=self._run, name='keyword-indexer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """작업 스레드에 종료를 알리고 처리 중인 묶음이 끝날 때까지 기다립니다."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def notify(self):
+        """새 글이 저장되었음을 알려 다음 확인 주기를 기다리지 않고 처리하게 합니다."""
+        self._wakeup.set()
+
+    def run_once(self, limit=None):
+        """
+        대기 중인 작업을 한 묶음 처리합니다. 작업 스레드 없이 직접 부를 수도 있습니다.
+
+        Returns:
+            int: 처리한 글 수. 다시 시도하려고 남겨 둔 글은 세지 않습니다.
+        """
+        jobs = self.db.pending_keyword_jobs(limit or self.batch_size)
+        if not jobs:
+            return 0
+
+        started = time.monotonic()
+        if self._pool is not None and self.extractor.name == 'regex':
+            counts = self._count_in_processes(jobs)
+        elif self._executor is not None:
+            counts = list(self._executor.map(self._extract, jobs))
+        else:
+            counts = [self._extract(job) for job in jobs]
+        elapsed = time.monotonic() - started
+
+        results = []
+        dropped = 0
+        with self._stats_lock:
+            for (url, content_hash, _), count in zip(jobs, counts):
+                if count is not _RETRY:
+                    self._attempts.pop(url, None)
+                elif self._attempts[url] >= self.max_attempts:
+                    # 계속 실패하는 글은 예전 키워드만 빼고 작업을 끝냅니다
+                    logger.error(f"키워드 추출을 {self._attempts.pop(url)}번 실패해 건너뜁니다: {url}")
+                    count = None
+                    dropped += 1
+                else:
+                    continue
+                results.append((url, content_hash, count))
+
+        applied = 0
+        if results:
+            with metrics.span('keyword_apply'):
+                applied = self.db.apply_keywords(results)
+
+        with self._stats_lock:
+            self._counts['processed'] += len(results)
+            self._counts['applied'] += applied
+            self._counts['dropped'] += dropped
+            self._counts['batches'] += 1
+            self._extract_time += elapsed
+        return len(results)
+
+    def drain(self):
+        """대기 중인 작업이 없어지거나 다시 시도할 글만 남을 때까지 처리합니다."""
+        total = 0
+        while True:
+            processed = self.run_once()
+            if not processed:
+                return total
+            total += processed
+
+    def stats(self):
+        """처리한 글 수와 글당 평균 추출 시간을 반환합니다."""
+        with self._stats_lock:
+            stats = dict(self._counts)
+            stats['extract_avg'] = self._extract_time / stats['processed'] if stats['processed'] else 0.0
+            stats['retrying'] = len(self._attempts)
+        stats['extractor'] = self.extractor.name
+        stats['pending'] = self.db.keyword_job_count()
+        stats['workers'] = self.workers
+        stats['processes'] = self.processes if self._pool is not None else 0
+        return stats
+
+    def _run(self):
+        try:
+            self.extractor.warm_up()
+            # 다른 추출기로 만든 인덱스는 섞이지 않도록 전부 다시 뽑습니다
+            if self.db.get_keyword_state('extractor') != self.extractor.name:
+                queued = self.db.enqueue_all_keywords()
+                self.db.set_keyword_state('extractor', self.extractor.name)
+                logger.info(f"키워드 추출기가 바뀌어 글 {queued}개를 다시 처리합니다")
+        except Exception as e:
+            logger.error(f"키워드 추출기 준비 중 오류 발생: {str(e)}")
+
+        while not self._stopping:
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"키워드 추출 중 오류 발생: {str(e)}")
+                processed = 0
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _count_in_processes(self, jobs):
+        # 지워진 글과 중복 글(본문 None)은 보내지 않고 키워드만 빼도록 None을 둡니다
+        contents = [content for _, _, content in jobs if content is not None]
+        chunksize = max(1, len(contents) // (self.processes * 4))
+        try:
+            with metrics.span('keyword_extract_batch'):
+                counted = iter(list(self._pool.map(count_keywords, contents, chunksize=chunksize)))
+        except Exception as e:
+            logger.error(f"프로세스 풀에서 키워드를 세지 못해 이 스레드에서 셉니다: {str(e)}")
+            return [self._extract(job) for job in jobs]
+        return [None if content is None else next(counted) for _, _, content in jobs]
+
+    def _extract(self, job):
+        url, _, content = job
+        if content is None:
+            # 지워진 글은 키워드만 빼고 작업을 끝냅니다
+            return None
+        try:
+            with metrics.span('keyword_extract'):
+                return self.extractor.count(content)
+        except Exception as e:
+            # 정규식으로 센 결과를 형태소 분석 인덱스에 섞지 않고 다음 묶음에서 다시 시도합니다
+            logger.error(f"키워드 추출 실패: {url} ({str(e)})")
+            with self._stats_lock:
+                self._counts['failed'] += 1
+                self._attempts[url] = self._attempts.get(url, 0) + 1
+            return _RETRY
@@ -0,0 +1,317 @@
+from contextlib import contextmanager
+import threading
+import cProfile
+import logging
+import pstats
+import random
+import time
+import io
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# 지연 시간 히스토그램의 기본 구간(초). 페이지 로드처럼 긴 구간도 담도록 30초까지 둡니다
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """이름, 설명, 레이블 이름이 정해진 지표. 레이블 값 조합마다 값을 따로 둡니다."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}의 레이블은 {self.labelnames}입니다: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        help_text = self.documentation.replace('\\', '\\\\').replace('\n', '\\n')
+        lines = [f'# HELP {self.name} {help_text}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in values]
+
+class Counter(_Metric):
+    """늘어나기만 하는 횟수"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        # 레이블이 없는 카운터는 한 번도 늘지 않았어도 0으로 내보냅니다
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """
+    지금의 값. set()으로 직접 정하거나, 읽을 때마다 값을 구하는 함수를 set_function()으로 줍니다.
+
+    함수는 레이블이 없으면 숫자를, 있으면 {레이블 값 튜플: 숫자}를 반환합니다.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        self._function = function
+
+    def _samples(self):
+        if self._function is None:
+            return super()._samples()
+        try:
+            values = self._function()
+        except Exception as e:
+            logger.warning(f"{self.name} 값을 구하지 못했습니다: {str(e)}")
+            return []
+        if not self.labelnames:
+            return [f'{self.name} {_format_value(values)}']
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in sorted(values.items())
+        ]
+
+class Histogram(_Metric):
+    """관측값을 구간별로 센 분포. Prometheus에서 histogram_quantile()로 p50/p95를 구합니다."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록이 걸린 시간을 관측합니다. 예외로 끝나도 기록합니다."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts + [count - sum(counts)]):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+class Registry:
+    """지표를 이름으로 모아 두고 Prometheus 텍스트 형식으로 내보냅니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        # 모듈을 다시 불러와도 같은 지표를 이어서 씁니다
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"이름이 같은 다른 지표가 이미 있습니다: {metric.name}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self):
+        """모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+# Prometheus 텍스트 형식의 Content-Type
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REGISTRY = Registry()
+
+# 크롤링/저장 경로의 구간별 소요 시간
+# driver_launch, page_load, readiness_wait, http_fetch, parse, db_write, keyword_extract, keyword_extract_batch, keyword_apply
+SPAN_SECONDS = REGISTRY.histogram(
+    'newsletter_span_seconds', '크롤링/저장 경로의 구간별 소요 시간(초)', ('span',)
+)
+
+PAGES_CRAWLED = REGISTRY.counter(
+    'newsletter_pages_crawled_total', '가져온 글 페이지 수 (fetched, rendered, not_modified)', ('engine', 'result')
+)
+CRAWL_FAILURES = REGISTRY.counter(
+    'newsletter_crawl_failures_total', '크롤링하거나 저장하지 못한 글 수', ('engine',)
+)
+DUPLICATES_SKIPPED = REGISTRY.counter(
+    'newsletter_duplicates_skipped_total', '이미 저장되어 크롤링하지 않은 URL 수'
+)
+ACTIVE_THREADS = REGISTRY.gauge(
+    'newsletter_active_threads', '이름별로 묶은 살아 있는 스레드 수', ('group',)
+)
+
+# 스레드 이름 끝의 번호를 떼어 같은 일을 하는 스레드를 묶습니다 (crawl-fetch-0, keyword_1, Thread-3 (...))
+_THREAD_NUMBER = re.compile(r'[-_]?\d+( \(.*\))?$')
+
+def _thread_groups():
+    groups = {}
+    for thread in threading.enumerate():
+        group = _THREAD_NUMBER.sub('', thread.name) or thread.name
+        groups[(group,)] = groups.get((group,), 0) + 1
+    return groups
+
+ACTIVE_THREADS.set_function(_thread_groups)
+
+def span(name):
+    """
+    with 블록의 소요 시간을 newsletter_span_seconds{span=name}에 기록합니다.
+
+        with metrics.span('parse'):
+            article = brunch_parser.parse_article(soup, url)
+    """
+    return SPAN_SECONDS.time(span=name)
+
+class RequestProfiler:
+    """
+    요청 하나를 cProfile로 재는 샘플러입니다.
+
+    PROFILE_SAMPLE_RATE(0~1) 비율의 요청을 무작위로 재고, allow_header가 True면
+    X-Profile: 1 헤더가 붙은 요청도 잽니다. 결과는 누적 시간 상위 함수를 로그로 남기고,
+    output_dir이 있으면 snakeviz 등으로 열 수 있는 .prof 파일로도 저장합니다.
+    """
+
+    HEADER = 'X-Profile'
+
+    def __init__(self, sample_rate=0.0, allow_header=False, output_dir=None, top=25):
+        """
+        Args:
+            sample_rate (float): 무작위로 잴 요청 비율
+            allow_header (bool): X-Profile 헤더로 요청한 경우에도 잴지 여부. 운영에서는 내부망에서만 켜세요.
+            output_dir (str): .prof 파일을 저장할 디렉터리. None이면 로그만 남깁니다.
+            top (int): 로그에 남길 함수 수
+        """
+        self.sample_rate = sample_rate
+        self.allow_header = allow_header
+        self.output_dir = output_dir
+        self.top = top
+        self._lock = threading.Lock()
+        self._profiled = 0
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """PROFILE_SAMPLE_RATE, PROFILE_ALLOW_HEADER, PROFILE_DIR 환경 변수로 만듭니다."""
+        environ = os.environ if environ is None else environ
+        return cls(
+            sample_rate=float(environ.get('PROFILE_SAMPLE_RATE', 0)),
+            allow_header=environ.get('PROFILE_ALLOW_HEADER') == '1',
+            output_dir=environ.get('PROFILE_DIR') or None
+        )
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or self.allow_header
+
+    def should_profile(self, headers):
+        if self.allow_header and headers.get(self.HEADER) == '1':
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self):
+        """
+        현재 스레드를 재기 시작합니다.
+
+        Returns:
+            cProfile.Profile: finish()에 넘깁니다. 다른 프로파일러가 이미 돌고 있으면 None
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            logger.info(f"요청을 프로파일링하지 못했습니다: {str(e)}")
+            return None
+        return profile
+
+    def finish(self, profile, label):
+        """재기를 멈추고 결과를 로그와 파일로 남깁니다."""
+        profile.disable()
+        with self._lock:
+            self._profiled += 1
+            number = self._profiled
+
+        out = io.StringIO()
+        stats = pstats.Stats(profile, stream=out)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        logger.info(f"프로파일 {label}\n{out.getvalue()}")
+
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+            name = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_') or 'request'
+            path = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{number}-{name}.prof")
+            stats.dump_stats(path)
+            return path
+        return None
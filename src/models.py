@@ -1,32 +1,36 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+import content_codec
 
+# 테이블과 인덱스는 Database.setup()의 마이그레이션이 만듭니다.
+# 이 모델은 같은 newsletter.db를 SQLAlchemy로 읽기 위한 매핑이므로 create_all()을 호출하지 마세요.
 db = SQLAlchemy()
 
-class Newsletter(db.Model):
-    __tablename__ = 'newsletters'
-    
-    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    url = db.Column(db.String(500), nullable=False, unique=True)
-    title = db.Column(db.String(200), nullable=False)
-    date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    content = db.Column(db.Text, nullable=False)
-    domain = db.Column(db.String(100), nullable=False)
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    
-    def __repr__(self):
-        return f'<Newsletter {self.title}>'
-
 class Article(db.Model):
     __tablename__ = 'articles'
-    
+
     id = db.Column(db.Integer, primary_key=True)
-    url = db.Column(db.String(500), unique=True, nullable=False)
-    title = db.Column(db.String(200))
-    content = db.Column(db.Text)
-    domain = db.Column(db.String(100))
+    url = db.Column(db.Text, unique=True)
+    title = db.Column(db.Text)
+    author = db.Column(db.Text)
+    thumbnail = db.Column(db.Text)
+    domain = db.Column(db.Text)
     crawled_at = db.Column(db.DateTime, default=datetime.now)
     created_at = db.Column(db.DateTime, default=datetime.now)
+    etag = db.Column(db.Text)
+    last_modified = db.Column(db.Text)
+    content_hash = db.Column(db.Text)
+    # 거의 같은 글이면 대표 글의 id, 대표 글이면 None
+    canonical_id = db.Column(db.Integer)
+
+    body = db.relationship('ArticleBody', uselist=False, lazy='select')
+
+    @property
+    def content(self):
+        """압축해 둔 본문. 읽을 때만 article_bodies에서 가져와 풉니다."""
+        if self.body is None:
+            return None
+        return content_codec.decompress(self.body.codec, self.body.body)
 
     def to_dict(self):
         return {
@@ -34,7 +38,17 @@ class Article(db.Model):
             'url': self.url,
             'title': self.title,
             'content': self.content,
+            'author': self.author,
+            'thumbnail': self.thumbnail,
             'domain': self.domain,
             'crawled_at': self.crawled_at.isoformat() if self.crawled_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'canonical_id': self.canonical_id
         }
+
+class ArticleBody(db.Model):
+    __tablename__ = 'article_bodies'
+
+    article_id = db.Column(db.Integer, db.ForeignKey('articles.id'), primary_key=True)
+    codec = db.Column(db.Text, nullable=False)
+    body = db.Column(db.LargeBinary, nullable=False)
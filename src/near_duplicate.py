@@ -0,0 +1,86 @@
+import hashlib
+import struct
+import zlib
+
+# 연속한 어절 몇 개를 shingle 하나로 볼지. 글자 n-gram보다 shingle 수가 몇 배 적어 서명을 빨리 만듭니다
+SHINGLE_SIZE = 3
+
+# MinHash 값 수 = 밴드 수 × 밴드당 값 수
+# 유사도 s인 두 글이 LSH 후보가 될 확률은 1 - (1 - s^ROWS)^BANDS (s=0.8이면 99.9%, s=0.3이면 12%)
+BANDS = 16
+ROWS = 4
+SLOTS = BANDS * ROWS
+
+# 추정 자카드 유사도가 이 이상이면 같은 글로 봅니다
+THRESHOLD = 0.8
+
+# shingle이 이보다 적은 짧은 글은 비교하지 않습니다. 칸이 많이 비어 추정이 부정확하고 짧은 안내문끼리 잘못 묶입니다
+MIN_SHINGLES = SLOTS
+
+# 아무 shingle도 들어오지 않은 칸. 실제 값(32비트 해시를 SLOTS로 나눈 몫)보다 항상 큽니다
+_EMPTY = 0xFFFFFFFF
+
+_SIGNATURE = struct.Struct(f'<{SLOTS}I')
+_BAND = struct.Struct(f'<{ROWS}I')
+
+def shingles(text):
+    """소문자로 바꾼 본문에서 연속한 SHINGLE_SIZE개 어절을 공백으로 이은 조각(UTF-8 바이트)들"""
+    # 어절마다 인코딩하지 않도록 공백을 하나로 줄여 한 번에 인코딩한 뒤 나눕니다
+    words = ' '.join(text.lower().split()).encode('utf-8').split(b' ')
+    return map(b' '.join, zip(*(words[i:] for i in range(SHINGLE_SIZE))))
+
+def signature(text):
+    """
+    본문의 MinHash 서명을 만듭니다.
+
+    순열을 SLOTS번 돌리는 대신 shingle마다 CRC32를 한 번만 구해 나머지로 칸을 고르고
+    칸마다 가장 작은 몫을 남깁니다 (one permutation hashing). 글 길이에 비례하는 시간만 듭니다.
+
+    Returns:
+        tuple: SLOTS개의 정수. 본문이 너무 짧으면 None
+    """
+    if not text:
+        return None
+    hashes = set(map(zlib.crc32, shingles(text)))
+    if len(hashes) < MIN_SHINGLES:
+        return None
+
+    mins = [_EMPTY] * SLOTS
+    for h in hashes:
+        slot, value = h % SLOTS, h // SLOTS
+        if value < mins[slot]:
+            mins[slot] = value
+    return tuple(mins)
+
+def similarity(a, b):
+    """두 서명의 추정 자카드 유사도. 두 글 모두 비어 있는 칸은 세지 않습니다."""
+    same = total = 0
+    for x, y in zip(a, b):
+        if x == _EMPTY and y == _EMPTY:
+            continue
+        total += 1
+        if x == y:
+            same += 1
+    return same / total if total else 0.0
+
+def band_keys(sig):
+    """
+    LSH 밴드별 버킷 키. 어느 한 밴드라도 키가 같은 글만 후보로 비교합니다.
+
+    밴드 번호를 함께 해시하므로 다른 밴드의 키와 겹치지 않아 모든 밴드를 한 번의 IN 조회로 찾을 수 있습니다.
+
+    Returns:
+        list: BANDS개의 버킷 키. SQLite INTEGER에 들어가는 부호 있는 64비트 정수입니다.
+    """
+    keys = []
+    for band in range(BANDS):
+        data = bytes([band]) + _BAND.pack(*sig[band * ROWS:(band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little', signed=True))
+    return keys
+
+def pack(sig):
+    """서명을 BLOB으로 저장할 바이트로 바꿉니다."""
+    return _SIGNATURE.pack(*sig)
+
+def unpack(data):
+    return _SIGNATURE.unpack(data)
@@ -0,0 +1,332 @@
+from collections import deque
+from selenium.common.exceptions import WebDriverException
+import threading
+import logging
+import metrics
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+# 페이지가 quiet_ms 동안 DOM 변경도, 새 리소스 로드도 없으면 끝난 것으로 봅니다
+_QUIESCENCE_SCRIPT = '''
+const quietMs = arguments[0], maxMs = arguments[1], done = arguments[arguments.length - 1];
+const start = performance.now();
+let last = start;
+let resources = performance.getEntriesByType('resource').length;
+const observer = new MutationObserver(() => { last = performance.now(); });
+observer.observe(document.documentElement || document, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+const timer = setInterval(() => {
+    const now = performance.now();
+    const count = performance.getEntriesByType('resource').length;
+    if (count !== resources) {
+        resources = count;
+        last = now;
+    }
+    if (now - last >= quietMs || now - start >= maxMs) {
+        clearInterval(timer);
+        observer.disconnect();
+        done(now - last >= quietMs);
+    }
+}, 50);
+'''
+
+_SELECTORS_SCRIPT = '''
+return arguments[0].every(selector => document.querySelector(selector) !== null);
+'''
+
+_SCROLL_SCRIPT = '''
+window.scrollTo(0, document.body.scrollHeight);
+return document.body.scrollHeight;
+'''
+
+class ReadinessProfile:
+    """페이지 종류별로 '다 읽혔다'고 판단하는 조건입니다."""
+
+    def __init__(self, name, selectors=(), quiet_ms=300, network_idle=False, scroll=False,
+                 timeout=10.0, min_timeout=2.0, max_timeout=20.0):
+        """
+        Args:
+            name (str): 페이지 종류
+            selectors (tuple): 모두 나타나야 하는 CSS 선택자
+            quiet_ms (int): 이 시간 동안 DOM 변경과 리소스 로드가 없으면 안정된 것으로 봅니다. 0이면 기다리지 않습니다.
+            network_idle (bool): 진행 중인 네트워크 요청이 없어질 때까지 기다릴지 여부 (CDP 성능 로그 필요)
+            scroll (bool): 지연 로딩되는 내용을 위해 높이가 더 늘지 않을 때까지 끝까지 스크롤할지 여부
+            timeout (float): 로드 시간 기록이 충분하기 전에 쓰는 제한 시간(초)
+            min_timeout (float): 학습된 제한 시간의 하한(초)
+            max_timeout (float): 학습된 제한 시간의 상한(초)
+        """
+        self.name = name
+        self.selectors = tuple(selectors)
+        self.quiet_ms = quiet_ms
+        self.network_idle = network_idle
+        self.scroll = scroll
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+DEFAULT_PROFILES = {
+    # 검색 결과 카드가 나타나면 바로 파싱합니다
+    'search': ReadinessProfile('search', selectors=('li[data-articleuid]',), quiet_ms=200),
+    # 글 본문
+    'article': ReadinessProfile('article', selectors=('.wrap_article', '.cover_title'), quiet_ms=300),
+    # 글 본문 + 끝까지 스크롤해야 나오는 내용
+    'article_scroll': ReadinessProfile(
+        'article_scroll', selectors=('.wrap_article', '.cover_title'), quiet_ms=300, scroll=True
+    ),
+    # 구조를 모르는 일반 페이지
+    'generic': ReadinessProfile('generic', selectors=('body',), quiet_ms=500, network_idle=True),
+}
+
+class PageReadiness:
+    """
+    고정된 sleep 대신 실제 조건(선택자, 네트워크 유휴, DOM 안정)으로 페이지 로드를 기다립니다.
+
+    페이지 종류별로 실제로 걸린 시간을 기록하고, 제한 시간을 최근 기록의 p95 * margin으로 맞춥니다.
+    """
+
+    def __init__(self, profiles=None, margin=1.5, min_samples=5, history=100):
+        """
+        Args:
+            profiles (dict): 페이지 종류 -> ReadinessProfile. 없으면 DEFAULT_PROFILES를 씁니다.
+            margin (float): 학습된 제한 시간 = 최근 대기 시간 p95 * margin
+            min_samples (int): 제한 시간을 학습하기 시작하는 기록 수
+            history (int): 페이지 종류별로 보관하는 최근 기록 수
+        """
+        self.profiles = dict(profiles or DEFAULT_PROFILES)
+        self.margin = margin
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._samples = {name: deque(maxlen=history) for name in self.profiles}
+        self._counts = {
+            name: {
+                'pages': 0, 'timeouts': 0, 'not_ready': 0,
+                'measured': 0, 'requests': 0, 'bytes': 0, 'blocked': 0,
+                'js_heap_total': 0, 'js_heap_max': 0
+            }
+            for name in self.profiles
+        }
+        self._recent = deque(maxlen=history)
+
+    def open(self, driver, url, page_type):
+        """
+        페이지를 열고 준비될 때까지 기다립니다.
+
+        Returns:
+            dict: 대기 기록. 'ready'가 False면 필요한 요소가 제한 시간 안에 나타나지 않은 것입니다.
+        """
+        # 이전 페이지의 네트워크 이벤트를 비워 이 페이지의 전송량만 셉니다
+        self._network_events(driver)
+        with metrics.span('page_load'):
+            driver.get(url)
+        return self.wait(driver, page_type, url)
+
+    def wait(self, driver, page_type, url=None):
+        """이미 연 페이지가 준비될 때까지 기다립니다. 반환값은 open()과 같습니다."""
+        profile = self.profiles[page_type]
+        timeout = self.timeout_for(page_type)
+        started = time.monotonic()
+        deadline = started + timeout
+
+        ready = self._wait_selectors(driver, profile.selectors, deadline)
+        selector_wait = time.monotonic() - started
+
+        traffic = {'requests': 0, 'bytes': 0, 'blocked': 0}
+        settled = ready
+        if ready and profile.network_idle:
+            settled = self._wait_network_idle(driver, profile.quiet_ms, deadline, traffic)
+        if settled and profile.scroll:
+            settled = self.scroll_until_stable(driver, profile.quiet_ms, deadline)
+        elif settled and profile.quiet_ms and not profile.network_idle:
+            settled = self._wait_quiescent(driver, profile.quiet_ms, deadline)
+
+        waited = time.monotonic() - started
+        metrics.SPAN_SECONDS.observe(waited, span='readiness_wait')
+
+        # 성능 로그를 쓸 수 없는 드라이버는 전송량을 None으로 둡니다
+        events = self._network_events(driver)
+        if events is None:
+            traffic = {'requests': None, 'bytes': None, 'blocked': None}
+        else:
+            self._tally(traffic, events)
+
+        record = {
+            'page_type': page_type,
+            'url': url,
+            'ready': ready,
+            'timed_out': not settled,
+            'waited': waited,
+            'selector_wait': selector_wait,
+            'settle_wait': waited - selector_wait,
+            'timeout': timeout,
+            'requests': traffic['requests'],
+            'bytes': traffic['bytes'],
+            'blocked': traffic['blocked'],
+            'js_heap': self._js_heap(driver)
+        }
+        self._record(record)
+        logger.debug(f"페이지 대기 {waited:.2f}s ({page_type}, ready={ready}, settled={settled}): {url}")
+        return record
+
+    def timeout_for(self, page_type):
+        """지금 쓸 제한 시간(초). 기록이 충분하면 최근 대기 시간으로 학습합니다."""
+        profile = self.profiles[page_type]
+        with self._lock:
+            samples = sorted(self._samples[page_type])
+        if len(samples) < self.min_samples:
+            return profile.timeout
+
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return min(profile.max_timeout, max(profile.min_timeout, p95 * self.margin))
+
+    def stats(self):
+        """페이지 종류별 대기 시간 통계와 최근 기록을 반환합니다."""
+        stats = {}
+        for name in self.profiles:
+            with self._lock:
+                samples = sorted(self._samples[name])
+                counts = dict(self._counts[name])
+            if counts['measured']:
+                counts['bytes_avg'] = counts['bytes'] / counts['measured']
+                counts['requests_avg'] = counts['requests'] / counts['measured']
+            if counts['pages'] and counts['js_heap_total']:
+                counts['js_heap_avg'] = counts['js_heap_total'] / counts['pages']
+            del counts['js_heap_total']
+            if samples:
+                counts['wait_avg'] = sum(samples) / len(samples)
+                counts['wait_p50'] = samples[len(samples) // 2]
+                counts['wait_p95'] = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            counts['timeout'] = self.timeout_for(name)
+            stats[name] = counts
+
+        with self._lock:
+            recent = list(self._recent)[-20:]
+        return {'profiles': stats, 'recent': recent}
+
+    def _record(self, record):
+        page_type = record['page_type']
+        with self._lock:
+            self._samples[page_type].append(record['waited'])
+            self._recent.append(record)
+            counts = self._counts[page_type]
+            counts['pages'] += 1
+            if record['timed_out']:
+                counts['timeouts'] += 1
+            if not record['ready']:
+                counts['not_ready'] += 1
+            if record['bytes'] is not None:
+                counts['measured'] += 1
+                counts['requests'] += record['requests']
+                counts['bytes'] += record['bytes']
+                counts['blocked'] += record['blocked']
+            if record['js_heap']:
+                counts['js_heap_total'] += record['js_heap']
+                counts['js_heap_max'] = max(counts['js_heap_max'], record['js_heap'])
+
+    def _wait_selectors(self, driver, selectors, deadline):
+        if not selectors:
+            return True
+
+        selectors = list(selectors)
+        while True:
+            try:
+                if driver.execute_script(_SELECTORS_SCRIPT, selectors):
+                    return True
+            except WebDriverException:
+                # 페이지 전환 중에는 스크립트가 실패할 수 있습니다
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def _wait_quiescent(self, driver, quiet_ms, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+
+        try:
+            driver.set_script_timeout(remaining + 5)
+            return bool(driver.execute_async_script(_QUIESCENCE_SCRIPT, quiet_ms, remaining * 1000))
+        except WebDriverException as e:
+            logger.debug(f"DOM 안정 대기 실패: {str(e)}")
+            return False
+
+    def scroll_until_stable(self, driver, quiet_ms, deadline):
+        """끝까지 스크롤하고 지연 로딩이 끝나길 기다리기를 높이가 변하지 않을 때까지 반복합니다."""
+        last_height = None
+        while time.monotonic() < deadline:
+            try:
+                height = driver.execute_script(_SCROLL_SCRIPT)
+            except WebDriverException:
+                return False
+            if height == last_height:
+                return True
+            last_height = height
+            if not self._wait_quiescent(driver, quiet_ms, deadline):
+                return False
+        return False
+
+    def _wait_network_idle(self, driver, idle_ms, deadline, traffic):
+        """CDP 네트워크 이벤트로 진행 중인 요청이 idle_ms 동안 없을 때까지 기다립니다. 읽은 이벤트는 traffic에 더합니다."""
+        in_flight = set()
+        last_activity = time.monotonic()
+
+        while True:
+            events = self._network_events(driver)
+            if events is None:
+                # 성능 로그를 쓸 수 없는 드라이버는 DOM/리소스 안정으로 대신합니다
+                return self._wait_quiescent(driver, idle_ms, deadline)
+
+            self._tally(traffic, events)
+            now = time.monotonic()
+            for method, params in events:
+                if method == 'Network.requestWillBeSent':
+                    in_flight.add(params.get('requestId'))
+                    last_activity = now
+                elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                    in_flight.discard(params.get('requestId'))
+                    last_activity = now
+
+            if not in_flight and (now - last_activity) * 1000 >= idle_ms:
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def _network_events(self, driver):
+        """드라이버 성능 로그에서 Network 이벤트를 꺼냅니다. 로그를 쓸 수 없으면 None"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return None
+
+        events = []
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method', '').startswith('Network.'):
+                events.append((message['method'], message.get('params', {})))
+        return events
+
+    def _tally(self, traffic, events):
+        """요청 수, 받은 바이트(압축된 크기), 차단된 요청 수를 셉니다."""
+        for method, params in events:
+            if method == 'Network.requestWillBeSent':
+                traffic['requests'] += 1
+            elif method == 'Network.loadingFinished':
+                traffic['bytes'] += int(params.get('encodedDataLength') or 0)
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                traffic['blocked'] += 1
+
+    def _js_heap(self, driver):
+        """렌더러가 쓰는 JS 힙 크기(바이트). 측정할 수 없으면 None"""
+        try:
+            metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+            return next((int(m['value']) for m in metrics if m['name'] == 'JSHeapUsedSize'), None)
+        except Exception:
+            return None
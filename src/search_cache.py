@@ -0,0 +1,261 @@
+from collections import OrderedDict
+import threading
+import logging
+import database
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    """진행 중인 검색 하나. 같은 검색을 요청한 스레드들이 결과를 함께 기다립니다."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+class SearchCache:
+    """
+    (검색어, 정렬 방식)별 검색 결과 캐시입니다.
+
+    - ttl초 동안은 캐시된 결과를 그대로 돌려줍니다.
+    - ttl이 지났어도 stale_ttl초 안이면 캐시된 결과를 바로 돌려주고 백그라운드에서 새로 검색합니다.
+    - 같은 검색이 동시에 여러 번 들어오면 한 번만 검색하고 결과를 나눠 씁니다.
+    - db_path를 주면 결과를 SQLite에도 저장해 재시작 후에도 씁니다.
+    """
+
+    def __init__(self, ttl=300, stale_ttl=3600, max_entries=256, db_path=None):
+        """
+        Args:
+            ttl (float): 결과를 새것으로 보는 시간(초)
+            stale_ttl (float): ttl이 지난 뒤에도 결과를 먼저 돌려줄 수 있는 시간(초)
+            max_entries (int): 메모리에 둘 최대 항목 수. 넘으면 가장 오래 쓰지 않은 항목부터 지웁니다.
+            db_path (str): 영구 캐시를 둘 데이터베이스 경로. None이면 메모리에만 둡니다.
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+
+        self._entries = OrderedDict()   # key -> (results, fetched_at)
+        self._flights = {}              # key -> _Flight
+        self._lock = threading.Lock()
+        self._counts = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'persistent_hits': 0,
+            'refreshes': 0,
+            'evictions': 0,
+            'errors': 0
+        }
+
+    def setup(self):
+        """영구 캐시 테이블을 만듭니다."""
+        if not self.db_path:
+            return
+
+        conn = database.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_cache (
+                query TEXT NOT NULL,
+                sort_by TEXT NOT NULL,
+                results TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (query, sort_by)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def get(self, query, sort_by, loader):
+        """
+        캐시된 검색 결과를 돌려주고, 없으면 loader(query, sort_by)로 검색합니다.
+
+        Args:
+            query (str): 검색어
+            sort_by (str): 정렬 방식
+            loader (callable): 실제 검색 함수
+
+        Returns:
+            list: 검색 결과 목록
+        """
+        results = self.get_cached(query, sort_by, loader)
+        if results is not None:
+            return results
+
+        return self._load((query.strip(), sort_by), loader)
+
+    def get_cached(self, query, sort_by, loader=None):
+        """
+        캐시에 있는 결과만 돌려줍니다. 없으면 검색하지 않고 None을 돌려줍니다.
+
+        오래된 결과를 돌려줄 때 loader를 주면 백그라운드에서 새로 검색합니다.
+        """
+        key = (query.strip(), sort_by)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            entry = self._load_persistent(key)
+
+        if entry is None:
+            return None
+
+        results, fetched_at = entry
+        age = time.time() - fetched_at
+
+        if age < self.ttl:
+            self._count('hits')
+            return results
+
+        if age < self.ttl + self.stale_ttl:
+            # 오래된 결과를 먼저 돌려주고 새 결과는 백그라운드에서 가져옵니다
+            self._count('stale_hits')
+            if loader is not None:
+                self._refresh_in_background(key, loader)
+            return results
+
+        return None
+
+    def put(self, query, sort_by, results):
+        """다른 경로(예: 스트리밍 검색)로 얻은 결과를 캐시에 넣습니다."""
+        self._count('misses')
+        self._store((query.strip(), sort_by), results)
+
+    def invalidate(self, query=None, sort_by=None):
+        """캐시를 지웁니다. query를 주지 않으면 전체를 지웁니다."""
+        with self._lock:
+            if query is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((query.strip(), sort_by), None)
+
+        if self.db_path:
+            conn = database.connect(self.db_path)
+            if query is None:
+                conn.execute('DELETE FROM search_cache')
+            else:
+                conn.execute(
+                    'DELETE FROM search_cache WHERE query = ? AND sort_by = ?',
+                    (query.strip(), sort_by)
+                )
+            conn.commit()
+            conn.close()
+
+    def stats(self):
+        """캐시 적중/실패 횟수를 반환합니다."""
+        with self._lock:
+            stats = dict(self._counts)
+            stats['entries'] = len(self._entries)
+            stats['in_flight'] = len(self._flights)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def _load(self, key, loader):
+        """같은 key의 검색이 진행 중이면 그 결과를 기다리고, 아니면 직접 검색합니다."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._counts['misses'] += 1
+            else:
+                self._counts['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.results
+
+        try:
+            flight.results = loader(*key)
+            self._store(key, flight.results)
+            return flight.results
+
+        except Exception as e:
+            self._count('errors')
+            flight.error = e
+            raise
+
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._flights:
+                return
+            self._counts['refreshes'] += 1
+
+        def refresh():
+            try:
+                self._load(key, loader)
+            except Exception as e:
+                logger.error(f"검색 결과 갱신 중 오류 발생: {key[0]} ({str(e)})")
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _store(self, key, results):
+        # 빈 결과는 검색 오류일 수 있으므로 캐시하지 않습니다
+        if not results:
+            return
+
+        fetched_at = time.time()
+        with self._lock:
+            self._entries[key] = (results, fetched_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts['evictions'] += 1
+
+        if self.db_path:
+            try:
+                conn = database.connect(self.db_path)
+                conn.execute('''
+                    INSERT OR REPLACE INTO search_cache (query, sort_by, results, fetched_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (key[0], key[1], json.dumps(results, ensure_ascii=False), fetched_at))
+                conn.commit()
+                conn.close()
+            except Exception as e:
+                logger.error(f"검색 결과 캐시 저장 중 오류 발생: {str(e)}")
+
+    def _load_persistent(self, key):
+        if not self.db_path:
+            return None
+
+        try:
+            conn = database.connect(self.db_path)
+            row = conn.execute(
+                'SELECT results, fetched_at FROM search_cache WHERE query = ? AND sort_by = ?',
+                key
+            ).fetchone()
+            conn.close()
+        except Exception as e:
+            logger.error(f"검색 결과 캐시 조회 중 오류 발생: {str(e)}")
+            return None
+
+        if row is None or time.time() - row[1] >= self.ttl + self.stale_ttl:
+            return None
+
+        entry = (json.loads(row[0]), row[1])
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts['evictions'] += 1
+            self._counts['persistent_hits'] += 1
+        return entry
+
+    def _count(self, key):
+        with self._lock:
+            self._counts[key] += 1
@@ -1,28 +1,44 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from selenium.common.exceptions import NoSuchElementException
 import logging
 from database import Database
-from datetime import datetime
-import json
+import brunch_parser
+import metrics
+from driver_pool import DriverPool
+from http_fetcher import HttpFetcher
+from page_ready import PageReadiness
+from crawl_pipeline import CrawlPipeline
 
 class BrunchCrawler:
-    def __init__(self):
-        """ChromeDriver를 초기화하고 브라우저 옵션을 설정합니다."""
-        options = Options()
-        options.add_argument('--headless')  # 헤드리스 모드
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
+    def __init__(self, pool=None, db=None, fetcher=None, pipeline=None, pipeline_options=None,
+                 max_age_days=None, readiness=None, base_url='https://brunch.co.kr'):
+        """
+        브런치 크롤러를 초기화합니다.
         
-        service = ChromeService(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.db = Database()
+        Args:
+            pool (DriverPool): 함께 쓸 WebDriver 풀. 없으면 드라이버 1개짜리 풀을 만듭니다.
+            db (Database): 글을 저장할 데이터베이스
+            fetcher (HttpFetcher): 브라우저 없이 글을 가져올 HTTP 클라이언트
+            pipeline (CrawlPipeline): 글 크롤링 파이프라인. 없으면 pipeline_options로 만듭니다.
+            pipeline_options (dict): 파이프라인을 직접 만들 때 CrawlPipeline에 넘길 설정
+            max_age_days (float): 이미 저장된 글도 이 기간보다 오래됐으면 다시 크롤링합니다.
+                                  None이면 저장된 글은 다시 크롤링하지 않습니다.
+            readiness (PageReadiness): 페이지 로드 대기 방식. 없으면 기본 프로필로 만듭니다.
+            base_url (str): 검색 페이지 주소. 벤치마크에서 녹화한 페이지를 돌려주는 로컬 서버로 바꿀 수 있습니다.
+        """
+        self._owns_pool = pool is None
+        self.pool = pool or DriverPool(size=1)
+        self.db = db or Database()
+        self.fetcher = fetcher or HttpFetcher()
+        self.max_age_days = max_age_days
+        self.readiness = readiness or PageReadiness()
+        self.base_url = base_url.rstrip('/')
+        self._owns_pipeline = pipeline is None
+        self.pipeline = pipeline or CrawlPipeline(
+            fetch=self.fetcher.fetch_page,
+            render=self.render_article,
+            db=self.db,
+            **(pipeline_options or {})
+        )
         
     def search(self, query, sort_by='recency'):
         """
@@ -44,131 +60,102 @@ class BrunchCrawler:
                      "comments": str    # 댓글 수
                  }
         """
-        url = f"https://brunch.co.kr/search?q={query}&type=article"
-        if sort_by == "accu":
-            url += "&sort=accu" 
-            
         try:
-            self.driver.get(url)
-            time.sleep(2)  # 페이지 로딩 대기
-            
-            results = []
-            articles = self.driver.find_elements(By.CSS_SELECTOR, "li[data-articleuid]")
-            
-            for article in articles:
-                try:
-                    # 제목
-                    title = article.find_element(By.CSS_SELECTOR, ".tit_subject").text.strip()
-                    
-                    # URL
-                    url = article.find_element(By.CSS_SELECTOR, "a.link_post").get_attribute("href")
-                    
-                    # 내용 미리보기
-                    content = article.find_element(By.CSS_SELECTOR, ".article_content").text.strip()
-                    
-                    # 썸네일 (있는 경우만)
-                    try:
-                        thumbnail = article.find_element(By.CSS_SELECTOR, "img.img_thumb").get_attribute("src")
-                    except:
-                        thumbnail = None
-                        
-                    # 작성자
-                    try:
-                        author = article.find_element(By.CSS_SELECTOR, ".post_append span:last-child").text.strip()
-                        if author.startswith("By "):
-                            author = author[3:]
-                    except:
-                        author = "Unknown"
-                        
-                    # 작성 시간
-                    try:
-                        time_element = article.find_element(By.CSS_SELECTOR, ".publish_time")
-                        time_text = time_element.text.strip()
-                    except:
-                        time_text = None
-                        
-                    # 댓글 수
-                    try:
-                        comments = article.find_element(By.CSS_SELECTOR, ".num_txt").text.strip()
-                    except:
-                        comments = "0"
-                    
-                    results.append({
-                        "title": title,
-                        "content": content,
-                        "url": url,
-                        "thumbnail": thumbnail,
-                        "author": author,
-                        "time": time_text,
-                        "comments": comments
-                    })
-                    
-                except Exception as e:
-                    print(f"Error parsing article: {str(e)}")
-                    continue
-                    
-            return results
+            return list(self.iter_search(query, sort_by))
             
         except Exception as e:
             print(f"Error in search: {str(e)}")
             return []
             
+    def iter_search(self, query, sort_by='recency'):
+        """
+        브런치 검색 결과를 카드 하나를 추출할 때마다 돌려줍니다.
+        
+        결과 형태는 search()와 같습니다. 오류는 호출한 쪽으로 그대로 전달됩니다.
+        """
+        url = f"{self.base_url}/search?q={query}&type=article"
+        if sort_by == "accu":
+            url += "&sort=accu" 
+            
+        # 제너레이터가 끝나거나 중간에 닫히면 드라이버를 풀에 반납합니다
+        with self.pool.driver() as driver:
+            yield from self._iter_search_results(driver, url)
+            
+    def _iter_search_results(self, driver, url):
+        """검색 결과 페이지를 열고, 결과 카드를 모두 추출하기 전에 하나씩 돌려줍니다."""
+        # 결과 카드가 나타날 때까지만 기다립니다 (결과가 없으면 제한 시간까지 기다린 뒤 빈 목록)
+        self.readiness.open(driver, url, 'search')
+        
+        # 요소마다 WebDriver에 묻지 않고 HTML을 한 번만 받아 파싱합니다
+        with metrics.span('parse'):
+            soup = brunch_parser.make_soup(driver.page_source)
+        yield from brunch_parser.iter_search_results(soup)
+            
     def crawl_and_save_articles(self, article_urls):
         """
         주어진 URL들의 글을 크롤링하여 데이터베이스에 저장합니다.
         
         Args:
             article_urls (list): 크롤링할 글 URL 목록
+            
+        Returns:
+            dict: URL별 결과. 성공한 URL은 None, 실패한 URL은 오류 메시지
         """
-        for url in article_urls:
-            try:
-                # 이미 저장된 글인지 확인
-                if self.db.get_article(url):
-                    logging.info(f"이미 저장된 글입니다: {url}")
-                    continue
-                
-                self.driver.get(url)
-                time.sleep(2)  # 페이지 로딩 대기
-                
-                # 글 제목
-                title = self.driver.find_element(By.CSS_SELECTOR, ".cover_title").text.strip()
-                
-                # 글 내용
-                content_elements = self.driver.find_elements(By.CSS_SELECTOR, ".item_type_text")
-                content = "\n".join([elem.text.strip() for elem in content_elements])
-                
-                # 작성자
-                author = self.driver.find_element(By.CSS_SELECTOR, ".author_name").text.strip()
-                
-                # 썸네일 (있는 경우만)
-                try:
-                    thumbnail = self.driver.find_element(By.CSS_SELECTOR, ".cover_img").get_attribute("src")
-                except:
-                    thumbnail = None
-                    
-                # 도메인 정보
-                domain = "brunch.co.kr"
-                
-                # 데이터베이스에 저장
-                self.db.save_article({
-                    "url": url,
-                    "title": title,
-                    "content": content,
-                    "author": author,
-                    "thumbnail": thumbnail,
-                    "domain": domain,
-                    "crawled_at": datetime.now()
-                })
-                
-                logging.info(f"글을 저장했습니다: {title}")
-                
-            except Exception as e:
-                logging.error(f"글 크롤링 중 오류 발생: {str(e)}")
-                continue
+        # 이미 저장된 글은 한 번의 조회로 걸러냅니다
+        new_urls = self.filter_new_urls(article_urls)
+        return self.pipeline.run(new_urls)
+        
+    def filter_new_urls(self, article_urls):
+        """
+        이미 저장된 글을 빼고 크롤링이 필요한 URL만 남깁니다.
+        
+        Args:
+            article_urls (list): URL 목록
+            
+        Returns:
+            list: 새 글이거나 max_age_days보다 오래된 글의 URL (원래 순서 유지)
+        """
+        existing = self.db.existing_urls(article_urls, self.max_age_days)
+        metrics.DUPLICATES_SKIPPED.inc(len(existing))
+        if existing:
+            logging.info(f"이미 저장된 글 {len(existing)}개를 건너뜁니다")
+        return [url for url in dict.fromkeys(article_urls) if url not in existing]
+        
+    def crawl_article(self, url):
+        """
+        글 하나를 가져옵니다. 정적 HTML로 충분하면 브라우저를 쓰지 않습니다.
+        
+        Args:
+            url (str): 글 URL
+            
+        Returns:
+            dict: 글 정보
+        """
+        article = self.fetcher.fetch_article(url)
+        if article:
+            return article
+            
+        # 필요한 요소가 정적 HTML에 없을 때만 브라우저로 렌더링합니다
+        return self.render_article(url)
+        
+    def render_article(self, url):
+        """풀에서 빌린 브라우저로 글 페이지를 렌더링해 글 정보를 추출합니다."""
+        with self.pool.driver() as driver:
+            return self._parse_article(driver, url)
+            
+    def _parse_article(self, driver, url):
+        """글 페이지를 열고 제목, 내용, 작성자, 썸네일을 추출합니다."""
+        self.readiness.open(driver, url, 'article')
+        
+        with metrics.span('parse'):
+            article = brunch_parser.parse_article(brunch_parser.make_soup(driver.page_source), url)
+        if article is None:
+            raise NoSuchElementException(f"글 본문을 찾을 수 없습니다: {url}")
+        return article
                 
     def close(self):
-        """브라우저를 종료합니다."""
-        try:
-            self.driver.quit()
-        except:
-            pass
+        """직접 만든 파이프라인과 드라이버 풀을 종료합니다. 공유 자원은 만든 쪽에서 닫습니다."""
+        if self._owns_pipeline:
+            self.pipeline.stop()
+        if self._owns_pool:
+            self.pool.close()
@@ -0,0 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+import os
+import re
+
+# 불용어 목록
+STOP_WORDS = {
+    '있습니다', '있는', '있다', '그리고', '그런데', '하지만', '입니다', '이런',
+    '저런', '그런', '이렇게', '저렇게', '그렇게', '때문에', '이것', '저것', '그것',
+    '이번', '저번', '이후', '이전', '통해', '따라', '위해', '라고', '이라고',
+    '하는', '한다', '됩니다', '된다'
+}
+
+# 조사를 제외한 명사 추출 시도
+KEYWORD_PATTERNS = [
+    r'[가-힣]{2,}(?=[은는이가을를에의로])',  # 조사 앞의 단어
+    r'[가-힣]{2,}(?=[^가-힣]|$)'  # 문장 끝이나 한글이 아닌 문자 앞의 단어
+]
+
+# KEYWORD_PATTERNS 두 개를 본문 한 번 훑기로 찾습니다.
+# 두 글자 이상 이어진 한글 덩어리마다 뒤의 패턴은 덩어리 전체와 같고(2번 그룹),
+# 앞의 패턴은 덩어리 안에서 조사 바로 앞까지 가장 긴 부분과 같습니다(1번 그룹, 없으면 빈 문자열)
+_KEYWORD_RE = re.compile(r'(?:(?=([가-힣]{2,})[은는이가을를에의로]))?([가-힣]{2,})')
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# 글이 이보다 적으면 프로세스를 띄우는 비용이 더 커서 현재 프로세스에서 처리합니다
+MIN_PARALLEL_DOCUMENTS = 200
+
+def clean_text(text):
+    """연속된 공백을 하나로 줄이고 HTML 태그와 앞뒤 공백을 지웁니다."""
+    if not text:
+        return ""
+    # str.split()은 정규식 \s와 같은 유니코드 공백으로 나누므로 re.sub(r'\s+', ' ')와 결과가 같습니다
+    text = ' '.join(text.split())
+    # 태그가 없는 요소(대부분)는 정규식을 돌리지 않습니다
+    if '<' in text:
+        text = _TAG_RE.sub('', text).strip()
+    return text
+
+def count_keywords(content):
+    """
+    글 하나의 내용에서 한글 단어(2글자 이상)별 등장 횟수를 셉니다.
+
+    문장마다 KEYWORD_PATTERNS를 하나씩 돌리던 것과 결과가 같습니다. 단어는 문장 부호에서 끊기므로
+    문장으로 나누지 않고 본문 전체를 미리 컴파일한 정규식으로 한 번만 훑습니다.
+    """
+    counter = Counter()
+    if not content:
+        return counter
+
+    matches = _KEYWORD_RE.findall(content)
+    if not matches:
+        return counter
+    prefixes, words = zip(*matches)
+    counter.update(words)
+    counter.update(prefixes)
+
+    counter.pop('', None)
+    for word in STOP_WORDS:
+        counter.pop(word, None)
+    return counter
+
+def default_workers():
+    """이 프로세스가 쓸 수 있는 CPU 코어 수"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def map_documents(function, documents, workers=None):
+    """
+    여러 글에 function을 적용한 결과를 글 순서대로 담아 반환합니다.
+
+    글이 MIN_PARALLEL_DOCUMENTS개 이상이고 workers가 2 이상이면 프로세스 풀에 글을 묶음으로 나눠
+    모든 코어를 씁니다. 그때 function은 다른 프로세스로 보낼 수 있는 모듈 수준 함수여야 합니다.
+
+    Args:
+        function (callable): 본문 -> 결과
+        documents (iterable): 본문 목록
+        workers (int): 프로세스 수. None이면 쓸 수 있는 코어 수
+    """
+    documents = list(documents)
+    workers = workers or default_workers()
+    if workers <= 1 or len(documents) < MIN_PARALLEL_DOCUMENTS:
+        return [function(document) for document in documents]
+
+    # 프로세스마다 몇 묶음씩 돌아가도록 나눠 글마다 주고받는 비용을 줄입니다
+    chunksize = max(1, len(documents) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, documents, chunksize=chunksize))
+
+def count_keywords_batch(documents, workers=None):
+    """여러 글의 키워드 빈도를 한꺼번에 셉니다. map_documents(count_keywords, ...)와 같습니다."""
+    return map_documents(count_keywords, documents, workers)